@@ -0,0 +1,7 @@
+"""Benchmarks of the service, each module is run with `python -m benchmarks.<module>`"""
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'friendsservice.settings')
+django.setup()
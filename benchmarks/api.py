@@ -0,0 +1,269 @@
+"""Latency, throughput and query counts of every v1 user API endpoint on a synthetic social graph.
+
+Endpoints are served by the ASGI application. The graph has power-law degree distribution. Read endpoints are called
+by random users of the graph, write endpoints get their own fresh requests and friendships prepared before the timed
+run, so every call succeeds.
+Results can be saved with --output and compared with a previous run with --baseline.
+
+Usage: python -m benchmarks.api --users 10000 --average-degree 20 --requests 500 --concurrency 20 --output run.json
+"""
+import argparse
+import asyncio
+import json
+import random
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.test.utils import override_settings
+
+from benchmarks.utils import (
+    LoadResult,
+    QueryCounter,
+    asgi_request,
+    close_connections,
+    run_load,
+    seed_friends,
+    seed_graph,
+    seed_users,
+    test_database,
+)
+from friendsservice.api_v1.authentication import UsernameTokenObtainPairSerializer
+from friendsservice.asgi import application
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import FriendshipCounters, UserFriendship
+
+User = get_user_model()
+
+BULK_SIZE = 10
+PASSWORD = 'bench-Password-2024'  # noqa: S105
+
+
+@dataclass
+class Call:
+    method: str
+    url: str
+    user: User | None = None
+    body: dict | None = None
+
+
+class Graph:
+    """Seeded users and tokens of the users who make requests"""
+
+    def __init__(self, users: list[User], actors: int, rng: random.Random):
+        """Pick `actors` of the users, all random choices are made by `rng`"""
+        self.users = users
+        self.actors = rng.sample(users, min(actors, len(users)))
+        self.rng = rng
+        self._headers: dict[int, dict[str, str]] = {}
+
+    def actor(self) -> User:
+        return self.rng.choice(self.actors)
+
+    def username(self) -> str:
+        return self.rng.choice(self.users).username
+
+    def headers(self, user: User) -> dict[str, str]:
+        if user.id not in self._headers:
+            token = UsernameTokenObtainPairSerializer.get_token(user).access_token
+            self._headers[user.id] = {'authorization': f'Bearer {token}', 'content-type': 'application/json'}
+        return self._headers[user.id]
+
+    def pending_requests(self, name: str, count: int) -> list[UserFriendship]:
+        """Active requests sent to random actors by fresh users"""
+        senders = seed_users(count, prefix=f'bench_{name}')
+        seed_requests = []
+        for sender in senders:
+            request = UserFriendship(sender_id=sender.id, recipient_id=self.actor().id)
+            request.fill_pair()
+            seed_requests.append(request)
+        UserFriendship.objects.bulk_create(seed_requests, batch_size=1000)
+        FriendshipCounters.objects.reconcile({request.recipient_id for request in seed_requests})
+        return seed_requests
+
+
+def read(url: Callable[[Graph], str]) -> Callable[[Graph, int], list[Call]]:
+    """Prepare GET calls of the URL by random actors"""
+    def prepare(graph: Graph, count: int) -> list[Call]:
+        return [Call('GET', url(graph), graph.actor()) for _ in range(count)]
+    return prepare
+
+
+def prepare_create(graph: Graph, count: int) -> list[Call]:  # noqa: ARG001
+    """Prepare signups of new users"""
+    return [
+        Call('POST', '/api/v1/user/create/', body={'username': f'bench_created_{index}', 'password': PASSWORD})
+        for index in range(count)
+    ]
+
+
+def prepare_add_to_friends(graph: Graph, count: int) -> list[Call]:
+    """Prepare requests from random actors to fresh users"""
+    recipients = seed_users(count, prefix='bench_add')
+    return [
+        Call('POST', '/api/v1/user/add_to_friends/', graph.actor(), {'username': recipient.username})
+        for recipient in recipients
+    ]
+
+
+def prepare_bulk_add_to_friends(graph: Graph, count: int) -> list[Call]:
+    """Prepare bulk requests from random actors to fresh users"""
+    recipients = seed_users(count * BULK_SIZE, prefix='bench_bulk_add')
+    return [
+        Call(
+            'POST', '/api/v1/user/add_to_friends/bulk/', graph.actor(),
+            {'usernames': [recipient.username for recipient in recipients[start:start + BULK_SIZE]]},
+        )
+        for start in range(0, len(recipients), BULK_SIZE)
+    ]
+
+
+def change_status(action: str) -> Callable[[Graph, int], list[Call]]:
+    """Prepare accepts or declines of requests received by random actors"""
+    def prepare(graph: Graph, count: int) -> list[Call]:
+        users = {user.id: user for user in graph.actors}
+        return [
+            Call('GET', f'/api/v1/user/friendship/{request.id}/{action}/', users[request.recipient_id])
+            for request in graph.pending_requests(action, count)
+        ]
+    return prepare
+
+
+def bulk_change_status(action: str) -> Callable[[Graph, int], list[Call]]:
+    """Prepare bulk accepts or declines of requests received by random actors"""
+    def prepare(graph: Graph, count: int) -> list[Call]:
+        # Requests of one call must be received by the same user
+        calls = []
+        for _ in range(count):
+            recipient = graph.actor()
+            senders = seed_users(BULK_SIZE, prefix=f'bench_bulk_{action}_{len(calls)}')
+            requests = [UserFriendship(sender_id=sender.id, recipient_id=recipient.id) for sender in senders]
+            for request in requests:
+                request.fill_pair()
+            UserFriendship.objects.bulk_create(requests)
+            calls.append(Call(
+                'POST', f'/api/v1/user/friendship/bulk/{action}/', recipient,
+                {'ids': [request.id for request in requests]},
+            ))
+        FriendshipCounters.objects.reconcile({call.user.id for call in calls})
+        return calls
+    return prepare
+
+
+def prepare_delete_from_friends(graph: Graph, count: int) -> list[Call]:
+    """Prepare deletes of fresh friends of random actors"""
+    calls = []
+    for friend in seed_users(count, prefix='bench_delete'):
+        user = graph.actor()
+        seed_friends(user, [friend])
+        calls.append(Call('DELETE', f'/api/v1/user/friendship/{friend.username}/', user))
+    FriendshipCounters.objects.reconcile({call.user.id for call in calls})
+    return calls
+
+
+def statuses_url(graph: Graph) -> str:
+    """Batch status URL of random users"""
+    return '/api/v1/user/friendship-statuses/?' + urlencode(
+        {'usernames': ','.join(graph.username() for _ in range(BULK_SIZE))}
+    )
+
+
+# Reads go first, writes change the graph
+ENDPOINTS: dict[str, Callable[[Graph, int], list[Call]]] = {
+    'friends': read(lambda _: '/api/v1/user/friends/'),
+    'friends_counters': read(lambda _: '/api/v1/user/friends/counters/'),
+    'mutual_friends': read(lambda graph: f'/api/v1/user/friends/mutual/{graph.username()}/'),
+    'friend_suggestions': read(lambda _: '/api/v1/user/friends/suggestions/'),
+    'sent_requests': read(lambda _: '/api/v1/user/friendship/sent/'),
+    'received_requests': read(lambda _: '/api/v1/user/friendship/received/'),
+    'friendship_status': read(lambda graph: f'/api/v1/user/friendship/{graph.username()}/'),
+    'friendship_statuses': read(statuses_url),
+    'friendship_changes': read(lambda _: '/api/v1/user/changes/'),
+    'create_user': prepare_create,
+    'add_to_friends': prepare_add_to_friends,
+    'bulk_add_to_friends': prepare_bulk_add_to_friends,
+    'accept_friendship_request': change_status('accept'),
+    'decline_friendship_request': change_status('decline'),
+    'bulk_accept_friendship_requests': bulk_change_status('accept'),
+    'bulk_decline_friendship_requests': bulk_change_status('decline'),
+    'delete_from_friends': prepare_delete_from_friends,
+}
+
+
+async def run(
+    name: str, graph: Graph, calls: list[Call], concurrency: int, query_counter: QueryCounter
+) -> LoadResult:
+    """Make the calls with `concurrency` at a time"""
+    pending_calls = iter(calls)
+
+    async def make_request() -> int:
+        call = next(pending_calls)
+        headers = graph.headers(call.user) if call.user else {'content-type': 'application/json'}
+        body = json.dumps(call.body).encode() if call.body is not None else b''
+        status_code, _ = await asgi_request(application, call.method, call.url, headers, body)
+        return status_code
+
+    queries_before = query_counter.count
+    result = await run_load(name, make_request, len(calls), concurrency)
+    result.queries = query_counter.count - queries_before
+    await close_connections()
+    return result
+
+
+def compare(results: list[dict], baseline_path: Path) -> None:
+    """Print relative changes of the results against the baseline run"""
+    baseline = {result['name']: result for result in json.loads(baseline_path.read_text())['results']}
+    for result in results:
+        previous = baseline.get(result['name'])
+        if previous is None:
+            continue
+        changes = ' '.join(
+            f'{key}={(result[key] - previous[key]) / previous[key] * 100:+.1f}%'
+            for key in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms') if previous[key]
+        )
+        print(f'{result["name"]} {changes}')  # noqa: T201
+
+
+def main() -> None:
+    """Seed the graph and benchmark the chosen endpoints"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--average-degree', type=float, default=20)
+    parser.add_argument('--exponent', type=float, default=2.5, help='Power-law exponent of the degree distribution')
+    parser.add_argument('--pending-ratio', type=float, default=0.2, help='Share of friendships left as requests')
+    parser.add_argument('--actors', type=int, default=1000, help='Number of users making requests')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, help='Save results to JSON file')
+    parser.add_argument('--baseline', type=Path, help='Print changes against results saved by a previous run')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = []
+    with test_database(), override_settings(ALLOWED_HOSTS=['localhost']):
+        users = seed_users(args.users)
+        friendships = seed_graph(users, args.average_degree, args.exponent, args.pending_ratio, rng)
+        print(f'users={len(users)} friendships={friendships}')  # noqa: T201
+        graph = Graph(users, args.actors, rng)
+
+        with QueryCounter().counting() as query_counter:
+            for name in args.endpoints:
+                calls = ENDPOINTS[name](graph, args.requests)
+                friend_graph_cache.clear()
+                result = asyncio.run(run(name, graph, calls, args.concurrency, query_counter))
+                print(result)  # noqa: T201
+                results.append(result.to_dict())
+
+    if args.output:
+        config = {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()}
+        args.output.write_text(json.dumps({'config': config, 'results': results}, indent=2))
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Sync vs async friends list view throughput under concurrency, served by the ASGI application.
+
+Usage: python -m benchmarks.async_views --friends 500 --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+
+from django.test.utils import override_settings
+from django.urls import path
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from benchmarks.utils import asgi_request, close_connections, run_load, seed_friends, seed_users, test_database
+from friendsservice.api_v1.async_views import AsyncAPIView
+from friendsservice.asgi import application
+from friendsservice.friendship.services.get_friends_list import GetFriendsListService
+
+
+# Both views skip the friend graph cache to compare sync and async ORM paths
+class SyncFriendsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request: Request) -> Response:
+        page = GetFriendsListService(user=request.user)._get_friends_usernames_page()  # noqa: SLF001
+        return Response({'friends': page.items, 'next': page.next_cursor})
+
+
+class AsyncFriendsView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request: Request) -> Response:
+        page = await GetFriendsListService(user=request.user)._aget_friends_usernames_page()  # noqa: SLF001
+        return Response({'friends': page.items, 'next': page.next_cursor})
+
+
+urlpatterns = [
+    path('sync/', SyncFriendsView.as_view()),
+    path('async/', AsyncFriendsView.as_view()),
+]
+
+
+async def run(headers: dict[str, str], requests: int, concurrency: int) -> None:
+    """Load sync and async views in turn after a warm-up"""
+    for name in ('sync', 'async'):
+        async def make_request(url: str = f'/{name}/') -> int:
+            status_code, _ = await asgi_request(application, 'GET', url, headers)
+            return status_code
+
+        # Warm up connections and code paths
+        await run_load(name, make_request, concurrency, concurrency)
+        print(await run_load(name, make_request, requests, concurrency))  # noqa: T201
+    await close_connections()
+
+
+def main() -> None:
+    """Seed a user with friends and compare the views"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--friends', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+
+    with test_database(), override_settings(ROOT_URLCONF=__name__, ALLOWED_HOSTS=['localhost']):
+        user, *friends = seed_users(args.friends + 1)
+        seed_friends(user, friends)
+        headers = {'authorization': f'Bearer {AccessToken.for_user(user)}'}
+        asyncio.run(run(headers, args.requests, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Request latency and opened database connections for different CONN_MAX_AGE, served by the ASGI application.
+
+Point POSTGRES_HOST/POSTGRES_PORT at an external pooler and set POSTGRES_POOLER=true to measure the pooler mode.
+
+Usage: python -m benchmarks.connections --requests 1000 --concurrency 1 --conn-max-age 0 60
+"""
+import argparse
+import asyncio
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from benchmarks.utils import asgi_request, close_connections, run_load, seed_friends, seed_users, test_database
+from friendsservice.asgi import application
+
+
+async def run(headers: dict[str, str], conn_max_age: int, requests: int, concurrency: int) -> None:
+    """Load the friends list, counting connections opened during the run"""
+    # Authentication reads only token claims, the friends list query is what opens the connection
+    async def make_request() -> int:
+        status_code, _ = await asgi_request(application, 'GET', '/api/v1/user/friends/', headers)
+        return status_code
+
+    opened_connections = 0
+
+    def count_connection(**kwargs) -> None:  # noqa: ARG001
+        nonlocal opened_connections
+        opened_connections += 1
+
+    name = f'conn_max_age={conn_max_age}'
+    await run_load(name, make_request, concurrency, concurrency)
+    connection_created.connect(count_connection)
+    result = await run_load(name, make_request, requests, concurrency)
+    connection_created.disconnect(count_connection)
+    print(f'{result} opened_connections={opened_connections}')  # noqa: T201
+    await close_connections()
+
+
+def main() -> None:
+    """Compare each CONN_MAX_AGE"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--conn-max-age', type=int, nargs='+', default=[0, 60])
+    args = parser.parse_args()
+
+    with test_database(), override_settings(ALLOWED_HOSTS=['localhost']):
+        user, *friends = seed_users(11)
+        seed_friends(user, friends)
+        headers = {'authorization': f'Bearer {AccessToken.for_user(user)}'}
+        for conn_max_age in args.conn_max_age:
+            connections.close_all()
+            connections['default'].settings_dict['CONN_MAX_AGE'] = conn_max_age
+            asyncio.run(run(headers, conn_max_age, args.requests, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
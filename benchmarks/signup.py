@@ -0,0 +1,64 @@
+"""Signup throughput of the create user endpoint per hashing worker, served by the ASGI application.
+
+Passwords are hashed in the request worker process with --workers 0, and by a pool of worker processes otherwise.
+CPU time of the request worker process per signup shows how much of the hashing left it.
+
+Usage: python -m benchmarks.signup --requests 200 --concurrency 20 --workers 0 1 2 4
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from unittest import mock
+
+from django.test.utils import override_settings
+
+from benchmarks.utils import asgi_request, close_connections, run_load, test_database
+from friendsservice.api_v1.user.hashing import PasswordHashingPool
+from friendsservice.asgi import application
+
+PASSWORD = 'bench-Password-2024'  # noqa: S105
+
+
+async def run(workers: int, requests: int, concurrency: int, usernames: itertools.count) -> None:
+    """Load the create user endpoint, measuring CPU time of this process"""
+    async def make_request() -> int:
+        body = json.dumps({'username': f'bench_signup_{next(usernames)}', 'password': PASSWORD}).encode()
+        status_code, _ = await asgi_request(
+            application, 'POST', '/api/v1/user/create/', {'content-type': 'application/json'}, body
+        )
+        return status_code
+
+    name = f'workers={workers}'
+    await run_load(name, make_request, concurrency, concurrency)
+    cpu_started_at = time.process_time()
+    result = await run_load(name, make_request, requests, concurrency)
+    cpu_per_signup = (time.process_time() - cpu_started_at) / requests
+    print(  # noqa: T201
+        f'{result} signups_per_core={result.throughput / max(workers, 1):.1f} '
+        f'request_worker_cpu_ms={cpu_per_signup * 1000:.2f}'
+    )
+    await close_connections()
+
+
+def main() -> None:
+    """Compare each number of hashing workers"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    args = parser.parse_args()
+
+    usernames = itertools.count()
+    with test_database(), override_settings(ALLOWED_HOSTS=['localhost']):
+        for workers in args.workers:
+            pool = PasswordHashingPool(workers, max_pending=args.requests, start_method='spawn')
+            pool.warm_up()
+            with mock.patch('friendsservice.api_v1.user.views.password_hashing_pool', pool):
+                asyncio.run(run(workers, args.requests, args.concurrency, usernames))
+            pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+import asyncio
+import gc
+import itertools
+import random
+import statistics
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TypeVar
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import connection, connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+
+from friendsservice.friendship.models import (
+    FriendshipCounters,
+    FriendshipEvent,
+    FriendshipEventType,
+    FriendshipStatus,
+    UserFriendship,
+)
+
+User = get_user_model()
+
+T = TypeVar('T')
+
+ASGIApp = Callable[[dict, Callable, Callable], Awaitable[None]]
+
+
+@contextmanager
+def test_database() -> Iterator[None]:
+    """Run benchmark against a throwaway copy of the configured database"""
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connections.close_all()
+        # Connections left open by finished request threads are closed once garbage collected
+        gc.collect()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+async def close_connections() -> None:
+    """Close persistent connections opened by the thread that runs sync code of the ASGI application"""
+    await sync_to_async(connections.close_all)()
+
+
+def seed_users(count: int, prefix: str = 'bench_user') -> list[User]:
+    """Create users with unusable passwords, returned in id order"""
+    User.objects.bulk_create(
+        [User(username=f'{prefix}_{index}', password=UNUSABLE_PASSWORD_PREFIX) for index in range(count)],
+        batch_size=1000,
+    )
+    return list(User.objects.filter(username__startswith=f'{prefix}_').order_by('id'))
+
+
+def seed_friends(user: User, friends: list[User], status: FriendshipStatus = FriendshipStatus.CONFIRMED) -> None:
+    """Create friendships of the user with each of the friends"""
+    friendships = []
+    for friend in friends:
+        friendship = UserFriendship(sender_id=user.id, recipient_id=friend.id, status=status.value)
+        friendship.fill_pair()
+        friendships.append(friendship)
+    UserFriendship.objects.bulk_create(friendships, batch_size=1000)
+
+
+def batched(items: list[T], size: int = 1000) -> Iterator[list[T]]:
+    """Split the items into lists of `size` items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def seed_graph(
+    users: list[User], average_degree: float, exponent: float, pending_ratio: float, rng: random.Random
+) -> int:
+    """Random friendships with power-law degree distribution, returns their count.
+
+    Chung-Lu model: ends of every edge are drawn with weight `rank ** (-1 / (exponent - 1))`, so a few users get most
+    of the friendships. Self loops and repeated pairs are dropped, which makes the average degree slightly lower.
+    Events and counters of the friendships are written the same way the services write them.
+    """
+    cum_weights = list(itertools.accumulate((rank + 1) ** (-1 / (exponent - 1)) for rank in range(len(users))))
+    ends = rng.choices([user.id for user in users], cum_weights=cum_weights, k=int(len(users) * average_degree))
+
+    friendships = {}
+    for sender_id, recipient_id in zip(ends[::2], ends[1::2], strict=False):
+        pair = UserFriendship.ordered_pair(sender_id, recipient_id)
+        if sender_id == recipient_id or pair in friendships:
+            continue
+        status = FriendshipStatus.ACTIVE if rng.random() < pending_ratio else FriendshipStatus.CONFIRMED
+        friendships[pair] = UserFriendship(
+            sender_id=sender_id, recipient_id=recipient_id, user_low_id=pair[0], user_high_id=pair[1],
+            status=status.value,
+        )
+
+    friendships = list(friendships.values())
+    for batch in batched(friendships):
+        UserFriendship.objects.bulk_create(batch)
+        for event_type in (FriendshipEventType.REQUEST_SENT, FriendshipEventType.REQUEST_ACCEPTED):
+            FriendshipEvent.objects.record(event_type, *(
+                friendship for friendship in batch
+                if event_type == FriendshipEventType.REQUEST_SENT
+                or friendship.status == FriendshipStatus.CONFIRMED.value
+            ))
+    for batch in batched([user.id for user in users]):
+        FriendshipCounters.objects.reconcile(batch)
+    return len(friendships)
+
+
+async def asgi_request(
+    app: ASGIApp, method: str, url: str, headers: dict[str, str] | None = None, body: bytes = b''
+) -> tuple[int, bytes]:
+    """Call ASGI application in-process the same way uvicorn does, without network"""
+    parsed_url = urlsplit(url)
+    headers = {'host': 'localhost', **(headers or {})}
+    if body:
+        # Django reads no more of the body than content-length
+        headers['content-length'] = str(len(body))
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': parsed_url.path,
+        'raw_path': parsed_url.path.encode(),
+        'query_string': parsed_url.query.encode(),
+        'root_path': '',
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 0),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    disconnected = asyncio.Event()
+    status_code = 0
+    response_body = []
+
+    async def receive() -> dict:
+        if messages:
+            return messages.pop(0)
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message: dict) -> None:
+        nonlocal status_code
+        if message['type'] == 'http.response.start':
+            status_code = message['status']
+        elif message['type'] == 'http.response.body':
+            response_body.append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    disconnected.set()
+    return status_code, b''.join(response_body)
+
+
+class QueryCounter:
+    """Counts queries of every connection, including connections of the threads serving the ASGI application"""
+
+    def __init__(self):
+        """Count nothing until `counting` is entered"""
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(  # noqa: PLR0913
+        self, execute: Callable, sql: str, params: object, many: bool, context: dict  # noqa: FBT001
+    ) -> object:
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, connection: BaseDatabaseWrapper, **kwargs: object) -> None:  # noqa: ARG002
+        # Connection wrappers live as long as their thread, while the connections themselves may be reopened
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    @contextmanager
+    def counting(self) -> Iterator['QueryCounter']:
+        connection_created.connect(self.install)
+        for existing_connection in connections.all(initialized_only=True):
+            self.install(existing_connection)
+        try:
+            yield self
+        finally:
+            connection_created.disconnect(self.install)
+
+
+@dataclass
+class LoadResult:
+    name: str
+    requests: int
+    concurrency: int
+    duration: float
+    latencies: list[float] = field(repr=False)
+    errors: int = 0
+    queries: int | None = None
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.duration
+
+    def percentile(self, percent: int) -> float:
+        if len(self.latencies) < 2:  # noqa: PLR2004
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100, method='inclusive')[percent - 1]
+
+    def to_dict(self) -> dict[str, float | int | str]:
+        result = {
+            'name': self.name,
+            'requests': self.requests,
+            'concurrency': self.concurrency,
+            'errors': self.errors,
+            'throughput_rps': round(self.throughput, 1),
+            'p50_ms': round(self.percentile(50) * 1000, 2),
+            'p95_ms': round(self.percentile(95) * 1000, 2),
+            'p99_ms': round(self.percentile(99) * 1000, 2),
+        }
+        if self.queries is not None:
+            result['queries_per_request'] = round(self.queries / self.requests, 2)
+        return result
+
+    def __str__(self) -> str:
+        return ' '.join(f'{key}={value}' for key, value in self.to_dict().items())
+
+
+async def run_load(
+    name: str, make_request: Callable[[], Awaitable[int]], requests: int, concurrency: int
+) -> LoadResult:
+    """Send `requests` requests with at most `concurrency` in flight; `make_request` returns status code"""
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed_request() -> None:
+        nonlocal errors
+        async with semaphore:
+            started_at = time.perf_counter()
+            status_code = await make_request()
+            latencies.append(time.perf_counter() - started_at)
+            if status_code >= 400:  # noqa: PLR2004
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(timed_request() for _ in range(requests)))
+    return LoadResult(
+        name=name,
+        requests=requests,
+        concurrency=concurrency,
+        duration=time.perf_counter() - started_at,
+        latencies=latencies,
+        errors=errors,
+    )
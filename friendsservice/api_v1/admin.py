@@ -1,3 +1,21 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.db.models import QuerySet
+from django.http import HttpRequest
 
-# Register your models here.
+from friendsservice.api_v1.authentication import deactivate_users
+
+User = get_user_model()
+
+
+class TokenRevokingUserAdmin(UserAdmin):
+    actions = ['deactivate']
+
+    @admin.action(description='Deactivate selected users and revoke their tokens')
+    def deactivate(self, request: HttpRequest, queryset: QuerySet[User]) -> None:
+        self.message_user(request, f'Deactivated {deactivate_users(queryset)} users')
+
+
+admin.site.unregister(User)
+admin.site.register(User, TokenRevokingUserAdmin)
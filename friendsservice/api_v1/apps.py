@@ -4,3 +4,19 @@ from django.apps import AppConfig
 class ApiV1Config(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "friendsservice.api_v1"
+
+    def ready(self) -> None:
+        # Registers OpenAPI extensions, token revocation receivers and query recorder
+        from friendsservice.api_v1 import schema, signals  # noqa: F401
+
+        # Refuses to start with token revocations in a per-process cache
+        from friendsservice.api_v1.authentication import token_revocations
+        token_revocations.check_shared()
+
+        from friendsservice.api_v1.metrics import metrics_registry
+        from friendsservice.friendship.cache import friend_graph_cache
+        metrics_registry.register_collector(friend_graph_cache.metrics)
+
+        # Common passwords list is read and compacted once per process instead of on the first signup
+        from django.contrib.auth.password_validation import get_default_password_validators
+        get_default_password_validators()
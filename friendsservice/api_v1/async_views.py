@@ -0,0 +1,74 @@
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import HttpRequest
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """APIView with async handlers, served by the event loop without a hop to the sync thread.
+
+    Authenticators providing `aauthenticate` are awaited, others are run through `sync_to_async`.
+    Async views cannot run inside ATOMIC_REQUESTS transaction, so they opt out of it.
+    """
+
+    async def perform_aauthentication(self, request: Request) -> None:
+        for authenticator in self.get_authenticators():
+            aauthenticate = getattr(authenticator, 'aauthenticate', None)
+            try:
+                if aauthenticate is not None:
+                    user_auth_tuple = await aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()  # noqa: SLF001
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator  # noqa: SLF001
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()  # noqa: SLF001
+
+    async def ainitial(self, request: Request, *args, **kwargs) -> None:
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.perform_aauthentication(request)
+        self.check_permissions(request)
+        self.check_throttles(request)
+
+    @transaction.non_atomic_requests
+    async def dispatch(self, request: HttpRequest, *args, **kwargs) -> Response:
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:  # noqa: BLE001
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,192 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import BaseCache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils.translation import gettext_lazy as i18n
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+
+from friendsservice.friendship.cache import LRUCache
+
+User = get_user_model()
+
+
+class TokenRevocations:
+    """Per-user revocation times in the shared cache, access tokens issued before them are rejected.
+
+    Checked on every request, so looked up values are also kept in process for `local_timeout` seconds.
+    Revocations are recorded by `post_save`/`post_delete` receivers; queryset `update()` sends no signals,
+    so users are deactivated in bulk with `deactivate_users`.
+    """
+
+    def __init__(self, alias: str, local_timeout: int, local_max_size: int, *, allow_local_cache: bool = False):
+        """Use cache `alias`, refusing a local memory one in `check_shared` unless `allow_local_cache` is set"""
+        self.alias = alias
+        self.local_timeout = local_timeout
+        self.local = LRUCache(local_max_size)
+        self.allow_local_cache = allow_local_cache
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self.alias]
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f'auth:revoked:{user_id}'
+
+    def check_shared(self) -> None:
+        """Refuse a per-process cache, a revocation would reach only the worker which recorded it"""
+        if isinstance(self.shared, LocMemCache) and not self.allow_local_cache:
+            message = (
+                f'Cache {self.alias!r} of token revocations is local to the process, configure a shared cache with '
+                'AUTH_REVOCATION_CACHE_URL or set AUTH_REVOCATION_ALLOW_LOCAL_CACHE for a single process'
+            )
+            raise ImproperlyConfigured(message)
+
+    def revoke(self, *user_ids: int) -> None:
+        # Older access tokens expire by themselves
+        timeout = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+        revoked_at = int(time.time())
+        self.shared.set_many({self._key(user_id): revoked_at for user_id in user_ids}, timeout=timeout)
+        for user_id in user_ids:
+            self.local.set(self._key(user_id), (revoked_at, time.monotonic() + timeout))
+
+    def _lookup_local(self, key: str) -> tuple[int | None, float] | None:
+        local_value = self.local.get(key)
+        if local_value is not None and local_value[1] > time.monotonic():
+            return local_value
+        return None
+
+    def _store_local(self, key: str, revoked_at: int | None) -> None:
+        self.local.set(key, (revoked_at, time.monotonic() + self.local_timeout))
+
+    def revoked_at(self, user_id: int) -> int | None:
+        key = self._key(user_id)
+        local_value = self._lookup_local(key)
+        if local_value is not None:
+            return local_value[0]
+
+        revoked_at = self.shared.get(key)
+        self._store_local(key, revoked_at)
+        return revoked_at
+
+    async def arevoked_at(self, user_id: int) -> int | None:
+        key = self._key(user_id)
+        local_value = self._lookup_local(key)
+        if local_value is not None:
+            return local_value[0]
+
+        revoked_at = await self.shared.aget(key)
+        self._store_local(key, revoked_at)
+        return revoked_at
+
+    @staticmethod
+    def _issued_before(validated_token: Token, revoked_at: int | None) -> bool:
+        return revoked_at is not None and validated_token['iat'] <= revoked_at
+
+    def is_revoked(self, validated_token: Token) -> bool:
+        return self._issued_before(validated_token, self.revoked_at(validated_token[api_settings.USER_ID_CLAIM]))
+
+    async def ais_revoked(self, validated_token: Token) -> bool:
+        revoked_at = await self.arevoked_at(validated_token[api_settings.USER_ID_CLAIM])
+        return self._issued_before(validated_token, revoked_at)
+
+
+token_revocations = TokenRevocations(
+    alias=settings.AUTH_REVOCATION_CACHE_ALIAS,
+    local_timeout=settings.AUTH_REVOCATION_LOCAL_TIMEOUT,
+    local_max_size=settings.AUTH_REVOCATION_LOCAL_MAX_SIZE,
+    allow_local_cache=settings.AUTH_REVOCATION_ALLOW_LOCAL_CACHE,
+)
+
+
+def deactivate_users(users: QuerySet[User]) -> int:
+    """Deactivate users with one update and revoke their tokens, which `update()` alone would leave valid"""
+    with transaction.atomic(using=users.db):
+        user_ids = list(users.filter(is_active=True).values_list('id', flat=True))
+        updated = User.objects.using(users.db).filter(id__in=user_ids).update(is_active=False)
+        # Before the commit too: a token checked in between must not pass
+        token_revocations.revoke(*user_ids)
+        transaction.on_commit(lambda: token_revocations.revoke(*user_ids), using=users.db)
+    return updated
+
+
+class UsernameTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Adds username claim, which `TokenUser` reads, to both tokens"""
+
+    @classmethod
+    def get_token(cls, user: User) -> RefreshToken:
+        token = super().get_token(user)
+        token['username'] = user.username
+        return token
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """JWT authentication which loads user with async ORM, used by `AsyncAPIView`"""
+
+    async def aauthenticate(self, request: Request) -> tuple[User, Token] | None:
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token: Token) -> User:
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(i18n('Token contained no recognizable user identification')) from exc
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as exc:
+            raise AuthenticationFailed(i18n('User not found'), code='user_not_found') from exc
+
+        if not user.is_active:
+            raise AuthenticationFailed(i18n('User is inactive'), code='user_inactive')
+
+        return user
+
+
+class TokenUserAuthentication(AsyncJWTAuthentication):
+    """JWT authentication without user query, `request.user` is a `TokenUser` built from token claims.
+
+    Services need only id and username of the request user; users deactivated or deleted after the token was
+    issued are rejected by `token_revocations`.
+    """
+
+    @staticmethod
+    def _check_user_id(validated_token: Token) -> None:
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(i18n('Token contained no recognizable user identification'))
+
+    def get_user(self, validated_token: Token) -> TokenUser:
+        self._check_user_id(validated_token)
+        if token_revocations.is_revoked(validated_token):
+            raise AuthenticationFailed(i18n('Token is revoked'), code='token_revoked')
+
+        return TokenUser(validated_token)
+
+    async def aget_user(self, validated_token: Token) -> TokenUser:
+        self._check_user_id(validated_token)
+        if await token_revocations.ais_revoked(validated_token):
+            raise AuthenticationFailed(i18n('Token is revoked'), code='token_revoked')
+
+        return TokenUser(validated_token)
@@ -0,0 +1,67 @@
+import hashlib
+import time
+from collections.abc import Callable
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+from friendsservice.friendship.cache import friend_graph_cache
+
+
+def _validators(request: Request) -> tuple[str, int | None]:
+    """ETag and Last-Modified of the user friendship reads at the current version of the user"""
+    return _validators_at(request, friend_graph_cache.version(request.user.id))
+
+
+async def _avalidators(request: Request) -> tuple[str, int | None]:
+    """Compute `_validators` reading the version without blocking the event loop"""
+    return _validators_at(request, await friend_graph_cache.aversion(request.user.id))
+
+
+def _validators_at(request: Request, version: int) -> tuple[str, int | None]:
+    # The version changes on every write to the user friendships, the path includes the page cursor and size
+    representation = f'{request.user.id}:{version}:{request.accepted_media_type}:{request.get_full_path()}'
+    etag = quote_etag(hashlib.sha1(representation.encode()).hexdigest())  # noqa: S324
+    # Last-Modified has seconds precision: a version of the current second may still be followed by another change
+    # within the same second, so it is sent only once that second is over
+    last_modified = version // 1_000_000_000
+    return etag, last_modified if last_modified < int(time.time()) else None
+
+
+def _finish(response: HttpResponse, etag: str, last_modified: int | None) -> HttpResponse:
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # Clients must revalidate every time, the validators are cheap to check
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_on_friendship_version(method: Callable) -> Callable:
+    """Answers `If-None-Match` / `If-Modified-Since` of the request user reads with 304 without calling the view.
+
+    Suits views whose response depends only on the request user friendships and the query string.
+    """
+    if iscoroutinefunction(method):
+        @wraps(method)
+        async def wrapper(view: APIView, request: Request, *args: object, **kwargs: object) -> HttpResponse:
+            etag, last_modified = await _avalidators(request)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await method(view, request, *args, **kwargs)
+            return _finish(response, etag, last_modified)
+    else:
+        @wraps(method)
+        def wrapper(view: APIView, request: Request, *args: object, **kwargs: object) -> HttpResponse:
+            etag, last_modified = _validators(request)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = method(view, request, *args, **kwargs)
+            return _finish(response, etag, last_modified)
+    return wrapper
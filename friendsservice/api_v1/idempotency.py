@@ -0,0 +1,101 @@
+import hashlib
+import json
+from collections.abc import Callable
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+idempotency_key_parameter = OpenApiParameter(
+    IDEMPOTENCY_KEY_HEADER,
+    type=str,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description='Retries with the same key and body get the response of the first request without repeating it',
+)
+
+
+class IdempotentResponses:
+    """Responses of requests made with `Idempotency-Key` header, stored in the shared cache by user and key.
+
+    The first request claims its key for `lock_timeout` seconds, concurrent requests with the same key get 409
+    until it finishes. Responses with status below 500 are stored for `timeout` seconds, errors release the key.
+    """
+
+    def __init__(self, alias: str, timeout: int, lock_timeout: int):
+        """Use cache `alias`, keeping responses for `timeout` and claims for `lock_timeout` seconds"""
+        self.alias = alias
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self.alias]
+
+    @staticmethod
+    def _key(request: Request, idempotency_key: str) -> str:
+        # Client keys may contain characters which cache backends do not accept
+        digest = hashlib.sha256(f'{request.method}:{request.path}:{idempotency_key}'.encode()).hexdigest()
+        return f'idempotency:{request.user.id}:{digest}'
+
+    @staticmethod
+    def _fingerprint(request: Request) -> str:
+        return hashlib.sha256(json.dumps(request.data, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _replay(self, cache_key: str, fingerprint: str) -> Response:
+        stored = self.shared.get(cache_key)
+        if stored is not None and stored['fingerprint'] != fingerprint:
+            return Response({'error': f'{IDEMPOTENCY_KEY_HEADER} was used with another request'}, status=422)
+        if stored is None or stored['status'] is None:
+            return Response({'error': f'Request with this {IDEMPOTENCY_KEY_HEADER} is in progress'}, status=409)
+        response = Response(stored['data'], status=stored['status'])
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+    def __call__(self, method: Callable[..., Response]) -> Callable[..., Response]:
+        """Make a sync view method idempotent"""
+
+        @wraps(method)
+        def wrapper(view: APIView, request: Request, *args: object, **kwargs: object) -> Response:
+            idempotency_key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+            if idempotency_key is None:
+                return method(view, request, *args, **kwargs)
+            if not idempotency_key or len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+                return Response({'error': f'Invalid {IDEMPOTENCY_KEY_HEADER}'}, status=400)
+
+            cache_key = self._key(request, idempotency_key)
+            fingerprint = self._fingerprint(request)
+            if not self.shared.add(cache_key, {'fingerprint': fingerprint, 'status': None}, self.lock_timeout):
+                return self._replay(cache_key, fingerprint)
+
+            try:
+                response = method(view, request, *args, **kwargs)
+            except BaseException:
+                self.shared.delete(cache_key)
+                raise
+            if status.is_server_error(response.status_code):
+                self.shared.delete(cache_key)
+            else:
+                self.shared.set(
+                    cache_key,
+                    {'fingerprint': fingerprint, 'status': response.status_code, 'data': response.data},
+                    self.timeout,
+                )
+            return response
+
+        return wrapper
+
+
+idempotent = IdempotentResponses(
+    alias=settings.IDEMPOTENCY_CACHE_ALIAS,
+    timeout=settings.IDEMPOTENCY_KEY_TIMEOUT,
+    lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT,
+)
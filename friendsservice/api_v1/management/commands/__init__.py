@@ -0,0 +1 @@
+"""Management commands of the v1 API"""
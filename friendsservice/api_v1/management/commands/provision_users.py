@@ -0,0 +1,103 @@
+import csv
+import itertools
+import json
+import sys
+from argparse import ArgumentParser
+from collections.abc import Iterator
+from contextlib import nullcontext
+from pathlib import Path
+from typing import TextIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from friendsservice.api_v1.user.hashing import password_hashing_pool
+from friendsservice.friendship.models import FriendshipCounters
+from friendsservice.friendship.usernames import username_resolver
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003
+        'Create users from a CSV file with header or a JSONL file in batches. Rows have `username` and either '
+        'plain `password`, hashed by the password hashing workers, or `password_hash` stored as is; users without '
+        'both get an unusable password. Existing usernames are skipped.'
+    )
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument('source', help='Path of the file, - for stdin')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Taken from the file extension by default')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    @staticmethod
+    def _rows(file: TextIO, file_format: str) -> Iterator[dict[str, str]]:
+        if file_format == 'csv':
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+    @staticmethod
+    def _users(rows: list[dict[str, str]]) -> list[User]:
+        hashes = iter(password_hashing_pool.hash_many([row['password'] for row in rows if row.get('password')]))
+        return [
+            User(
+                username=row['username'],
+                password=next(hashes) if row.get('password') else row.get('password_hash') or make_password(None),
+            )
+            for row in rows
+        ]
+
+    def _provision(self, rows: list[dict[str, str]]) -> int:
+        if any(not row.get('username') for row in rows):
+            message = 'Every row must have username'
+            raise CommandError(message)
+        rows = list({row['username']: row for row in rows}.values())
+        existing = set(User.objects.filter(username__in=[row['username'] for row in rows]).values_list(
+            'username', flat=True
+        ))
+        # Passwords of existing users are not hashed in vain
+        users = self._users([row for row in rows if row['username'] not in existing])
+
+        passwords = {user.username: user.password for user in users}
+        with transaction.atomic():
+            # Users created concurrently since the check are skipped as well
+            User.objects.bulk_create(users, ignore_conflicts=True)
+            # Postgres returns no ids of rows inserted with ON CONFLICT DO NOTHING, the inserted ones are told
+            # from concurrently created ones by their salted password hashes
+            created = [
+                (user_id, username)
+                for user_id, username, password in User.objects.filter(username__in=passwords).values_list(
+                    'id', 'username', 'password'
+                )
+                if passwords[username] == password
+            ]
+            # `bulk_create` sends no post_save, so counters rows are created and usernames invalidated here
+            FriendshipCounters.objects.bulk_create(
+                [FriendshipCounters(user_id=user_id) for user_id, _ in created], ignore_conflicts=True
+            )
+            username_resolver.invalidate_on_commit(*(username for _, username in created))
+        return len(created)
+
+    def handle(self, *args, **options) -> None:  # noqa: ARG002
+        source = options['source']
+        file_format = options['format'] or Path(source).suffix.lstrip('.')
+        if file_format not in ('csv', 'jsonl'):
+            message = 'Cannot tell the format from the file extension, use --format'
+            raise CommandError(message)
+
+        created_count = rows_count = 0
+        file_context = nullcontext(sys.stdin) if source == '-' else Path(source).open(encoding='utf-8', newline='')
+        with file_context as file:
+            rows = self._rows(file, file_format)
+            while batch := list(itertools.islice(rows, options['batch_size'])):
+                created_count += self._provision(batch)
+                rows_count += len(batch)
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Read {rows_count} rows, created {created_count} users')
+
+        self.stdout.write(f'Provisioned {created_count} users, skipped {rows_count - created_count}')
@@ -0,0 +1,272 @@
+import hmac
+import logging
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from django.template.response import SimpleTemplateResponse
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class QueryBudgetExceededError(Exception):
+    """View ran more queries than declared in its `query_budgets`"""
+
+
+@dataclass
+class RequestMetrics:
+    started_at: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_duration: float = 0.0
+    view_started_at: float | None = None
+    view_finished_at: float | None = None
+    rendered_at: float | None = None
+
+    @property
+    def view_duration(self) -> float | None:
+        if self.view_started_at is None or self.view_finished_at is None:
+            return None
+        return self.view_finished_at - self.view_started_at
+
+    @property
+    def serialize_duration(self) -> float | None:
+        if self.view_finished_at is None or self.rendered_at is None:
+            return None
+        return self.rendered_at - self.view_finished_at
+
+
+# Copied to the threads running sync code of the request by `sync_to_async`, so their queries are counted too
+_request_metrics: ContextVar[RequestMetrics | None] = ContextVar('request_metrics', default=None)
+
+
+def record_query(execute: Callable, sql: str, params: object, many: bool, context: dict) -> object:  # noqa: FBT001
+    """Execute wrapper adding the query to metrics of the current request"""
+    metrics = _request_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started_at = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_duration += time.perf_counter() - started_at
+
+
+def install_query_recorder(connection: BaseDatabaseWrapper, **kwargs: object) -> None:  # noqa: ARG001
+    """Add `record_query` to execute wrappers of a new connection"""
+    # Connection wrappers live as long as their thread, while the connections themselves may be reopened
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class MetricsRegistry:
+    """In-process aggregates of request metrics by view, rendered in Prometheus text format"""
+
+    def __init__(self, buckets: tuple[float, ...] = DURATION_BUCKETS):
+        """Aggregate request durations into histograms with these upper bounds, in seconds"""
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._requests: dict[tuple[str, str, int], int] = defaultdict(int)
+        self._duration_buckets: dict[tuple[str, str], list[int]] = defaultdict(lambda: [0] * len(self.buckets))
+        self._totals: dict[str, dict[tuple[str, str], float]] = defaultdict(lambda: defaultdict(float))
+        self._collectors: list[Callable[[], list[tuple[str, str, float]]]] = []
+
+    def register_collector(self, collector: Callable[[], list[tuple[str, str, float]]]) -> None:
+        """Add a source of (name, type, value) metrics, read on every scrape and kept by `clear`"""
+        self._collectors.append(collector)
+
+    def observe(  # noqa: PLR0913
+        self, view: str, method: str, status: int, duration: float, metrics: RequestMetrics
+    ) -> None:
+        key = (view, method)
+        with self._lock:
+            self._requests[(view, method, status)] += 1
+            buckets = self._duration_buckets[key]
+            for index, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    buckets[index] += 1
+            self._totals['http_request_duration_seconds_sum'][key] += duration
+            self._totals['http_request_duration_seconds_count'][key] += 1
+            self._totals['db_queries_total'][key] += metrics.queries
+            self._totals['db_duration_seconds_total'][key] += metrics.db_duration
+            self._totals['serialize_duration_seconds_total'][key] += metrics.serialize_duration or 0.0
+
+    def budget_exceeded(self, view: str, method: str) -> None:
+        with self._lock:
+            self._totals['query_budget_exceeded_total'][(view, method)] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self._duration_buckets.clear()
+            self._totals.clear()
+
+    @staticmethod
+    def _labels(**labels: object) -> str:
+        return ','.join(f'{name}="{value}"' for name, value in labels.items())
+
+    def render(self) -> str:
+        lines = [
+            '# HELP http_requests_total Requests by view, method and status code',
+            '# TYPE http_requests_total counter',
+        ]
+        with self._lock:
+            for (view, method, status), count in sorted(self._requests.items()):
+                labels = self._labels(view=view, method=method, status=status)
+                lines.append(f'http_requests_total{{{labels}}} {count}')
+
+            lines += [
+                '# HELP http_request_duration_seconds Request duration by view and method',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for (view, method), buckets in sorted(self._duration_buckets.items()):
+                labels = self._labels(view=view, method=method)
+                for bound, count in zip(self.buckets, buckets, strict=True):
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                count = int(self._totals['http_request_duration_seconds_count'][(view, method)])
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+
+            for name, values in sorted(self._totals.items()):
+                if not name.startswith('http_request_duration_seconds'):
+                    lines.append(f'# TYPE {name} counter')
+                for (view, method), value in sorted(values.items()):
+                    lines.append(f'{name}{{{self._labels(view=view, method=method)}}} {value:g}')
+
+        for collector in self._collectors:
+            for name, metric_type, value in collector():
+                lines += [f'# TYPE {name} {metric_type}', f'{name} {value:g}']
+        return '\n'.join(lines) + '\n'
+
+
+metrics_registry = MetricsRegistry()
+
+
+def _scrape_allowed(request: HttpRequest) -> bool:
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+            return True
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Prometheus scrape endpoint, aggregates of this process only.
+
+    View names and traffic are internal, so the endpoint answers `METRICS_ALLOWED_IPS` or holders of `METRICS_TOKEN`.
+    """
+    if not _scrape_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class RequestMetricsMiddleware:
+    """Records query count, DB time, view time and serialization time of every request.
+
+    They are returned in `Server-Timing` header and aggregated by view in `metrics_registry`. Views may declare
+    `query_budgets` by HTTP method; exceeding one is logged, or raises `QueryBudgetExceededError` when
+    `settings.QUERY_BUDGET_STRICT` is set, as it is in tests.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse | Awaitable[HttpResponse]]):
+        """Match the sync or async mode of the next handler, as Django middleware does"""
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Sync hooks would be called through `sync_to_async` by the async handler
+            self.process_view = self._aprocess_view
+            self.process_template_response = self._aprocess_template_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse | Awaitable[HttpResponse]:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _request_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_metrics.reset(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        metrics = RequestMetrics()
+        token = _request_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_metrics.reset(token)
+        return self._finish(request, response, metrics)
+
+    @staticmethod
+    def _view_started() -> None:
+        metrics = _request_metrics.get()
+        if metrics is not None:
+            metrics.view_started_at = time.perf_counter()
+
+    def _view_finished(self, response: SimpleTemplateResponse) -> SimpleTemplateResponse:
+        # Template response middleware runs right after the view, DRF responses are rendered after it
+        metrics = _request_metrics.get()
+        if metrics is not None:
+            metrics.view_finished_at = time.perf_counter()
+            response.add_post_render_callback(lambda _: self._rendered(metrics))
+        return response
+
+    def process_view(self, request: HttpRequest, *args: object) -> None:  # noqa: ARG002
+        self._view_started()
+
+    async def _aprocess_view(self, request: HttpRequest, *args: object) -> None:  # noqa: ARG002
+        self._view_started()
+
+    def process_template_response(
+        self, request: HttpRequest, response: SimpleTemplateResponse  # noqa: ARG002
+    ) -> SimpleTemplateResponse:
+        return self._view_finished(response)
+
+    async def _aprocess_template_response(
+        self, request: HttpRequest, response: SimpleTemplateResponse  # noqa: ARG002
+    ) -> SimpleTemplateResponse:
+        return self._view_finished(response)
+
+    @staticmethod
+    def _rendered(metrics: RequestMetrics) -> None:
+        metrics.rendered_at = time.perf_counter()
+
+    @staticmethod
+    def _server_timing(duration: float, metrics: RequestMetrics) -> str:
+        timings = [f'db;dur={metrics.db_duration * 1000:.2f};desc="{metrics.queries} queries"']
+        if metrics.view_duration is not None:
+            timings.append(f'view;dur={metrics.view_duration * 1000:.2f}')
+        if metrics.serialize_duration is not None:
+            timings.append(f'serialize;dur={metrics.serialize_duration * 1000:.2f}')
+        timings.append(f'total;dur={duration * 1000:.2f}')
+        return ', '.join(timings)
+
+    def _finish(self, request: HttpRequest, response: HttpResponse, metrics: RequestMetrics) -> HttpResponse:
+        duration = time.perf_counter() - metrics.started_at
+        response['Server-Timing'] = self._server_timing(duration, metrics)
+
+        resolver_match = request.resolver_match
+        view = resolver_match.view_name if resolver_match else 'unresolved'
+        metrics_registry.observe(view, request.method, response.status_code, duration, metrics)
+
+        view_class = getattr(resolver_match.func, 'view_class', None) if resolver_match else None
+        budget = getattr(view_class, 'query_budgets', {}).get(request.method)
+        if budget is not None and metrics.queries > budget:
+            metrics_registry.budget_exceeded(view, request.method)
+            message = f'{view} {request.method} ran {metrics.queries} queries, its budget is {budget}'
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceededError(message)
+            logger.warning(message)
+        return response
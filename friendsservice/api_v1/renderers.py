@@ -0,0 +1,39 @@
+import csv
+import io
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class NdjsonRenderer(JSONRenderer):
+    """Negotiates NDJSON exports, streamed by the view itself, and renders their errors as one JSON line"""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'  # noqa: A003
+
+    def render(
+        self, data: object, accepted_media_type: str | None = None, renderer_context: dict | None = None
+    ) -> bytes:
+        rendered = super().render(data, accepted_media_type, renderer_context)
+        return rendered + b'\n' if rendered else rendered
+
+
+class CsvRenderer(BaseRenderer):
+    """Negotiates CSV exports, streamed by the view itself, and renders their errors as a header and one row"""
+
+    media_type = 'text/csv'
+    format = 'csv'  # noqa: A003
+    charset = 'utf-8'
+
+    def render(
+        self,
+        data: dict | None,
+        accepted_media_type: str | None = None,  # noqa: ARG002
+        renderer_context: dict | None = None,  # noqa: ARG002
+    ) -> bytes:
+        if data is None:
+            return b''
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(data.keys())
+        writer.writerow(data.values())
+        return buffer.getvalue().encode(self.charset)
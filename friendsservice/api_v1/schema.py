@@ -0,0 +1,6 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class AsyncJWTScheme(SimpleJWTScheme):
+    target_class = 'friendsservice.api_v1.authentication.AsyncJWTAuthentication'
+    match_subclasses = True
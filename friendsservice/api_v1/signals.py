@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from friendsservice.api_v1.authentication import token_revocations
+from friendsservice.api_v1.metrics import install_query_recorder
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def revoke_inactive_user_tokens(instance: User, **kwargs) -> None:  # noqa: ARG001
+    """Reject access tokens of a deactivated user"""
+    if not instance.is_active:
+        token_revocations.revoke(instance.id)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(instance: User, **kwargs) -> None:  # noqa: ARG001
+    """Reject access tokens of a deleted user"""
+    token_revocations.revoke(instance.id)
+
+
+connection_created.connect(install_query_recorder)
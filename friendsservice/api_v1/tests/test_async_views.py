@@ -0,0 +1,174 @@
+import csv
+import io
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import UserFriendship, FriendshipStatus, FriendshipCounters
+from friendsservice.friendship.tests.base import forbid_blocking_cache_reads
+
+User = get_user_model()
+
+
+class AsyncViewsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.first_user = User.objects.create_user(username='first', password='test_pass')
+        cls.second_user = User.objects.create_user(username='second', password='test_pass')
+        cls.third_user = User.objects.create_user(username='third', password='test_pass')
+        cls.friendship = UserFriendship.objects.create(
+            sender=cls.first_user, recipient=cls.second_user, status=FriendshipStatus.CONFIRMED.value
+        )
+        cls.received_request = UserFriendship.objects.create(sender=cls.third_user, recipient=cls.first_user)
+        FriendshipCounters.objects.reconcile([cls.first_user.id, cls.second_user.id, cls.third_user.id])
+
+    def setUp(self) -> None:
+        friend_graph_cache.clear()
+
+    def auth_headers(self, user: User) -> dict[str, str]:
+        return {'authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    async def test_friends_list(self):
+        response = await self.async_client.get('/api/v1/user/friends/', headers=self.auth_headers(self.first_user))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'friends': ['second'], 'next': None})
+
+    async def test_friends_list_not_modified(self):
+        headers = self.auth_headers(self.first_user)
+        response = await self.async_client.get('/api/v1/user/friends/', headers=headers)
+        etag = response['ETag']
+
+        response = await self.async_client.get('/api/v1/user/friends/', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIn('desc="0 queries"', response['Server-Timing'])
+
+        # Another page is another representation
+        response = await self.async_client.get(
+            '/api/v1/user/friends/?limit=1', headers={**headers, 'If-None-Match': etag}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        friend_graph_cache.invalidate(self.first_user.id)
+        response = await self.async_client.get('/api/v1/user/friends/', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    async def test_friends_list_validators_read_without_blocking(self):
+        headers = self.auth_headers(self.first_user)
+        with forbid_blocking_cache_reads():
+            response = await self.async_client.get('/api/v1/user/friends/', headers=headers)
+            self.assertEqual(response.status_code, 200)
+
+            response = await self.async_client.get(
+                '/api/v1/user/friends/', headers={**headers, 'If-None-Match': response['ETag']}
+            )
+            self.assertEqual(response.status_code, 304)
+
+    async def test_sent_requests_not_modified_since(self):
+        headers = self.auth_headers(self.third_user)
+        with mock.patch('friendsservice.friendship.cache.time.time_ns', return_value=1_700_000_000_000_000_000):
+            friend_graph_cache.invalidate(self.third_user.id)
+        response = await self.async_client.get('/api/v1/user/friendship/sent/', headers=headers)
+        self.assertEqual(response['Last-Modified'], 'Tue, 14 Nov 2023 22:13:20 GMT')
+
+        response = await self.async_client.get(
+            '/api/v1/user/friendship/sent/', headers={**headers, 'If-Modified-Since': response['Last-Modified']}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_received_requests(self):
+        response = await self.async_client.get(
+            '/api/v1/user/friendship/received/', headers=self.auth_headers(self.first_user)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(), {'requests': [{'id': self.received_request.id, 'sender': 'third'}], 'next': None}
+        )
+
+    async def test_friendship_status(self):
+        response = await self.async_client.get(
+            '/api/v1/user/friendship/second/', headers=self.auth_headers(self.first_user)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'friends')
+
+    async def test_friendship_statuses(self):
+        response = await self.async_client.get(
+            '/api/v1/user/friendship-statuses/?usernames=second,third,spy_user',
+            headers=self.auth_headers(self.first_user),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'statuses': [
+            {'username': 'second', 'status': 'friends', 'friendship_id': self.friendship.id},
+            {'username': 'third', 'status': 'request_received', 'friendship_id': self.received_request.id},
+            {'username': 'spy_user', 'status': 'not_found', 'friendship_id': None},
+        ]})
+
+    async def test_friendship_status_of_user_named_status(self):
+        await User.objects.acreate(username='status')
+        response = await self.async_client.get(
+            '/api/v1/user/friendship/status/', headers=self.auth_headers(self.first_user)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'none')
+
+    async def test_not_authenticated(self):
+        response = await self.async_client.get('/api/v1/user/friends/')
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.get('/api/v1/user/friends/', headers={'authorization': 'Bearer bad'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_delete_from_friends(self):
+        response = await self.async_client.delete(
+            '/api/v1/user/friendship/second/', headers=self.auth_headers(self.first_user)
+        )
+        self.assertEqual(response.status_code, 200)
+        friendship = await UserFriendship.objects.aget(sender=self.first_user)
+        self.assertEqual(friendship.status, FriendshipStatus.DECLINED.value)
+
+    async def test_friendship_counters(self):
+        response = await self.async_client.get(
+            '/api/v1/user/friends/counters/', headers=self.auth_headers(self.first_user)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'friends': 1, 'sent_requests': 0, 'received_requests': 1})
+
+    async def export(self, url: str, **headers: str) -> tuple[int, str, str]:
+        response = await self.async_client.get(url, headers={**self.auth_headers(self.first_user), **headers})
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        return response.status_code, response['Content-Type'], content.decode()
+
+    async def test_friendships_export(self):
+        status_code, content_type, content = await self.export('/api/v1/user/export/')
+        self.assertEqual(status_code, 200)
+        self.assertEqual(content_type, 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(
+            [(row['id'], row['sender'], row['recipient'], row['status']) for row in rows],
+            [
+                (self.friendship.id, 'first', 'second', 'confirmed'),
+                (self.received_request.id, 'third', 'first', 'active'),
+            ],
+        )
+
+    async def test_friendships_export_csv(self):
+        status_code, content_type, content = await self.export('/api/v1/user/export/', accept='text/csv')
+        self.assertEqual(status_code, 200)
+        self.assertEqual(content_type, 'text/csv; charset=utf-8')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ['id', 'sender_id', 'sender', 'recipient_id', 'recipient', 'status', 'updated_at'])
+        self.assertEqual([row[2] for row in rows[1:]], ['first', 'third'])
+
+        _, content_type, _ = await self.export('/api/v1/user/export/?format=csv')
+        self.assertEqual(content_type, 'text/csv; charset=utf-8')
+
+        response = await self.async_client.get('/api/v1/user/export/?format=csv')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.content.decode().splitlines()[0], 'detail')
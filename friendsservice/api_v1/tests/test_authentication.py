@@ -0,0 +1,70 @@
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from friendsservice.api_v1.authentication import TokenRevocations, deactivate_users, token_revocations
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.tests.base import forbid_blocking_cache_reads
+
+User = get_user_model()
+
+
+class TokenUserAuthenticationTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(username='first', password='test_pass')
+
+    def setUp(self) -> None:
+        friend_graph_cache.clear()
+        caches[token_revocations.alias].clear()
+        token_revocations.local.clear()
+
+    def obtain_access_token(self) -> str:
+        response = self.client.post('/api/v1/token/', {'username': 'first', 'password': 'test_pass'})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['access']
+
+    def test_token_contains_username(self):
+        self.assertEqual(AccessToken(self.obtain_access_token())['username'], 'first')
+
+    def test_friends_list_without_user_query(self):
+        headers = {'authorization': f'Bearer {self.obtain_access_token()}'}
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/user/friends/', headers=headers)
+        self.assertEqual(response.status_code, 200)
+
+    def test_deactivated_user_token_revoked(self):
+        headers = {'authorization': f'Bearer {self.obtain_access_token()}'}
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get('/api/v1/user/friends/', headers=headers)
+        self.assertEqual(response.status_code, 401)
+
+    def test_bulk_deactivated_user_token_revoked(self):
+        headers = {'authorization': f'Bearer {self.obtain_access_token()}'}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(deactivate_users(User.objects.filter(id=self.user.id)), 1)
+
+        response = self.client.get('/api/v1/user/friends/', headers=headers)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_async_revocation_read_without_blocking(self):
+        headers = {'authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        await sync_to_async(deactivate_users)(User.objects.filter(id=self.user.id))
+        # Read the revocation from the shared cache, not from the one kept in process by `revoke`
+        token_revocations.local.clear()
+
+        with forbid_blocking_cache_reads():
+            response = await self.async_client.get('/api/v1/user/friends/', headers=headers)
+        self.assertEqual(response.status_code, 401)
+
+    def test_local_revocation_cache_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            TokenRevocations('auth', local_timeout=5, local_max_size=10).check_shared()
+        TokenRevocations('auth', local_timeout=5, local_max_size=10, allow_local_cache=True).check_shared()
@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import TestCase
+
+from friendsservice.api_v1.user.hashing import PasswordHashingBusyError, password_hashing_pool
+
+User = get_user_model()
+
+
+class CreateUserViewTestCase(TestCase):
+
+    def create_user(self, username: str, password: str) -> HttpResponse:
+        return self.client.post(
+            '/api/v1/user/create/', {'username': username, 'password': password}, content_type='application/json'
+        )
+
+    def test_password_hashed_by_worker(self):
+        self.assertEqual(self.create_user('first', 'bench-Password-2024').status_code, 200)
+        self.assertTrue(User.objects.get(username='first').check_password('bench-Password-2024'))
+
+    def test_common_password(self):
+        response = self.create_user('first', 'Password1')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': {'password': ['This password is too common.']}})
+
+    def test_hashing_pool_busy(self):
+        with mock.patch.object(password_hashing_pool, 'ahash', side_effect=PasswordHashingBusyError):
+            response = self.create_user('first', 'bench-Password-2024')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(User.objects.filter(username='first').exists())
+
+    def test_username_already_exists(self):
+        User.objects.create_user(username='first', password='test_pass')
+        response = self.create_user('first', 'bench-Password-2024')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': {'username': ['User already exists']}})
@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from friendsservice.api_v1.idempotency import idempotent
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import UserFriendship
+from friendsservice.friendship.services.add_to_friends import AddToFriendsService
+
+User = get_user_model()
+
+
+class IdempotencyKeyTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.first_user = User.objects.create_user(username='first', password='test_pass')
+        cls.second_user = User.objects.create_user(username='second', password='test_pass')
+        cls.third_user = User.objects.create_user(username='third', password='test_pass')
+
+    def setUp(self) -> None:
+        friend_graph_cache.clear()
+        idempotent.shared.clear()
+
+    def add_to_friends(self, username: str, idempotency_key: str | None = None) -> HttpResponse:
+        headers = {'authorization': f'Bearer {AccessToken.for_user(self.first_user)}'}
+        if idempotency_key is not None:
+            headers['Idempotency-Key'] = idempotency_key
+        return self.client.post(
+            '/api/v1/user/add_to_friends/', {'username': username}, content_type='application/json', headers=headers
+        )
+
+    def test_retry_is_replayed(self):
+        self.assertEqual(self.add_to_friends('second', 'key-1').status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.add_to_friends('second', 'key-1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(UserFriendship.objects.count(), 1)
+        # Without the key the request is repeated
+        self.assertEqual(self.add_to_friends('second').json(), {'error': 'Friendship request already sent'})
+
+    def test_key_reused_with_another_body(self):
+        self.add_to_friends('second', 'key-1')
+        response = self.add_to_friends('third', 'key-1')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(UserFriendship.objects.count(), 1)
+
+    def test_key_in_progress(self):
+        retries = []
+        with mock.patch.object(
+            AddToFriendsService, '__call__', lambda service: retries.append(self.add_to_friends('second', 'key-1'))
+        ):
+            self.assertEqual(self.add_to_friends('second', 'key-1').status_code, 200)
+
+        self.assertEqual(retries[0].status_code, 409)
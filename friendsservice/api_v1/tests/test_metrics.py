@@ -0,0 +1,60 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from friendsservice.api_v1.metrics import QueryBudgetExceededError, metrics_registry
+from friendsservice.api_v1.user.views import UserFriendsView
+from friendsservice.friendship.cache import friend_graph_cache
+
+User = get_user_model()
+
+
+class RequestMetricsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(username='first', password='test_pass')
+
+    def setUp(self) -> None:
+        friend_graph_cache.clear()
+        metrics_registry.clear()
+        self.headers = {'authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    async def test_server_timing(self):
+        response = await self.async_client.get('/api/v1/user/friends/', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        timings = [timing.split(';')[0] for timing in response['Server-Timing'].split(', ')]
+        self.assertEqual(timings, ['db', 'view', 'serialize', 'total'])
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+
+    def test_metrics_endpoint(self):
+        # Cache counters are totals of the process, other tests have counted before
+        local_hits = friend_graph_cache.local.hits
+        self.client.get('/api/v1/user/friends/', headers=self.headers)
+        self.client.get('/api/v1/user/friends/', headers=self.headers)
+
+        metrics = self.client.get('/metrics/').content.decode()
+        self.assertIn('http_requests_total{view="api:user:user_friends",method="GET",status="200"} 2', metrics)
+        self.assertIn('db_queries_total{view="api:user:user_friends",method="GET"} 1', metrics)
+        self.assertIn(
+            'http_request_duration_seconds_bucket{view="api:user:user_friends",method="GET",le="+Inf"} 2', metrics
+        )
+        self.assertIn(f'friendship_cache_local_hits_total {local_hits + 1}', metrics)
+
+    def test_metrics_endpoint_restricted(self):
+        self.assertEqual(self.client.get('/metrics/', REMOTE_ADDR='10.0.0.1').status_code, 403)
+
+        with self.settings(METRICS_TOKEN='scrape-token'):
+            response = self.client.get('/metrics/', REMOTE_ADDR='10.0.0.1', headers={'authorization': 'Bearer other'})
+            self.assertEqual(response.status_code, 403)
+            response = self.client.get(
+                '/metrics/', REMOTE_ADDR='10.0.0.1', headers={'authorization': 'Bearer scrape-token'}
+            )
+            self.assertEqual(response.status_code, 200)
+
+    def test_query_budget_exceeded(self):
+        with mock.patch.object(UserFriendsView, 'query_budgets', {'GET': 0}):
+            with self.assertRaises(QueryBudgetExceededError):
+                self.client.get('/api/v1/user/friends/', headers=self.headers)
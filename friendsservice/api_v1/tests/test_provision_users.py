@@ -0,0 +1,79 @@
+import io
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from friendsservice.api_v1.management.commands.provision_users import Command
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import FriendshipCounters
+from friendsservice.friendship.usernames import username_resolver
+
+User = get_user_model()
+
+
+class ProvisionUsersCommandTestCase(TestCase):
+
+    def setUp(self) -> None:
+        friend_graph_cache.clear()
+        username_resolver.clear()
+
+    def provision(self, content: str, file_format: str) -> str:
+        stdout = io.StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / f'users.{file_format}'
+            path.write_text(content)
+            call_command('provision_users', str(path), '--batch-size', '2', stdout=stdout)
+        return stdout.getvalue()
+
+    def test_csv(self):
+        User.objects.create_user(username='first', password='test_pass')
+        output = self.provision(
+            'username,password,password_hash\n'
+            'first,other_pass,\n'
+            'second,test_pass,\n'
+            'third,,md5$salt$hash\n'
+            'fourth,,\n',
+            'csv',
+        )
+
+        self.assertEqual(output, 'Provisioned 3 users, skipped 1\n')
+        users = {user.username: user for user in User.objects.all()}
+        self.assertTrue(users['first'].check_password('test_pass'))
+        self.assertTrue(users['second'].check_password('test_pass'))
+        self.assertEqual(users['third'].password, 'md5$salt$hash')
+        self.assertFalse(users['fourth'].has_usable_password())
+        self.assertEqual(FriendshipCounters.objects.count(), 4)
+
+    def test_jsonl(self):
+        output = self.provision(
+            '{"username": "first", "password": "test_pass"}\n\n{"username": "first", "password": "test_pass"}\n',
+            'jsonl',
+        )
+
+        self.assertEqual(output, 'Provisioned 1 users, skipped 1\n')
+        self.assertTrue(User.objects.get(username='first').check_password('test_pass'))
+
+    def test_users_created_concurrently_not_counted(self):
+        users = Command._users
+
+        def create_concurrently(rows: list[dict[str, str]]) -> list:
+            User.objects.create_user(username='second', password='other_pass')
+            return users(rows)
+
+        with mock.patch.object(Command, '_users', staticmethod(create_concurrently)):
+            output = self.provision('username,password\nsecond,test_pass\nthird,test_pass\n', 'csv')
+
+        self.assertEqual(output, 'Provisioned 1 users, skipped 1\n')
+        self.assertTrue(User.objects.get(username='second').check_password('other_pass'))
+        self.assertEqual(FriendshipCounters.objects.count(), 2)
+
+    def test_cached_unknown_usernames_invalidated(self):
+        self.assertIsNone(username_resolver.resolve('second'))
+
+        self.provision('username\nsecond\n', 'csv')
+
+        self.assertEqual(username_resolver.resolve('second'), User.objects.get(username='second').id)
@@ -0,0 +1,93 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+
+class PasswordHashingBusyError(Exception):
+    """Too many passwords are waiting for a hashing worker"""
+
+
+def _setup_worker() -> None:
+    # Spawned workers import settings from DJANGO_SETTINGS_MODULE inherited from the parent
+    django.setup(set_prefix=False)
+
+
+class PasswordHashingPool:
+    """Hashes passwords in worker processes, so signup bursts do not hold the GIL or the event loop of requests.
+
+    The pool is started on first use. At most `max_pending` passwords are hashed or wait for a worker,
+    further calls raise `PasswordHashingBusyError`. With no workers passwords are hashed in the calling
+    thread, or in a thread of `sync_to_async` when awaited.
+    """
+
+    def __init__(self, workers: int, max_pending: int, start_method: str):
+        """Hash in `workers` processes started with `start_method`, accepting at most `max_pending` passwords"""
+        self.workers = workers
+        self.start_method = start_method
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_setup_worker,
+                )
+            return self._executor
+
+    def _submit(self, password: str) -> Future:
+        if not self._pending.acquire(blocking=False):
+            raise PasswordHashingBusyError
+        try:
+            future = self.executor.submit(make_password, password)
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    def hash(self, password: str) -> str:  # noqa: A003
+        if not self.workers:
+            return make_password(password)
+        return self._submit(password).result()
+
+    async def ahash(self, password: str) -> str:
+        if not self.workers:
+            return await sync_to_async(make_password, thread_sensitive=False)(password)
+        return await asyncio.wrap_future(self._submit(password))
+
+    def hash_many(self, passwords: list[str]) -> list[str]:
+        """Hash a batch on all workers, for commands which have nothing else to do meanwhile"""
+        if not self.workers:
+            return [make_password(password) for password in passwords]
+        chunksize = max(len(passwords) // (self.workers * 4), 1)
+        return list(self.executor.map(make_password, passwords, chunksize=chunksize))
+
+    def warm_up(self) -> None:
+        """Start all workers, so the first signups do not wait for them"""
+        if self.workers:
+            for future in [self.executor.submit(_setup_worker) for _ in range(self.workers)]:
+                future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+password_hashing_pool = PasswordHashingPool(
+    workers=settings.PASSWORD_HASHING_WORKERS,
+    max_pending=settings.PASSWORD_HASHING_MAX_PENDING,
+    start_method=settings.PASSWORD_HASHING_START_METHOD,
+)
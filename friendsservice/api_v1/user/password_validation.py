@@ -0,0 +1,32 @@
+import hashlib
+from array import array
+from bisect import bisect_left
+
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.contrib.auth.password_validation import CommonPasswordValidator
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext as _
+
+
+class CompactCommonPasswordValidator(CommonPasswordValidator):
+    """`CommonPasswordValidator` keeping 64-bit digests of the common passwords in a sorted array.
+
+    The array takes 8 bytes per password, about twenty times less than the set of strings, and is built once
+    per process when the validators are loaded at startup.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Load the common passwords file as `CommonPasswordValidator` does and keep only their digests"""
+        super().__init__(*args, **kwargs)
+        self.digests = array('Q', sorted({self._digest(password) for password in self.passwords}))
+        del self.passwords
+
+    @staticmethod
+    def _digest(password: str) -> int:
+        return int.from_bytes(hashlib.blake2b(password.encode(), digest_size=8).digest(), 'big')
+
+    def validate(self, password: str, user: AbstractBaseUser | None = None) -> None:  # noqa: ARG002
+        digest = self._digest(password.lower().strip())
+        index = bisect_left(self.digests, digest)
+        if index < len(self.digests) and self.digests[index] == digest:
+            raise ValidationError(_('This password is too common.'), code='password_too_common')
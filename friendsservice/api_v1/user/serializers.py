@@ -1,7 +1,8 @@
-from django.contrib.auth.models import User
+from django.conf import settings
 from rest_framework import serializers
 
-from friendsservice.friendship.models import UserFriendship
+from friendsservice.friendship.models import FriendshipEventType
+from friendsservice.friendship.services.pair_status import PairStatus
 
 
 class UserDataSerializer(serializers.Serializer):
@@ -26,28 +27,134 @@ class UsernameSerializer(serializers.Serializer):
     username = serializers.CharField()
 
 
-class UsernameField(serializers.RelatedField):
-    username = serializers.CharField()
+class UsernamesSerializer(serializers.Serializer):
+    usernames = serializers.ListField(
+        child=serializers.CharField(), allow_empty=False, max_length=settings.FRIENDSHIP_BULK_MAX_SIZE
+    )
+
+
+class FriendshipIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=settings.FRIENDSHIP_BULK_MAX_SIZE
+    )
+
+
+class UsernamesQuerySerializer(serializers.Serializer):
+    usernames = serializers.CharField(help_text='Comma separated usernames')
+
+    def validate_usernames(self, value: str) -> list[str]:
+        usernames = [username.strip() for username in value.split(',') if username.strip()]
+        if not usernames:
+            message = 'This field may not be blank.'
+            raise serializers.ValidationError(message)
+        if len(usernames) > settings.FRIENDSHIP_BULK_MAX_SIZE:
+            message = f'Ensure this field has no more than {settings.FRIENDSHIP_BULK_MAX_SIZE} usernames.'
+            raise serializers.ValidationError(message)
+        return usernames
+
+
+class BulkResultSerializer(serializers.Serializer):
+    results = serializers.DictField(child=serializers.CharField())
+
+
+class SentFriendshipRequestSerializer(serializers.Serializer):
+    id = serializers.IntegerField()  # noqa: A003
+    recipient = serializers.CharField()
+
+
+class ReceivedFriendshipRequestSerializer(serializers.Serializer):
+    id = serializers.IntegerField()  # noqa: A003
+    sender = serializers.CharField()
+
+
+class SentFriendshipRequestsSerializer(serializers.Serializer):
+    requests = SentFriendshipRequestSerializer(many=True)
+    next = serializers.CharField(allow_null=True)  # noqa: A003
+
+
+class ReceivedFriendshipRequestsSerializer(serializers.Serializer):
+    requests = ReceivedFriendshipRequestSerializer(many=True)
+    next = serializers.CharField(allow_null=True)  # noqa: A003
+
+
+class RowsSerializer:
+    """Serializes `values_list` rows of JSON-ready values to dicts without DRF fields overhead"""
+
+    fields: tuple[str, ...]
+
+    def __init__(self, rows: list[tuple]):
+        """Serialize rows of `fields` values"""
+        self.rows = rows
+
+    @property
+    def data(self) -> list[dict]:
+        return [dict(zip(self.fields, row, strict=True)) for row in self.rows]
+
 
-    def to_representation(self, value: User) -> str:
-        return value.username
+class SentFriendshipRequestRowsSerializer(RowsSerializer):
+    fields = ('id', 'recipient')
 
 
-class SentFriendshipRequestsSerializer(serializers.ModelSerializer):
-    recipient = UsernameField(read_only=True)
+class ReceivedFriendshipRequestRowsSerializer(RowsSerializer):
+    fields = ('id', 'sender')
 
-    class Meta:
-        model = UserFriendship
-        fields = ('id', 'recipient')
 
+class LimitQuerySerializer(serializers.Serializer):
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=settings.FRIENDSHIP_MAX_PAGE_SIZE)
 
-class ReceivedFriendshipRequestsSerializer(serializers.ModelSerializer):
-    sender = UsernameField(read_only=True)
 
-    class Meta:
-        model = UserFriendship
-        fields = ('id', 'sender')
+class PageQuerySerializer(LimitQuerySerializer):
+    cursor = serializers.CharField(required=False)
+
+
+class ChangesQuerySerializer(LimitQuerySerializer):
+    since = serializers.CharField(required=False)
 
 
 class UserFriendsListSerializer(serializers.Serializer):
     friends = serializers.ListField(child=serializers.CharField(), allow_empty=True)
+    next = serializers.CharField(allow_null=True)  # noqa: A003
+
+
+class MutualFriendsSerializer(serializers.Serializer):
+    friends = serializers.ListField(child=serializers.CharField(), allow_empty=True)
+
+
+class FriendSuggestionSerializer(serializers.Serializer):
+    username = serializers.CharField()
+    mutual_friends = serializers.IntegerField()
+
+
+class FriendshipCountersSerializer(serializers.Serializer):
+    friends = serializers.IntegerField()
+    sent_requests = serializers.IntegerField()
+    received_requests = serializers.IntegerField()
+
+
+class FriendshipStatusSerializer(serializers.Serializer):
+    username = serializers.CharField()
+    status = serializers.ChoiceField(choices=[status.value for status in PairStatus])
+    friendship_id = serializers.IntegerField(allow_null=True)
+
+
+class FriendshipStatusesSerializer(serializers.Serializer):
+    statuses = FriendshipStatusSerializer(many=True)
+
+
+class FriendshipEventSerializer(serializers.Serializer):
+    id = serializers.IntegerField()  # noqa: A003
+    type = serializers.ChoiceField(choices=[event_type.value for event_type in FriendshipEventType])  # noqa: A003
+    friendship_id = serializers.IntegerField()
+    sender = serializers.CharField()
+    recipient = serializers.CharField()
+    created_at = serializers.DateTimeField()
+
+
+class FriendshipChangesSerializer(serializers.Serializer):
+    events = FriendshipEventSerializer(many=True)
+    cursor = serializers.CharField(allow_null=True)
+    has_more = serializers.BooleanField()
+
+
+class FriendshipEventRowsSerializer(RowsSerializer):
+    fields = ('id', 'type', 'friendship_id', 'sender', 'recipient', 'created_at')
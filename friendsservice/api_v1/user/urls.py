@@ -2,7 +2,9 @@ from django.urls import path
 
 from friendsservice.api_v1.user.views import (
     CreateUserView, AddUserView, UserSentFriendshipView, UserReceivedFriendshipView, AcceptFriendshipRequestView,
-    DeclineFriendshipRequestView, UserFriendshipView, UserFriendsView
+    DeclineFriendshipRequestView, UserFriendshipView, UserFriendsView, BulkAddUsersView,
+    BulkAcceptFriendshipRequestsView, BulkDeclineFriendshipRequestsView, MutualFriendsView, FriendSuggestionsView,
+    FriendshipStatusesView, FriendshipChangesView, FriendshipCountersView, FriendshipsExportView
 )
 
 app_name = 'user'
@@ -10,6 +12,7 @@ app_name = 'user'
 urlpatterns = [
     path('create/', CreateUserView.as_view(), name='create_user'),
     path('add_to_friends/', AddUserView.as_view(), name='add_to_friends'),
+    path('add_to_friends/bulk/', BulkAddUsersView.as_view(), name='bulk_add_to_friends'),
 
     path('friendship/sent/', UserSentFriendshipView.as_view(), name='sent_requests'),
     path('friendship/received/', UserReceivedFriendshipView.as_view(), name='received_requests'),
@@ -24,7 +27,25 @@ urlpatterns = [
         DeclineFriendshipRequestView.as_view(),
         name='decline_friendship_request'
     ),
+    path(
+        'friendship/bulk/accept/',
+        BulkAcceptFriendshipRequestsView.as_view(),
+        name='bulk_accept_friendship_requests'
+    ),
+    path(
+        'friendship/bulk/decline/',
+        BulkDeclineFriendshipRequestsView.as_view(),
+        name='bulk_decline_friendship_requests'
+    ),
     path('friendship/<str:username>/', UserFriendshipView.as_view(), name='friendship'),
+    # Not under friendship/, where it would shadow the pair route of a user named `status`
+    path('friendship-statuses/', FriendshipStatusesView.as_view(), name='friendship_statuses'),
 
     path('friends/', UserFriendsView.as_view(), name='user_friends'),
+    path('friends/counters/', FriendshipCountersView.as_view(), name='friendship_counters'),
+    path('friends/mutual/<str:username>/', MutualFriendsView.as_view(), name='mutual_friends'),
+    path('friends/suggestions/', FriendSuggestionsView.as_view(), name='friend_suggestions'),
+
+    path('changes/', FriendshipChangesView.as_view(), name='friendship_changes'),
+    path('export/', FriendshipsExportView.as_view(), name='friendships_export'),
 ]
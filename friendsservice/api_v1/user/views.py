@@ -1,36 +1,78 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
-from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.http import StreamingHttpResponse
 from django.utils.translation import gettext_lazy as i18n
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from friendsservice.api_v1.async_views import AsyncAPIView
+from friendsservice.api_v1.conditional import conditional_on_friendship_version
+from friendsservice.api_v1.idempotency import idempotency_key_parameter, idempotent
+from friendsservice.api_v1.renderers import CsvRenderer, NdjsonRenderer
 from friendsservice.api_v1.user.handlers import ValidatePasswordHandler
+from friendsservice.api_v1.user.hashing import PasswordHashingBusyError, password_hashing_pool
 from friendsservice.api_v1.user.serializers import (
-    UserDataSerializer, UserCreationErrorSerializer, UsernameSerializer, CreateFriendshipErrorSerializer,
-    SentFriendshipRequestsSerializer, ReceivedFriendshipRequestsSerializer, UserFriendsListSerializer
+    BulkResultSerializer,
+    ChangesQuerySerializer,
+    CreateFriendshipErrorSerializer,
+    FriendshipChangesSerializer,
+    FriendshipCountersSerializer,
+    FriendshipEventRowsSerializer,
+    FriendshipIdsSerializer,
+    FriendshipStatusesSerializer,
+    FriendshipStatusSerializer,
+    FriendSuggestionSerializer,
+    LimitQuerySerializer,
+    MutualFriendsSerializer,
+    PageQuerySerializer,
+    ReceivedFriendshipRequestRowsSerializer,
+    ReceivedFriendshipRequestsSerializer,
+    SentFriendshipRequestRowsSerializer,
+    SentFriendshipRequestsSerializer,
+    UserCreationErrorSerializer,
+    UserDataSerializer,
+    UserFriendsListSerializer,
+    UsernameSerializer,
+    UsernamesQuerySerializer,
+    UsernamesSerializer,
 )
 from friendsservice.friendship.exceptions import (
-    UserCannotBeFriendError, FriendshipRequestAlreadyExistsError, UserDoesNotExistsError,
-    FriendshipRequestDoesNotExistsError, HasActiveFriendship, UserNotInFriendsListError
+    FriendshipRequestAlreadyExistsError,
+    FriendshipRequestDoesNotExistsError,
+    InvalidCursorError,
+    UserCannotBeFriendError,
+    UserDoesNotExistsError,
+    UserNotInFriendsListError,
 )
+from friendsservice.friendship.export import FriendshipExport
 from friendsservice.friendship.models import FriendshipStatus
+from friendsservice.friendship.routers import achoose_read_alias
 from friendsservice.friendship.services.add_to_friends import AddToFriendsService
+from friendsservice.friendship.services.bulk_add_to_friends import BulkAddToFriendsService
+from friendsservice.friendship.services.bulk_change_status import BulkChangeFriendshipStatusService
 from friendsservice.friendship.services.change_status import ChangeFriendshipStatusService
-from friendsservice.friendship.services.check_status import CheckFriendshipStatusService
+from friendsservice.friendship.services.changes import GetFriendshipChangesService
+from friendsservice.friendship.services.counters import GetFriendshipCountersService
 from friendsservice.friendship.services.delete_from_friends import DeleteFromFriendsService
+from friendsservice.friendship.services.friend_suggestions import GetFriendSuggestionsService
 from friendsservice.friendship.services.get_friends_list import GetFriendsListService
+from friendsservice.friendship.services.mutual_friends import GetMutualFriendsService
+from friendsservice.friendship.services.pair_status import FriendshipPairStatus, GetFriendshipStatusService, PairStatus
 from friendsservice.friendship.services.received_requests import GetReceivedFriendshipRequestsService
 from friendsservice.friendship.services.sent_requests import GetSentFriendshipRequestsService
 
 User = get_user_model()
 
 
-class CreateUserView(APIView):
+class CreateUserView(AsyncAPIView):
+    query_budgets = {'POST': 2}
 
     @extend_schema(
         description=i18n('Create new user'),
@@ -38,42 +80,49 @@ class CreateUserView(APIView):
         responses={
             200: None,
             400: UserCreationErrorSerializer,
+            503: None,
         },
         methods=['POST']
     )
-    def post(self, request: Request) -> Response:
+    async def post(self, request: Request) -> Response:
         serializer = UserDataSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer_data = serializer.data
 
+        # Validators are loaded at startup, validation does not touch the database
         try:
             ValidatePasswordHandler(serializer_data['password']).validate()
         except ValidationError as exc:
             return Response({'error': {'password': exc.messages}}, status=400)
 
-        already_exists = User.objects.filter(username=serializer_data['username']).exists()
-        if already_exists:
-            return Response({'error': {'username': ['User already exists']}}, status=400)
+        try:
+            password = await password_hashing_pool.ahash(serializer_data['password'])
+        except PasswordHashingBusyError:
+            return Response(status=503, headers={'Retry-After': '1'})
 
-        User.objects.create(
-            username=serializer_data['username'],
-            password=make_password(serializer_data['password'])
-        )
+        # The unique username constraint is the existence check, concurrent signups of one username included
+        try:
+            await User.objects.acreate(username=serializer_data['username'], password=password)
+        except IntegrityError:
+            return Response({'error': {'username': ['User already exists']}}, status=400)
         return Response(status=200)
 
 
 class AddUserView(APIView):
     permission_classes = [IsAuthenticated]
+    query_budgets = {'POST': 9}
 
     @extend_schema(
         description=i18n('Send friendship request to user'),
         request=UsernameSerializer,
+        parameters=[idempotency_key_parameter],
         responses={
             200: None,
             400: CreateFriendshipErrorSerializer,
         },
         methods=['POST']
     )
+    @idempotent
     def post(self, request: Request) -> Response:
         serializer = UsernameSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -88,42 +137,83 @@ class AddUserView(APIView):
         return Response(status=200)
 
 
-class UserSentFriendshipView(APIView):
+class BulkAddUsersView(APIView):
+    permission_classes = [IsAuthenticated]
+    query_budgets = {'POST': 14}
+
+    @extend_schema(
+        description=i18n('Send friendship requests to several users'),
+        request=UsernamesSerializer,
+        responses={
+            200: BulkResultSerializer,
+        },
+        methods=['POST']
+    )
+    def post(self, request: Request) -> Response:
+        serializer = UsernamesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = BulkAddToFriendsService(sender=request.user, recipient_usernames=serializer.data['usernames'])()
+        return Response({'results': {username: result.value for username, result in results.items()}}, status=200)
+
+
+class UserSentFriendshipView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
+    query_budgets = {'GET': 1}
 
     @extend_schema(
         description=i18n('Get sent friendship requests list'),
+        parameters=[PageQuerySerializer],
         responses={
-            200: SentFriendshipRequestsSerializer(many=True)
+            200: SentFriendshipRequestsSerializer(),
+            400: CreateFriendshipErrorSerializer,
         },
         methods=['GET']
     )
-    def get(self, request: Request) -> Response:
-        service_result = GetSentFriendshipRequestsService(user=request.user)()
-        serialized_data = SentFriendshipRequestsSerializer(data=service_result, many=True)
-        serialized_data.is_valid()
-        return Response(data=serialized_data.data, status=200)
+    @conditional_on_friendship_version
+    async def get(self, request: Request) -> Response:
+        query_serializer = PageQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+
+        try:
+            page = await GetSentFriendshipRequestsService(user=request.user, **query_serializer.validated_data).acall()
+        except InvalidCursorError:
+            return Response({'error': 'Invalid cursor'}, status=400)
+        requests = SentFriendshipRequestRowsSerializer(page.items).data
+        return Response({'requests': requests, 'next': page.next_cursor}, status=200)
 
 
-class UserReceivedFriendshipView(APIView):
+class UserReceivedFriendshipView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
+    query_budgets = {'GET': 1}
 
     @extend_schema(
         description=i18n('Get received friendship requests list'),
+        parameters=[PageQuerySerializer],
         responses={
-            200: ReceivedFriendshipRequestsSerializer(many=True)
+            200: ReceivedFriendshipRequestsSerializer(),
+            400: CreateFriendshipErrorSerializer,
         },
         methods=['GET']
     )
-    def get(self, request: Request) -> Response:
-        service_result = GetReceivedFriendshipRequestsService(user=request.user)()
-        serialized_data = ReceivedFriendshipRequestsSerializer(data=service_result, many=True)
-        serialized_data.is_valid()
-        return Response(data=serialized_data.data, status=200)
+    @conditional_on_friendship_version
+    async def get(self, request: Request) -> Response:
+        query_serializer = PageQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+
+        try:
+            page = await GetReceivedFriendshipRequestsService(
+                user=request.user, **query_serializer.validated_data
+            ).acall()
+        except InvalidCursorError:
+            return Response({'error': 'Invalid cursor'}, status=400)
+        requests = ReceivedFriendshipRequestRowsSerializer(page.items).data
+        return Response({'requests': requests, 'next': page.next_cursor}, status=200)
 
 
 class AcceptFriendshipRequestView(APIView):
     permission_classes = [IsAuthenticated]
+    query_budgets = {'GET': 6}
 
     @extend_schema(
         description=i18n('Accept friendship request'),
@@ -144,6 +234,7 @@ class AcceptFriendshipRequestView(APIView):
 
 class DeclineFriendshipRequestView(APIView):
     permission_classes = [IsAuthenticated]
+    query_budgets = {'GET': 6}
 
     @extend_schema(
         description=i18n('Decline friendship request'),
@@ -161,25 +252,95 @@ class DeclineFriendshipRequestView(APIView):
         return Response(status=200)
 
 
-class UserFriendshipView(APIView):
+class BulkChangeFriendshipStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+    query_budgets = {'POST': 8}
+    status: FriendshipStatus
+
+    def post(self, request: Request) -> Response:
+        serializer = FriendshipIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = BulkChangeFriendshipStatusService(
+            user=request.user, friendship_ids=serializer.data['ids'], status=self.status
+        )()
+        return Response({'results': {str(id_): result.value for id_, result in results.items()}}, status=200)
+
+
+@extend_schema(
+    description=i18n('Accept several received friendship requests'),
+    request=FriendshipIdsSerializer,
+    responses={
+        200: BulkResultSerializer,
+    },
+    methods=['POST']
+)
+class BulkAcceptFriendshipRequestsView(BulkChangeFriendshipStatusView):
+    status = FriendshipStatus.CONFIRMED
+
+
+@extend_schema(
+    description=i18n('Decline several received friendship requests'),
+    request=FriendshipIdsSerializer,
+    responses={
+        200: BulkResultSerializer,
+    },
+    methods=['POST']
+)
+class BulkDeclineFriendshipRequestsView(BulkChangeFriendshipStatusView):
+    status = FriendshipStatus.DECLINED
+
+
+def serialize_friendship_status(pair_status: FriendshipPairStatus) -> dict[str, str | int | None]:
+    """Serialize a status of `GetFriendshipStatusService` to a JSON-ready dict"""
+    return {
+        'username': pair_status.username,
+        'status': pair_status.status.value,
+        'friendship_id': pair_status.friendship_id,
+    }
+
+
+class FriendshipStatusesView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    query_budgets = {'GET': 1}
+
+    @extend_schema(
+        description=i18n('Get friendship statuses with several users'),
+        parameters=[UsernamesQuerySerializer],
+        responses={
+            200: FriendshipStatusesSerializer(),
+        },
+        methods=['GET']
+    )
+    async def get(self, request: Request) -> Response:
+        query_serializer = UsernamesQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+
+        statuses = await GetFriendshipStatusService(
+            user=request.user, target_usernames=query_serializer.validated_data['usernames']
+        ).acall()
+        return Response({'statuses': [serialize_friendship_status(status) for status in statuses]}, status=200)
+
+
+class UserFriendshipView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
+    query_budgets = {'GET': 1, 'DELETE': 8}
 
     @extend_schema(
         description=i18n('Get friendship with user status'),
         responses={
-            200: None
+            200: FriendshipStatusSerializer(),
+            404: None,
         },
         methods=['GET']
     )
-    def get(self, request: Request, **kwargs) -> Response:
-        target_username = kwargs['username']
-        try:
-            CheckFriendshipStatusService(target_username=target_username)()
-        except FriendshipRequestDoesNotExistsError:
-            return Response({'message': f'Not found active friendship with {target_username}'}, status=200)
-        except HasActiveFriendship as exc:
-            return Response({'message': exc.friendship_status}, status=200)
-        return Response(status=400)
+    async def get(self, request: Request, **kwargs) -> Response:
+        pair_status, = await GetFriendshipStatusService(
+            user=request.user, target_usernames=[kwargs['username']]
+        ).acall()
+        if pair_status.status == PairStatus.NOT_FOUND:
+            return Response(status=404)
+        return Response(serialize_friendship_status(pair_status), status=200)
 
     @extend_schema(
         description=i18n('Delete user from friends'),
@@ -189,23 +350,153 @@ class UserFriendshipView(APIView):
         },
         methods=['DELETE']
     )
-    def delete(self, request: Request, **kwargs) -> Response:
+    async def delete(self, request: Request, **kwargs) -> Response:
         try:
-            DeleteFromFriendsService(sender=request.user, target_username=kwargs['username'])()
+            await sync_to_async(self._delete_from_friends)(request.user, kwargs['username'])
         except (UserNotInFriendsListError, UserDoesNotExistsError):
             return Response(status=404)
         return Response(status=200)
 
+    @staticmethod
+    def _delete_from_friends(user: User, target_username: str) -> None:
+        DeleteFromFriendsService(sender=user, target_username=target_username)()
+
 
-class UserFriendsView(APIView):
+class UserFriendsView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
+    query_budgets = {'GET': 1}
 
     @extend_schema(
         description=i18n('Get friends list'),
+        parameters=[PageQuerySerializer],
         responses={
-            200: UserFriendsListSerializer()
+            200: UserFriendsListSerializer(),
+            400: CreateFriendshipErrorSerializer,
         },
         methods=['GET']
     )
-    def get(self, request: Request) -> Response:
-        return Response(GetFriendsListService(user=request.user)(), status=200)
+    @conditional_on_friendship_version
+    async def get(self, request: Request) -> Response:
+        query_serializer = PageQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+
+        try:
+            page = await GetFriendsListService(user=request.user, **query_serializer.validated_data).acall()
+        except InvalidCursorError:
+            return Response({'error': 'Invalid cursor'}, status=400)
+        return Response({'friends': page.items, 'next': page.next_cursor}, status=200)
+
+
+class FriendshipCountersView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    query_budgets = {'GET': 5}
+
+    @extend_schema(
+        description=i18n('Get friends, sent and received requests counts'),
+        responses={
+            200: FriendshipCountersSerializer(),
+        },
+        methods=['GET']
+    )
+    async def get(self, request: Request) -> Response:
+        counters = await GetFriendshipCountersService(user=request.user).acall()
+        return Response(counters, status=200)
+
+
+class MutualFriendsView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    query_budgets = {'GET': 2}
+
+    @extend_schema(
+        description=i18n('Get mutual friends with user'),
+        parameters=[LimitQuerySerializer],
+        responses={
+            200: MutualFriendsSerializer(),
+            404: None,
+        },
+        methods=['GET']
+    )
+    async def get(self, request: Request, **kwargs) -> Response:
+        query_serializer = LimitQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+
+        try:
+            mutual_friends = await GetMutualFriendsService(
+                user=request.user, target_username=kwargs['username'], **query_serializer.validated_data
+            ).acall()
+        except UserDoesNotExistsError:
+            return Response(status=404)
+        return Response({'friends': mutual_friends}, status=200)
+
+
+class FriendSuggestionsView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    query_budgets = {'GET': 1}
+
+    @extend_schema(
+        description=i18n('Get people you may know, ranked by mutual friends count'),
+        parameters=[LimitQuerySerializer],
+        responses={
+            200: FriendSuggestionSerializer(many=True),
+        },
+        methods=['GET']
+    )
+    async def get(self, request: Request) -> Response:
+        query_serializer = LimitQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+
+        suggestions = await GetFriendSuggestionsService(user=request.user, **query_serializer.validated_data).acall()
+        return Response(suggestions, status=200)
+
+
+class FriendshipChangesView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    query_budgets = {'GET': 1}
+
+    @extend_schema(
+        description=i18n('Get friendship events after the cursor, for incremental sync'),
+        parameters=[ChangesQuerySerializer],
+        responses={
+            200: FriendshipChangesSerializer(),
+            400: CreateFriendshipErrorSerializer,
+        },
+        methods=['GET']
+    )
+    async def get(self, request: Request) -> Response:
+        query_serializer = ChangesQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+
+        try:
+            page = await GetFriendshipChangesService(user=request.user, **query_serializer.validated_data).acall()
+        except InvalidCursorError:
+            return Response({'error': 'Invalid cursor'}, status=400)
+        return Response({
+            'events': FriendshipEventRowsSerializer(page.events).data,
+            'cursor': page.cursor,
+            'has_more': page.has_more,
+        }, status=200)
+
+
+class FriendshipsExportView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    # Chosen by Accept header or `format` query parameter, NDJSON by default
+    renderer_classes = [NdjsonRenderer, CsvRenderer]
+    # Rows are read while the response streams, after the view and the middleware have finished
+    query_budgets = {'GET': 0}
+
+    @extend_schema(
+        description=i18n('Export all friendships and requests of the user as NDJSON or CSV'),
+        responses={
+            200: OpenApiTypes.STR,
+        },
+        methods=['GET']
+    )
+    async def get(self, request: Request) -> StreamingHttpResponse:
+        renderer = request.accepted_renderer
+        using = await achoose_read_alias(request.user.id)
+        export = FriendshipExport(renderer.format, user_id=request.user.id, using=using)
+        return StreamingHttpResponse(
+            export.achunks(),
+            content_type=f'{renderer.media_type}; charset=utf-8',
+            headers={'Content-Disposition': f'attachment; filename="friendships.{renderer.format}"'},
+        )
@@ -16,6 +16,10 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "friendsservice.settings")
 
 django_app = get_asgi_application()
 
+from friendsservice.api_v1.user.hashing import password_hashing_pool  # noqa: E402
+
+password_hashing_pool.warm_up()
+
 
 async def application(scope: dict, receive: Callable, send: Callable):
     if scope['type'] == 'http':
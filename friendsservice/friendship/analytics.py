@@ -0,0 +1,82 @@
+"""Statistics of the friend graph computed over a snapshot written by `snapshot_friend_graph` command.
+
+Requires `numpy`, which is not a dependency of the service itself: `pip install numpy`.
+"""
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+
+@dataclass
+class FriendGraph:
+    node_ids: np.ndarray
+    offsets: np.ndarray
+    neighbors: np.ndarray
+
+    @classmethod
+    def load(cls, directory: Path) -> 'FriendGraph':
+        """Memory-map the snapshot arrays, pages are read from disk as they are used"""
+        names = ('node_ids', 'offsets', 'neighbors')
+        return cls(*(np.load(directory / f'{name}.npy', mmap_mode='r') for name in names))
+
+    @property
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def degree_distribution(self) -> dict[int, int]:
+        """Count users by number of friends"""
+        counts = np.bincount(self.degrees)
+        return {int(degree): int(counts[degree]) for degree in np.flatnonzero(counts)}
+
+    def top_connected(self, limit: int) -> list[tuple[int, int]]:
+        """User ids and friends counts of the users with most friends"""
+        degrees = self.degrees
+        limit = min(limit, len(degrees))
+        top = np.argpartition(degrees, -limit)[-limit:] if limit else np.array([], dtype=np.int64)
+        top = top[np.lexsort((self.node_ids[top], -degrees[top]))]
+        return [(int(self.node_ids[node]), int(degrees[node])) for node in top]
+
+    def component_labels(self) -> np.ndarray:
+        """Smallest node index of the connected component of every node.
+
+        Every round hooks each node to the smallest label among its friends and then shortcuts label chains,
+        so the number of rounds grows with the logarithm of component diameters, not with the number of nodes.
+        """
+        sources = np.repeat(np.arange(len(self.node_ids)), self.degrees)
+        labels = np.arange(len(self.node_ids))
+        while True:
+            hooked = labels.copy()
+            np.minimum.at(hooked, labels[sources], labels[self.neighbors])
+            while not np.array_equal(hooked, hooked[hooked]):
+                hooked = hooked[hooked]
+            if np.array_equal(hooked, labels):
+                return labels
+            labels = hooked
+
+    def components(self) -> dict[str, int | dict[int, int]]:
+        sizes = np.bincount(self.component_labels())
+        sizes = sizes[sizes > 0]
+        size_counts = np.bincount(sizes)
+        return {
+            'count': int(len(sizes)),
+            'largest': int(sizes.max()) if len(sizes) else 0,
+            'sizes': {int(size): int(size_counts[size]) for size in np.flatnonzero(size_counts)},
+        }
+
+    def statistics(self, top_limit: int) -> dict:
+        degrees = self.degrees
+        return {
+            'nodes': int(len(self.node_ids)),
+            'edges': int(len(self.neighbors) // 2),
+            'average_degree': float(degrees.mean()) if len(degrees) else 0.0,
+            'degree_distribution': self.degree_distribution(),
+            'top_connected': self.top_connected(top_limit),
+            'components': self.components(),
+        }
+
+
+def snapshot_statistics(directory: Path, top_limit: int = 10) -> str:
+    """Statistics of the snapshot in the directory as indented JSON"""
+    return json.dumps(FriendGraph.load(directory).statistics(top_limit), indent=2)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FriendshipConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "friendsservice.friendship"
+
+    def ready(self) -> None:
+        # Creates friendship counters of new users
+        from friendsservice.friendship import signals  # noqa: F401
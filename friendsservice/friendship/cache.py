@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import TypeVar
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+
+T = TypeVar('T')
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded in-process cache, evicts least recently used keys first"""
+
+    def __init__(self, max_size: int):
+        """Keep at most `max_size` keys"""
+        self.max_size = max_size
+        self._data: OrderedDict[str, object] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default: object = None) -> object:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key: str, value: object) -> None:  # noqa: A003
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class FriendGraphCache:
+    """Read-through cache of per-user friendship reads.
+
+    Every user has a version stored in the shared cache; cached values are keyed by it, so a write only has to
+    bump the versions of both users of the pair. Values are looked up in the in-process LRU first and in the shared
+    cache (`settings.FRIENDSHIP_CACHE_ALIAS`) next. The version is a nanosecond timestamp of the last change.
+    """
+
+    def __init__(self, alias: str, local_max_size: int, timeout: int):
+        """Use cache `alias` with values kept for `timeout` seconds, and a local LRU of `local_max_size` keys"""
+        self.alias = alias
+        self.timeout = timeout
+        self.local = LRUCache(local_max_size)
+        self._stats_lock = threading.Lock()
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self.alias]
+
+    @staticmethod
+    def _version_key(user_id: int) -> str:
+        return f'friendship:version:{user_id}'
+
+    def version(self, user_id: int) -> int:
+        key = self._version_key(user_id)
+        version = self.shared.get(key)
+        if version is None:
+            self.shared.add(key, time.time_ns(), timeout=None)
+            version = self.shared.get(key)
+        return version
+
+    async def aversion(self, user_id: int) -> int:
+        key = self._version_key(user_id)
+        version = await self.shared.aget(key)
+        if version is None:
+            await self.shared.aadd(key, time.time_ns(), timeout=None)
+            version = await self.shared.aget(key)
+        return version
+
+    @staticmethod
+    def _changed_within(version: int | None, seconds: float) -> bool:
+        return version is not None and time.time_ns() - version < seconds * 1_000_000_000
+
+    def changed_within(self, user_id: int, seconds: float) -> bool:
+        return self._changed_within(self.shared.get(self._version_key(user_id)), seconds)
+
+    async def achanged_within(self, user_id: int, seconds: float) -> bool:
+        return self._changed_within(await self.shared.aget(self._version_key(user_id)), seconds)
+
+    @staticmethod
+    def _key(user_id: int, version: int, name: str) -> str:
+        return f'friendship:{user_id}:{version}:{name}'
+
+    def _count_shared(self, value: object) -> None:
+        with self._stats_lock:
+            if value is _MISSING:
+                self.shared_misses += 1
+            else:
+                self.shared_hits += 1
+
+    def _lookup(self, key: str) -> object:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        value = self.shared.get(key, _MISSING)
+        self._count_shared(value)
+        if value is not _MISSING:
+            self.local.set(key, value)
+        return value
+
+    async def _alookup(self, key: str) -> object:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        value = await self.shared.aget(key, _MISSING)
+        self._count_shared(value)
+        if value is not _MISSING:
+            self.local.set(key, value)
+        return value
+
+    def _store(self, key: str, value: object) -> None:
+        self.shared.set(key, value, timeout=self.timeout)
+        self.local.set(key, value)
+
+    async def _astore(self, key: str, value: object) -> None:
+        await self.shared.aset(key, value, timeout=self.timeout)
+        self.local.set(key, value)
+
+    def get_or_set(
+        self, user_id: int, name: str, default: Callable[[], T], cache_if: Callable[[T], bool] | None = None
+    ) -> T:
+        key = self._key(user_id, self.version(user_id), name)
+        value = self._lookup(key)
+        if value is _MISSING:
+            value = default()
+            if cache_if is None or cache_if(value):
+                self._store(key, value)
+        return value
+
+    async def aget_or_set(
+        self, user_id: int, name: str, default: Callable[[], Awaitable[T]], cache_if: Callable[[T], bool] | None = None
+    ) -> T:
+        # Shared cache clients are blocking, their async methods keep round trips off the event loop
+        key = self._key(user_id, await self.aversion(user_id), name)
+        value = await self._alookup(key)
+        if value is _MISSING:
+            value = await default()
+            if cache_if is None or cache_if(value):
+                await self._astore(key, value)
+        return value
+
+    def invalidate(self, *user_ids: int) -> None:
+        version = time.time_ns()
+        self.shared.set_many({self._version_key(user_id): version for user_id in user_ids}, timeout=None)
+
+    def invalidate_on_commit(self, *user_ids: int) -> None:
+        transaction.on_commit(partial(self.invalidate, *user_ids))
+
+    def clear(self) -> None:
+        self.local.clear()
+        self.shared.clear()
+
+    def metrics(self) -> list[tuple[str, str, int]]:
+        """Name, Prometheus type and value of the cache metrics, collected by the `/metrics` registry"""
+        with self._stats_lock:
+            shared_hits, shared_misses = self.shared_hits, self.shared_misses
+        return [
+            ('friendship_cache_local_size', 'gauge', len(self.local)),
+            ('friendship_cache_local_hits_total', 'counter', self.local.hits),
+            ('friendship_cache_local_misses_total', 'counter', self.local.misses),
+            ('friendship_cache_local_evictions_total', 'counter', self.local.evictions),
+            ('friendship_cache_shared_hits_total', 'counter', shared_hits),
+            ('friendship_cache_shared_misses_total', 'counter', shared_misses),
+        ]
+
+
+friend_graph_cache = FriendGraphCache(
+    alias=settings.FRIENDSHIP_CACHE_ALIAS,
+    local_max_size=settings.FRIENDSHIP_CACHE_LOCAL_MAX_SIZE,
+    timeout=settings.FRIENDSHIP_CACHE_TIMEOUT,
+)
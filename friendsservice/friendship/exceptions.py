@@ -22,8 +22,9 @@ class UserNotInFriendsListError(Exception):
     """User not in friends list"""
 
 
-class HasActiveFriendship(Exception):
-    """Has active friendship"""
+class InvalidCursorError(Exception):
+    """Pagination cursor cannot be decoded"""
 
-    def __init__(self, friendship_status: str):
-        self.friendship_status = friendship_status
+
+class EventSinkError(Exception):
+    """Friendship events were not accepted by the sink"""
@@ -0,0 +1,127 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Iterable, Iterator
+from datetime import datetime
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q, QuerySet, Value
+
+from friendsservice.friendship.models import BlockedFriendshipPair, FriendshipStatus, UserFriendship
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+EXPORT_FIELDS = ('id', 'sender_id', 'sender', 'recipient_id', 'recipient', 'status', 'updated_at')
+STATUS_LABELS = {item.value: item.name.lower() for item in FriendshipStatus}
+
+ExportRow = tuple[int, int, str, int, str, int, datetime]
+
+
+class FriendshipExport:
+    """Friendships of any status with usernames of both sides, encoded as NDJSON lines or CSV rows.
+
+    Friendships are exported in id order, followed by the declined ones compacted into blocked pairs, in the order
+    of their friendship ids. Without `user_id` all friendships are exported, for warehouse loads.
+
+    Rows are read with a server-side cursor and encoded by chunks of `chunk_size` rows, so memory does not depend
+    on the number of friendships. Server-side cursors are disabled behind a transaction pooler, where rows are read
+    by keyset pages of `chunk_size` rows instead; pages are separate queries, so without REPEATABLE READ they may
+    see changes committed during the export.
+    """
+
+    def __init__(
+        self, file_format: str, user_id: int | None = None, chunk_size: int | None = None, using: str | None = None
+    ):
+        """Export friendships of `user_id`, or all of them, in one of `EXPORT_FORMATS` from database `using`"""
+        self.file_format = file_format
+        self.user_id = user_id
+        self.chunk_size = chunk_size or settings.FRIENDSHIP_EXPORT_CHUNK_SIZE
+        self.using = using
+        self.exported = 0
+        self._buffer = io.StringIO()
+        self._csv_writer = csv.writer(self._buffer)
+
+    def _user_filter(self) -> Q:
+        # Served by the unique pair indexes and the user_high indexes
+        return Q(user_low=self.user_id) | Q(user_high=self.user_id) if self.user_id is not None else Q()
+
+    def _friendships(self) -> QuerySet[UserFriendship]:
+        return UserFriendship.objects.using(self.using).filter(self._user_filter()).order_by('id').values_list(
+            'id', 'sender_id', 'sender__username', 'recipient_id', 'recipient__username', 'status', 'updated_at'
+        )
+
+    def _blocked_pairs(self) -> QuerySet[BlockedFriendshipPair]:
+        # Senders of compacted friendships are not kept, the pair is reported in user id order
+        blocked_pairs = BlockedFriendshipPair.objects.using(self.using).filter(self._user_filter()).annotate(
+            status=Value(FriendshipStatus.DECLINED.value)
+        )
+        return blocked_pairs.order_by('friendship_id').values_list(
+            'friendship_id', 'user_low_id', 'user_low__username', 'user_high_id', 'user_high__username', 'status',
+            'declined_at',
+        )
+
+    @staticmethod
+    def _values(row: ExportRow) -> tuple[int | str, ...]:
+        friendship_id, sender_id, sender, recipient_id, recipient, status, updated_at = row
+        return friendship_id, sender_id, sender, recipient_id, recipient, STATUS_LABELS[status], updated_at.isoformat()
+
+    def _write_csv(self, rows: Iterable[tuple]) -> str:
+        self._csv_writer.writerows(rows)
+        chunk = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return chunk
+
+    def _encode(self, rows: list[ExportRow]) -> str:
+        self.exported += len(rows)
+        values = map(self._values, rows)
+        if self.file_format == 'csv':
+            return self._write_csv(values)
+        return ''.join(json.dumps(dict(zip(EXPORT_FIELDS, row, strict=True))) + '\n' for row in values)
+
+    def _header(self) -> str:
+        return self._write_csv([EXPORT_FIELDS]) if self.file_format == 'csv' else ''
+
+    def _cursor_chunks(self, rows: QuerySet) -> Iterator[list[ExportRow]]:
+        iterator = rows.iterator(chunk_size=self.chunk_size)
+        try:
+            while chunk := list(islice(iterator, self.chunk_size)):
+                yield chunk
+        finally:
+            iterator.close()
+
+    def _keyset_chunks(self, rows: QuerySet, key: str) -> Iterator[list[ExportRow]]:
+        page = rows
+        while chunk := list(page[:self.chunk_size]):
+            yield chunk
+            if len(chunk) < self.chunk_size:
+                return
+            page = rows.filter(**{f'{key}__gt': chunk[-1][0]})
+
+    def _row_chunks(self) -> Iterator[list[ExportRow]]:
+        for rows, key in ((self._friendships(), 'id'), (self._blocked_pairs(), 'friendship_id')):
+            if connections[rows.db].settings_dict['DISABLE_SERVER_SIDE_CURSORS']:
+                yield from self._keyset_chunks(rows, key)
+            else:
+                yield from self._cursor_chunks(rows)
+
+    def chunks(self) -> Iterator[str]:
+        if header := self._header():
+            yield header
+        for rows in self._row_chunks():
+            yield self._encode(rows)
+
+    async def achunks(self) -> AsyncIterator[str]:
+        """ASGI servers stream only asynchronous iterators of a StreamingHttpResponse, synchronous ones are buffered"""
+        if header := self._header():
+            yield header
+        # `aiterator` of Django 4.2 runs values_list queries in the event loop, chunks are fetched in the sync thread
+        row_chunks = self._row_chunks()
+        try:
+            while rows := await sync_to_async(next)(row_chunks, None):
+                yield self._encode(rows)
+        finally:
+            # Closes the server-side cursor when the client goes away in the middle of the export
+            await sync_to_async(row_chunks.close)()
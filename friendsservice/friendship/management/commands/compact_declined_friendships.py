@@ -0,0 +1,34 @@
+import time
+from argparse import ArgumentParser
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from friendsservice.friendship.models import BlockedFriendshipPair
+
+
+class Command(BaseCommand):
+    help = 'Move declined friendships older than the retention window into compact blocked pairs'  # noqa: A003
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument('--retention-days', type=int, default=settings.FRIENDSHIP_DECLINED_RETENTION_DAYS)
+        parser.add_argument('--batch-size', type=int, default=settings.FRIENDSHIP_COMPACTION_BATCH_SIZE)
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Sleep PAUSE seconds between batches to spread the load on the primary and replication',
+        )
+
+    def handle(self, *args, **options) -> None:  # noqa: ARG002
+        declined_before = timezone.now() - timedelta(days=options['retention_days'])
+        compacted_count = 0
+        while True:
+            # Every batch is a short transaction of its own
+            compacted = BlockedFriendshipPair.objects.compact(declined_before, options['batch_size'])
+            compacted_count += compacted
+            if compacted < options['batch_size']:
+                break
+            time.sleep(options['pause'])
+
+        self.stdout.write(f'Compacted {compacted_count} declined friendships')
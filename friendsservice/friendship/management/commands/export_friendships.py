@@ -0,0 +1,49 @@
+from argparse import ArgumentParser
+from contextlib import ExitStack
+from functools import partial
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from friendsservice.friendship.export import EXPORT_FORMATS, FriendshipExport
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Stream friendships and requests of one user, or of all users, into an NDJSON or CSV file'  # noqa: A003
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument('output', help='Path of the output file, - for stdout')
+        parser.add_argument('--username', help='Export friendships of this user only, all friendships by default')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='ndjson')
+        parser.add_argument('--chunk-size', type=int, default=settings.FRIENDSHIP_EXPORT_CHUNK_SIZE)
+        parser.add_argument('--database', default='default', help='Database alias to read from, e.g. a replica')
+
+    def handle(self, *args, **options) -> None:  # noqa: ARG002
+        user_id = None
+        if options['username'] is not None:
+            user_id = User.objects.using(options['database']).filter(
+                username=options['username']
+            ).values_list('id', flat=True).first()
+            if user_id is None:
+                message = f'User {options["username"]} does not exist'
+                raise CommandError(message)
+
+        export = FriendshipExport(options['format'], user_id, options['chunk_size'], options['database'])
+        with ExitStack() as stack:
+            if options['output'] == '-':
+                write = partial(self.stdout.write, ending='')
+            else:
+                write = stack.enter_context(Path(options['output']).open('w', newline='', encoding='utf-8')).write
+            # A cursor declared in autocommit mode is materialized on the server before the first row is sent
+            with transaction.atomic(using=options['database']):
+                for chunk in export.chunks():
+                    write(chunk)
+
+        # Keeps the export alone on stdout
+        report = self.stderr if options['output'] == '-' else self.stdout
+        report.write(f'Exported {export.exported} friendships')
@@ -0,0 +1,22 @@
+from argparse import ArgumentParser
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003
+        'Print degree distribution, most connected users and connected components of a friend graph snapshot'
+    )
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument('directory', type=Path, help='Directory written by snapshot_friend_graph')
+        parser.add_argument('--top', type=int, default=10, help='Number of most connected users')
+
+    def handle(self, *args, **options) -> None:  # noqa: ARG002
+        try:
+            from friendsservice.friendship.analytics import snapshot_statistics
+        except ImportError as exc:
+            message = 'Graph analytics require numpy: pip install numpy'
+            raise CommandError(message) from exc
+        self.stdout.write(snapshot_statistics(options['directory'], options['top']))
@@ -0,0 +1,36 @@
+from argparse import ArgumentParser
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import FriendshipCounters
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Recompute friendship counters of all users from their friendships and repair the drifted ones'  # noqa: A003
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options) -> None:  # noqa: ARG002
+        users_count = drifted_count = 0
+        last_user_id = 0
+        while True:
+            user_ids = list(
+                User.objects.filter(id__gt=last_user_id).order_by('id').values_list('id', flat=True)[
+                    :options['batch_size']
+                ]
+            )
+            if not user_ids:
+                break
+            drifted_user_ids = FriendshipCounters.objects.reconcile(user_ids)
+            if drifted_user_ids:
+                friend_graph_cache.invalidate(*drifted_user_ids)
+            users_count += len(user_ids)
+            drifted_count += len(drifted_user_ids)
+            last_user_id = user_ids[-1]
+
+        self.stdout.write(f'Reconciled {users_count} users, repaired {drifted_count}')
@@ -0,0 +1,42 @@
+import time
+from argparse import ArgumentParser
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from friendsservice.friendship.exceptions import EventSinkError
+from friendsservice.friendship.outbox import OutboxRelay, get_sink
+
+
+class Command(BaseCommand):
+    help = 'Publish friendship events from the outbox to a JSONL file or an HTTP endpoint'  # noqa: A003
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument('sink', help='Path of JSONL file or http(s) URL')
+        parser.add_argument('--batch-size', type=int, default=settings.FRIENDSHIP_EVENTS_RELAY_BATCH_SIZE)
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Keep polling the outbox every INTERVAL seconds instead of exiting once it is empty',
+        )
+
+    def handle(self, *args, **options) -> None:  # noqa: ARG002
+        sink = get_sink(options['sink'])
+        relay = OutboxRelay(sink, options['batch_size'])
+        try:
+            while True:
+                try:
+                    relayed = relay.relay()
+                except EventSinkError as exc:
+                    message = f'Sink did not accept events: {exc.__cause__}'
+                    if options['interval'] is None:
+                        raise CommandError(message) from exc
+                    self.stderr.write(message)
+                    relayed = 0
+
+                if relayed:
+                    self.stdout.write(f'Relayed {relayed} events')
+                if options['interval'] is None:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            sink.close()
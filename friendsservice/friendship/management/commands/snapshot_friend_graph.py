@@ -0,0 +1,19 @@
+from argparse import ArgumentParser
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from friendsservice.friendship.snapshot import FriendGraphSnapshotBuilder
+
+
+class Command(BaseCommand):
+    help = 'Write confirmed friendships into a CSR snapshot of NumPy arrays for `friend_graph_stats`'  # noqa: A003
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument('directory', type=Path)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--database', default='default', help='Database alias to read from, e.g. a replica')
+
+    def handle(self, *args, **options) -> None:  # noqa: ARG002
+        meta = FriendGraphSnapshotBuilder(options['directory'], options['batch_size'], options['database']).build()
+        self.stdout.write(f'Snapshot of {meta.nodes} users and {meta.edges} friendships written')
@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+from django.db.models.functions import Greatest, Least
+import django.db.models.deletion
+
+
+def fill_friendship_pairs(apps, schema_editor):
+    UserFriendship = apps.get_model("friendship", "UserFriendship")
+    UserFriendship.objects.update(
+        user_low=Least("sender", "recipient"), user_high=Greatest("sender", "recipient")
+    )
+
+    # Services always looked at the earliest row of a pair, so it is the one that survives
+    duplicated_pairs = (
+        UserFriendship.objects.values("user_low", "user_high")
+        .annotate(first_id=Min("id"), rows_count=Count("id"))
+        .filter(rows_count__gt=1)
+    )
+    for pair in duplicated_pairs.iterator():
+        UserFriendship.objects.filter(
+            user_low=pair["user_low"], user_high=pair["user_high"]
+        ).exclude(id=pair["first_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("friendship", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userfriendship",
+            name="user_low",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="userfriendship",
+            name="user_high",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(fill_friendship_pairs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="userfriendship",
+            name="user_low",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="userfriendship",
+            name="user_high",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="userfriendship",
+            constraint=models.UniqueConstraint(
+                fields=("user_low", "user_high"), name="unique_friendship_pair"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="userfriendship",
+            constraint=models.CheckConstraint(
+                check=models.Q(user_low__lt=models.F("user_high")),
+                name="ordered_friendship_pair",
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("friendship", "0002_userfriendship_pair"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="userfriendship",
+            index=models.Index(
+                fields=["sender", "status"],
+                include=("recipient",),
+                name="friendship_sender_status",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userfriendship",
+            index=models.Index(
+                fields=["recipient", "status"],
+                include=("sender",),
+                name="friendship_recipient_status",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="userfriendship",
+            name="recipient",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="received_requests",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="userfriendship",
+            name="sender",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="sent_requests",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
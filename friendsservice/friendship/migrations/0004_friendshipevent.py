@@ -0,0 +1,78 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("friendship", "0003_userfriendship_user_status_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FriendshipEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[
+                            ("request_sent", "request_sent"),
+                            ("request_accepted", "request_accepted"),
+                            ("request_declined", "request_declined"),
+                            ("friend_removed", "friend_removed"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("friendship_id", models.BigIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("published_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "recipient",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "sender",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["sender", "id"], name="friendship_event_sender"
+                    ),
+                    models.Index(
+                        fields=["recipient", "id"], name="friendship_event_recipient"
+                    ),
+                    models.Index(
+                        condition=models.Q(("published_at__isnull", True)),
+                        fields=["id"],
+                        name="friendship_event_unpublished",
+                    ),
+                ],
+            },
+        ),
+    ]
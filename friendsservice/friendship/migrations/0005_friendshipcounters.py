@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("friendship", "0004_friendshipevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FriendshipCounters",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="friendship_counters",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("friends", models.IntegerField(default=0)),
+                ("sent_requests", models.IntegerField(default=0)),
+                ("received_requests", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
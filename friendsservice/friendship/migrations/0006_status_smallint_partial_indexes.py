@@ -0,0 +1,89 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("friendship", "0005_friendshipcounters"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="userfriendship",
+            name="friendship_sender_status",
+        ),
+        migrations.RemoveIndex(
+            model_name="userfriendship",
+            name="friendship_recipient_status",
+        ),
+        # Postgres cannot cast status names to numbers, so the column is rewritten with an explicit mapping
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql="""
+                        ALTER TABLE friendship_userfriendship ALTER COLUMN status TYPE smallint USING (
+                            CASE status WHEN 'active' THEN 1 WHEN 'confirmed' THEN 2 WHEN 'declined' THEN 3 END
+                        )
+                    """,
+                    reverse_sql="""
+                        ALTER TABLE friendship_userfriendship ALTER COLUMN status TYPE varchar USING (
+                            CASE status WHEN 1 THEN 'active' WHEN 2 THEN 'confirmed' WHEN 3 THEN 'declined' END
+                        )
+                    """,
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="userfriendship",
+                    name="status",
+                    field=models.SmallIntegerField(
+                        choices=[(1, "active"), (2, "confirmed"), (3, "declined")], default=1
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="userfriendship",
+            index=models.Index(
+                condition=models.Q(("status", 2)),
+                fields=["sender"],
+                include=("recipient",),
+                name="friendship_sender_confirmed",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userfriendship",
+            index=models.Index(
+                condition=models.Q(("status", 2)),
+                fields=["recipient"],
+                include=("sender",),
+                name="friendship_recipient_confirmed",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userfriendship",
+            index=models.Index(
+                condition=models.Q(("status", 1)),
+                fields=["sender", "id"],
+                include=("recipient",),
+                name="friendship_sender_active",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userfriendship",
+            index=models.Index(
+                condition=models.Q(("status", 1)),
+                fields=["recipient", "id"],
+                include=("sender",),
+                name="friendship_recipient_active",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userfriendship",
+            index=models.Index(
+                fields=["user_high"], include=("user_low",), name="friendship_user_high"
+            ),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("friendship", "0006_status_smallint_partial_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BlockedFriendshipPair",
+            fields=[
+                (
+                    "friendship_id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("declined_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="userfriendship",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="userfriendship",
+            index=models.Index(
+                condition=models.Q(("status", 3)),
+                fields=["updated_at"],
+                name="friendship_declined_updated",
+            ),
+        ),
+        migrations.AddField(
+            model_name="blockedfriendshippair",
+            name="user_high",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="blockedfriendshippair",
+            name="user_low",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="blockedfriendshippair",
+            index=models.Index(
+                fields=["user_high"],
+                include=("user_low",),
+                name="blocked_friendship_user_high",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="blockedfriendshippair",
+            constraint=models.UniqueConstraint(
+                fields=("user_low", "user_high"), name="unique_blocked_friendship_pair"
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("friendship", "0007_blockedfriendshippair"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="friendshipevent",
+            name="friendship_event_sender",
+        ),
+        migrations.RemoveIndex(
+            model_name="friendshipevent",
+            name="friendship_event_recipient",
+        ),
+        # Existing events are committed, so they are settled and keep their id order ahead of the new ones
+        migrations.AddField(
+            model_name="friendshipevent",
+            name="transaction_id",
+            field=models.BigIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="friendshipevent",
+            index=models.Index(
+                fields=["sender", "transaction_id", "id"],
+                name="friendship_event_sender_tx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="friendshipevent",
+            index=models.Index(
+                fields=["recipient", "transaction_id", "id"],
+                name="friendship_event_recipient_tx",
+            ),
+        ),
+    ]
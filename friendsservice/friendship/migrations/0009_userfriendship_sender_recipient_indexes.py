@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("friendship", "0008_friendshipevent_transaction_id"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="userfriendship",
+            index=models.Index(fields=["sender"], name="friendship_sender"),
+        ),
+        migrations.AddIndex(
+            model_name="userfriendship",
+            index=models.Index(fields=["recipient"], name="friendship_recipient"),
+        ),
+    ]
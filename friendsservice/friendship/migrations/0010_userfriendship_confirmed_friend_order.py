@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("friendship", "0009_userfriendship_sender_recipient_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="userfriendship",
+            name="friendship_sender_confirmed",
+        ),
+        migrations.RemoveIndex(
+            model_name="userfriendship",
+            name="friendship_recipient_confirmed",
+        ),
+        migrations.AddIndex(
+            model_name="userfriendship",
+            index=models.Index(
+                condition=models.Q(("status", 2)),
+                fields=["sender", "recipient"],
+                name="friendship_sender_confirmed",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userfriendship",
+            index=models.Index(
+                condition=models.Q(("status", 2)),
+                fields=["recipient", "sender"],
+                name="friendship_recipient_confirmed",
+            ),
+        ),
+    ]
@@ -1,33 +1,508 @@
+import hashlib
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime
 from enum import Enum
 
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
 
 User = get_user_model()
 
 
 class FriendshipStatus(Enum):
-    ACTIVE = 'active'
-    CONFIRMED = 'confirmed'
-    DECLINED = 'declined'
+    # Stored as smallint, names are used as labels
+    ACTIVE = 1
+    CONFIRMED = 2
+    DECLINED = 3
+
+    @classmethod
+    def to_choices(cls) -> list[tuple[int, str]]:
+        return [(item.value, item.name.lower()) for item in cls]
+
+
+class FriendshipEventType(Enum):
+    REQUEST_SENT = 'request_sent'
+    REQUEST_ACCEPTED = 'request_accepted'
+    REQUEST_DECLINED = 'request_declined'
+    FRIEND_REMOVED = 'friend_removed'
 
     @classmethod
     def to_choices(cls) -> list[tuple[str, str]]:
         return [(item.value, item.value) for item in cls]
 
+    @classmethod
+    def for_transition(cls, old_status: int, new_status: int) -> 'FriendshipEventType':
+        if new_status == FriendshipStatus.CONFIRMED.value:
+            return cls.REQUEST_ACCEPTED
+        if old_status == FriendshipStatus.CONFIRMED.value:
+            return cls.FRIEND_REMOVED
+        return cls.REQUEST_DECLINED
+
+
+def pair_lock_key(user_low_id: int, user_high_id: int) -> int:
+    """Key of the transaction advisory lock on the pair, which serializes requests and compaction of the pair"""
+    digest = hashlib.blake2b(f'friendship_pair:{user_low_id}:{user_high_id}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+class UserFriendshipQuerySet(models.QuerySet):
+
+    def between(self, first_user: User, second_user: User) -> 'UserFriendshipQuerySet':
+        user_low_id, user_high_id = UserFriendship.ordered_pair(first_user.id, second_user.id)
+        return self.filter(user_low_id=user_low_id, user_high_id=user_high_id)
+
+    def related_user_ids(self, user_id: int) -> 'UserFriendshipQuerySet':
+        """Ids of users on the other side of the user friendships of any status, compacted ones included.
+
+        To be used as a subquery.
+        """
+        # Served by the pair unique indexes and the user_high indexes
+        blocked_pairs = BlockedFriendshipPair.objects.all()
+        return self.filter(user_low=user_id).values('user_high').union(
+            self.filter(user_high=user_id).values('user_low'),
+            blocked_pairs.filter(user_low=user_id).values('user_high'),
+            blocked_pairs.filter(user_high=user_id).values('user_low'),
+            all=True,
+        )
+
+    def upsert_request(self, sender_id: int, recipient_id: int) -> tuple['UserFriendship', bool] | None:
+        """Send a friendship request, or accept the active request sent back by the recipient, in one statement.
+
+        Returns the friendship and whether it was created, or None when the pair has a friendship which
+        the request does not change, or is blocked.
+        """
+        user_low_id, user_high_id = UserFriendship.ordered_pair(sender_id, recipient_id)
+        table = UserFriendship._meta.db_table  # noqa: SLF001
+        blocked_table = BlockedFriendshipPair._meta.db_table  # noqa: SLF001
+        # The unique pair index makes the conflicting row the only candidate for the update,
+        # and `xmax` of a freshly inserted row is zero
+        sql = f"""
+            INSERT INTO {table} (sender_id, recipient_id, user_low_id, user_high_id, status, updated_at)
+            SELECT %(sender_id)s, %(recipient_id)s, %(user_low_id)s, %(user_high_id)s, %(active)s, %(now)s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {blocked_table} WHERE user_low_id = %(user_low_id)s AND user_high_id = %(user_high_id)s
+            )
+            ON CONFLICT (user_low_id, user_high_id) DO UPDATE SET status = %(confirmed)s, updated_at = %(now)s
+            WHERE {table}.status = %(active)s AND {table}.recipient_id = %(sender_id)s
+            RETURNING id, sender_id, recipient_id, status, updated_at, xmax = 0
+        """  # noqa: S608
+        params = {
+            'sender_id': sender_id,
+            'recipient_id': recipient_id,
+            'user_low_id': user_low_id,
+            'user_high_id': user_high_id,
+            'active': FriendshipStatus.ACTIVE.value,
+            'confirmed': FriendshipStatus.CONFIRMED.value,
+            'now': timezone.now(),
+        }
+        using = router.db_for_write(UserFriendship)
+        with transaction.atomic(using=using, savepoint=False), connections[using].cursor() as cursor:
+            # Compaction may be moving the pair's declined friendship into a blocked pair: the snapshot of the insert
+            # would miss the blocked pair and its conflict wait would end on a deleted row, so the insert would
+            # resurrect the pair. Under the pair lock the insert starts only after the compaction has committed
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [pair_lock_key(user_low_id, user_high_id)])
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        friendship_id, sender_id, recipient_id, status, updated_at, created = row
+        friendship = UserFriendship(
+            id=friendship_id,
+            sender_id=sender_id,
+            recipient_id=recipient_id,
+            user_low_id=user_low_id,
+            user_high_id=user_high_id,
+            status=status,
+            updated_at=updated_at,
+        )
+        return friendship, created
+
+    def compactable(self, declined_before: datetime) -> 'UserFriendshipQuerySet':
+        return self.filter(status=FriendshipStatus.DECLINED.value, updated_at__lt=declined_before)
+
+    def friend_ids(self, user_id: int) -> 'UserFriendshipQuerySet':
+        """Ids of the user friends, to be used as subquery"""
+        # Served by the partial confirmed indexes
+        friendships = self.filter(status=FriendshipStatus.CONFIRMED.value)
+        return friendships.filter(sender=user_id).values('recipient').union(
+            friendships.filter(recipient=user_id).values('sender'), all=True
+        )
+
 
 class UserFriendship(models.Model):
     sender = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='sent_requests'
+        related_name='sent_requests',
+        db_index=False
     )
     recipient = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='received_requests'
+        related_name='received_requests',
+        db_index=False
+    )
+    # Unordered pair of sender and recipient, lowest id first. Filled in on save
+    user_low = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False
+    )
+    user_high = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False
+    )
+    status = models.SmallIntegerField(choices=FriendshipStatus.to_choices(), default=FriendshipStatus.ACTIVE.value)
+    # Bulk `update()` calls must set it too, declined friendships are compacted by its age
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = UserFriendshipQuerySet.as_manager()
+
+    class Meta:  # noqa: D106
+        constraints = [
+            models.UniqueConstraint(fields=('user_low', 'user_high'), name='unique_friendship_pair'),
+            models.CheckConstraint(check=models.Q(user_low__lt=models.F('user_high')), name='ordered_friendship_pair'),
+        ]
+        # Partial indexes of the hot predicates stay small and index-only while declined rows pile up
+        indexes = [
+            # The friend is a key column: friends list pages are read in friend id order straight from the index
+            models.Index(
+                fields=('sender', 'recipient'),
+                condition=models.Q(status=FriendshipStatus.CONFIRMED.value),
+                name='friendship_sender_confirmed',
+            ),
+            models.Index(
+                fields=('recipient', 'sender'),
+                condition=models.Q(status=FriendshipStatus.CONFIRMED.value),
+                name='friendship_recipient_confirmed',
+            ),
+            models.Index(
+                fields=('sender', 'id'),
+                include=('recipient',),
+                condition=models.Q(status=FriendshipStatus.ACTIVE.value),
+                name='friendship_sender_active',
+            ),
+            models.Index(
+                fields=('recipient', 'id'),
+                include=('sender',),
+                condition=models.Q(status=FriendshipStatus.ACTIVE.value),
+                name='friendship_recipient_active',
+            ),
+            # Deleting a user cascades to its friendships of any status by sender_id and recipient_id, and Postgres
+            # checks both foreign keys of the table on every user delete; the partial indexes above cannot serve them
+            models.Index(fields=('sender',), name='friendship_sender'),
+            models.Index(fields=('recipient',), name='friendship_recipient'),
+            # Lookups of any status go through the pair: user_low is the leading column of the unique constraint
+            models.Index(fields=('user_high',), include=('user_low',), name='friendship_user_high'),
+            models.Index(
+                fields=('updated_at',),
+                condition=models.Q(status=FriendshipStatus.DECLINED.value),
+                name='friendship_declined_updated',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.get_status_display()} friendship from {self.sender} to {self.recipient}'
+
+    def save(self, *args, **kwargs) -> None:
+        self.fill_pair()
+        super().save(*args, **kwargs)
+
+    def fill_pair(self) -> None:
+        """Fill the unordered pair from sender and recipient, needed before `bulk_create`"""
+        self.user_low_id, self.user_high_id = self.ordered_pair(self.sender_id, self.recipient_id)
+
+    @staticmethod
+    def ordered_pair(first_user_id: int, second_user_id: int) -> tuple[int, int]:
+        return min(first_user_id, second_user_id), max(first_user_id, second_user_id)
+
+
+class BlockedFriendshipPairQuerySet(models.QuerySet):
+
+    def between(self, first_user: User, second_user: User) -> 'BlockedFriendshipPairQuerySet':
+        user_low_id, user_high_id = UserFriendship.ordered_pair(first_user.id, second_user.id)
+        return self.filter(user_low_id=user_low_id, user_high_id=user_high_id)
+
+    def compact(self, declined_before: datetime, batch_size: int) -> int:
+        """Move a batch of declined friendships older than `declined_before` into blocked pairs.
+
+        Returns the number of moved friendships. Rows locked by concurrent writers, and pairs locked by
+        concurrent requests (see `pair_lock_key`), are skipped and left to the next batch, so a batch never
+        waits and holds its locks only for the time of its four statements.
+        """
+        with transaction.atomic():
+            friendships = list(
+                UserFriendship.objects.compactable(declined_before)
+                .order_by('updated_at')
+                .select_for_update(skip_locked=True)
+                .values_list('id', 'user_low_id', 'user_high_id', 'updated_at')[:batch_size]
+            )
+            if not friendships:
+                return 0
+            with connections[self.db].cursor() as cursor:
+                cursor.execute(
+                    'SELECT key FROM unnest(%s::bigint[]) AS key WHERE pg_try_advisory_xact_lock(key)',
+                    [[pair_lock_key(user_low_id, user_high_id) for _, user_low_id, user_high_id, _ in friendships]],
+                )
+                locked_keys = {key for key, in cursor.fetchall()}
+            friendships = [
+                friendship for friendship in friendships if pair_lock_key(friendship[1], friendship[2]) in locked_keys
+            ]
+            if not friendships:
+                return 0
+            self.bulk_create(
+                [
+                    BlockedFriendshipPair(
+                        friendship_id=friendship_id,
+                        user_low_id=user_low_id,
+                        user_high_id=user_high_id,
+                        declined_at=declined_at,
+                    )
+                    for friendship_id, user_low_id, user_high_id, declined_at in friendships
+                ],
+                ignore_conflicts=True,
+            )
+            UserFriendship.objects.filter(id__in=[friendship[0] for friendship in friendships]).delete()
+        return len(friendships)
+
+
+class BlockedFriendshipPair(models.Model):
+    """Declined friendship compacted out of `UserFriendship`, its users still cannot become friends"""
+
+    # The declined friendship id, still reported by pair statuses and referenced by events
+    friendship_id = models.BigIntegerField(primary_key=True)
+    user_low = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False
+    )
+    user_high = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False
     )
-    status = models.CharField(choices=FriendshipStatus.to_choices(), default=FriendshipStatus.ACTIVE.value)
+    declined_at = models.DateTimeField()
+
+    objects = BlockedFriendshipPairQuerySet.as_manager()
+
+    class Meta:  # noqa: D106
+        constraints = [
+            models.UniqueConstraint(fields=('user_low', 'user_high'), name='unique_blocked_friendship_pair'),
+        ]
+        indexes = [
+            models.Index(fields=('user_high',), include=('user_low',), name='blocked_friendship_user_high'),
+        ]
 
     def __str__(self) -> str:
-        return f'{self.status} friendship from {self.sender} to {self.recipient}'
+        return f'blocked friendship pair of {self.user_low_id} and {self.user_high_id}'
+
+
+def _transaction_id_expression(sql: str) -> RawSQL:
+    # Transaction ids are xid8, which converts to bigint through text only
+    return RawSQL(f'{sql}::text::bigint', [], output_field=models.BigIntegerField())
+
+
+def current_transaction_id() -> RawSQL:
+    """Id of the current top-level transaction, assigned by this call if it has none yet"""
+    return _transaction_id_expression('pg_current_xact_id()')
+
+
+def snapshot_xmin() -> RawSQL:
+    """Oldest transaction id still running in the current snapshot, lower ids are all finished"""
+    return _transaction_id_expression('pg_snapshot_xmin(pg_current_snapshot())')
+
+
+class FriendshipEventQuerySet(models.QuerySet):
+
+    def record(self, event_type: FriendshipEventType, *friendships: UserFriendship) -> list['FriendshipEvent']:
+        """Write events of friendship changes, must be called in the transaction of the change itself"""
+        return self.bulk_create([
+            FriendshipEvent(
+                type=event_type.value,
+                friendship_id=friendship.id,
+                sender_id=friendship.sender_id,
+                recipient_id=friendship.recipient_id,
+                transaction_id=current_transaction_id(),
+            )
+            for friendship in friendships
+        ])
+
+    def unpublished(self) -> 'FriendshipEventQuerySet':
+        return self.filter(published_at__isnull=True)
+
+    def with_settled(self) -> 'FriendshipEventQuerySet':
+        """Annotate whether no transaction older than the event one is still running.
+
+        Then no event can appear before it in (transaction_id, id) order anymore.
+        """
+        # Events of the reading transaction itself are settled when it is the oldest running one
+        own_transaction_id = _transaction_id_expression('pg_current_xact_id_if_assigned()')
+        settled = (
+            models.Q(transaction_id__lt=snapshot_xmin())
+            | models.Q(transaction_id=snapshot_xmin()) & models.Q(transaction_id=own_transaction_id)
+        )
+        return self.annotate(settled=models.ExpressionWrapper(settled, output_field=models.BooleanField()))
+
+
+class FriendshipEvent(models.Model):
+    """Outbox of friendship changes, published by `relay_friendship_events` command and read by changes feed"""
+
+    type = models.CharField(max_length=32, choices=FriendshipEventType.to_choices())  # noqa: A003
+    # Not a foreign key: events outlive compacted friendships
+    friendship_id = models.BigIntegerField()
+    sender = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False
+    )
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False
+    )
+    # Sequence ids become visible in commit order, not in id order: the changes feed is read in
+    # (transaction_id, id) order, which later commits cannot precede once older transactions have finished
+    transaction_id = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(null=True, blank=True)
+
+    objects = FriendshipEventQuerySet.as_manager()
+
+    class Meta:  # noqa: D106
+        indexes = [
+            models.Index(fields=('sender', 'transaction_id', 'id'), name='friendship_event_sender_tx'),
+            models.Index(fields=('recipient', 'transaction_id', 'id'), name='friendship_event_recipient_tx'),
+            models.Index(
+                fields=('id',), condition=models.Q(published_at__isnull=True), name='friendship_event_unpublished'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.type} event of friendship {self.friendship_id}'
+
+    def to_message(self) -> dict[str, str | int]:
+        return {
+            'id': self.id,
+            'type': self.type,
+            'friendship_id': self.friendship_id,
+            'sender_id': self.sender_id,
+            'recipient_id': self.recipient_id,
+            'created_at': self.created_at.isoformat(),
+        }
+
+
+# Changes of (friends, sent_requests, received_requests) counters of the sender and of the recipient
+COUNTER_DELTAS: dict[FriendshipEventType, tuple[tuple[int, int, int], tuple[int, int, int]]] = {
+    FriendshipEventType.REQUEST_SENT: ((0, 1, 0), (0, 0, 1)),
+    FriendshipEventType.REQUEST_ACCEPTED: ((1, -1, 0), (1, 0, -1)),
+    FriendshipEventType.REQUEST_DECLINED: ((0, -1, 0), (0, 0, -1)),
+    FriendshipEventType.FRIEND_REMOVED: ((-1, 0, 0), (-1, 0, 0)),
+}
+
+COUNTER_FIELDS = ('friends', 'sent_requests', 'received_requests')
+
+
+class FriendshipCountersQuerySet(models.QuerySet):
+
+    def apply(self, event_type: FriendshipEventType, *friendships: UserFriendship) -> None:
+        """Update counters of the friendships users, must be called in the transaction of the change itself"""
+        sender_delta, recipient_delta = COUNTER_DELTAS[event_type]
+        deltas: dict[int, tuple[int, ...]] = defaultdict(lambda: (0, 0, 0))
+        for friendship in friendships:
+            for user_id, delta in ((friendship.sender_id, sender_delta), (friendship.recipient_id, recipient_delta)):
+                deltas[user_id] = tuple(map(sum, zip(deltas[user_id], delta, strict=True)))
+
+        # Rows are locked in user_id order, as by `reconcile`: the order of the updates below follows the roles
+        # of the users, so concurrent changes of A->B, B->C and C->A would deadlock locking them by update
+        locked_user_ids = set(
+            self.filter(user_id__in=deltas).order_by('user_id').select_for_update().values_list('user_id', flat=True)
+        )
+
+        # Users with the same change are updated by one statement
+        user_ids_by_delta: dict[tuple[int, ...], list[int]] = defaultdict(list)
+        for user_id, delta in deltas.items():
+            if user_id in locked_user_ids:
+                user_ids_by_delta[delta].append(user_id)
+
+        for delta, user_ids in user_ids_by_delta.items():
+            self.filter(user_id__in=user_ids).update(**{
+                field: models.F(field) + value for field, value in zip(COUNTER_FIELDS, delta, strict=True) if value
+            })
+        missing_user_ids = deltas.keys() - locked_user_ids
+        if missing_user_ids:
+            self.reconcile(missing_user_ids)
+
+    def reconcile(self, user_ids: Iterable[int]) -> list[int]:
+        """Recompute counters of the users from their friendships, returns ids of users whose counters drifted"""
+        user_ids = sorted(user_ids)
+        with transaction.atomic():
+            # Writers of these users wait for the recomputed values and apply their changes on top of them
+            stored = {
+                row[0]: row[1:]
+                for row in self.filter(user_id__in=user_ids).order_by('user_id').select_for_update().values_list(
+                    'user_id', *COUNTER_FIELDS
+                )
+            }
+            drifted = [
+                counters for counters in FriendshipCounters.compute(user_ids)
+                if stored.get(counters.user_id) != counters.values()
+            ]
+            self.bulk_create(
+                drifted, update_conflicts=True, unique_fields=['user'], update_fields=list(COUNTER_FIELDS)
+            )
+        return [counters.user_id for counters in drifted]
+
+
+class FriendshipCounters(models.Model):
+    """Denormalized friendship counters of the user, maintained by the write services"""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='friendship_counters'
+    )
+    # Not positive fields: a drifted counter must not fail the friendship change, reconcile repairs it
+    friends = models.IntegerField(default=0)
+    sent_requests = models.IntegerField(default=0)
+    received_requests = models.IntegerField(default=0)
+
+    objects = FriendshipCountersQuerySet.as_manager()
+
+    def __str__(self) -> str:
+        return f'friendship counters of {self.user_id}'
+
+    def values(self) -> tuple[int, int, int]:
+        return self.friends, self.sent_requests, self.received_requests
+
+    @staticmethod
+    def compute(user_ids: list[int]) -> list['FriendshipCounters']:
+        """Count friends and active requests of the users, served by the partial indexes"""
+        counters = {user_id: FriendshipCounters(user_id=user_id) for user_id in user_ids}
+        # One aggregate per partial index, a filter by several statuses would scan the table
+        counted = (
+            ('sender', FriendshipStatus.CONFIRMED, 'friends'),
+            ('recipient', FriendshipStatus.CONFIRMED, 'friends'),
+            ('sender', FriendshipStatus.ACTIVE, 'sent_requests'),
+            ('recipient', FriendshipStatus.ACTIVE, 'received_requests'),
+        )
+        for user_field, status, counter_field in counted:
+            rows = (
+                UserFriendship.objects.filter(**{f'{user_field}__in': user_ids}, status=status.value)
+                .values(user_field)
+                .annotate(count=models.Count(user_field))
+                .values_list(user_field, 'count')
+            )
+            for user_id, count in rows:
+                setattr(counters[user_id], counter_field, getattr(counters[user_id], counter_field) + count)
+        return list(counters.values())
@@ -0,0 +1,99 @@
+import json
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any
+
+from django.db import transaction
+from django.utils import timezone
+
+from friendsservice.friendship.exceptions import EventSinkError
+from friendsservice.friendship.models import FriendshipEvent
+
+
+class EventSink:
+    """Destination of published friendship events, must accept a batch as a whole or raise `EventSinkError`"""
+
+    def send(self, messages: list[dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlFileSink(EventSink):
+    """Appends events to a file, one JSON object per line"""
+
+    def __init__(self, path: str):
+        """Open the file for appending, it is kept open until `close`"""
+        self.file = Path(path).open('a', encoding='utf-8')
+
+    def send(self, messages: list[dict[str, Any]]) -> None:
+        try:
+            self.file.writelines(f'{json.dumps(message)}\n' for message in messages)
+            self.file.flush()
+        except OSError as exc:
+            raise EventSinkError from exc
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class HttpSink(EventSink):
+    """POSTs every batch as `{"events": [...]}` JSON, any 2xx response means the batch is accepted"""
+
+    def __init__(self, url: str, timeout: float = 10):
+        """Send batches to `url`, waiting at most `timeout` seconds for each"""
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, messages: list[dict[str, Any]]) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({'events': messages}).encode(),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):  # noqa: S310
+                pass
+        except (urllib.error.URLError, OSError) as exc:
+            raise EventSinkError from exc
+
+
+def get_sink(target: str) -> EventSink:
+    """HTTP sink for an http(s) URL, JSONL file sink for any other target"""
+    if target.startswith(('http://', 'https://')):
+        return HttpSink(target)
+    return JsonlFileSink(target)
+
+
+class OutboxRelay:
+    """Publishes unpublished friendship events to the sink in id order, at least once.
+
+    Batches are locked with SKIP LOCKED, so several relays can run at once (events order is kept within a batch only).
+    """
+
+    def __init__(self, sink: EventSink, batch_size: int):
+        """Publish to `sink` by batches of at most `batch_size` events"""
+        self.sink = sink
+        self.batch_size = batch_size
+
+    def relay_batch(self) -> int:
+        with transaction.atomic():
+            events = list(
+                FriendshipEvent.objects.unpublished().select_for_update(skip_locked=True).order_by('id')[:self.batch_size]
+            )
+            if not events:
+                return 0
+
+            # Marked published only if the sink accepted the batch, otherwise the batch is sent again next time
+            self.sink.send([event.to_message() for event in events])
+            FriendshipEvent.objects.filter(id__in=[event.id for event in events]).update(published_at=timezone.now())
+        return len(events)
+
+    def relay(self) -> int:
+        relayed = 0
+        while batch_size := self.relay_batch():
+            relayed += batch_size
+        return relayed
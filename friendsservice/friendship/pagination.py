@@ -0,0 +1,41 @@
+import base64
+import binascii
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from friendsservice.friendship.exceptions import InvalidCursorError
+
+
+def encode_cursor(value: str) -> str:
+    """Encode a keyset value as an opaque URL-safe cursor"""
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> str:
+    """Decode a cursor of `encode_cursor`, raising `InvalidCursorError` for a malformed one"""
+    try:
+        return base64.b64decode(cursor.encode(), altchars=b'-_', validate=True).decode()
+    except (binascii.Error, UnicodeError) as exc:
+        raise InvalidCursorError from exc
+
+
+def decode_id_cursor(cursor: str) -> int:
+    """Decode a cursor of an id"""
+    try:
+        return int(decode_cursor(cursor))
+    except ValueError as exc:
+        raise InvalidCursorError from exc
+
+
+@dataclass
+class KeysetPage:
+    items: list[Any]
+    next_cursor: str | None = None
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Any], limit: int, cursor_key: Callable[[Any], str] = str) -> 'KeysetPage':
+        """Build page from rows fetched with `limit + 1`; the extra row only signals the next page"""
+        items = list(rows[:limit])
+        next_cursor = encode_cursor(cursor_key(items[-1])) if len(rows) > limit else None
+        return cls(items=items, next_cursor=next_cursor)
@@ -0,0 +1,93 @@
+import random
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Protocol
+
+from django.conf import settings
+from django.db.models import Model
+
+from friendsservice.friendship.cache import friend_graph_cache
+
+
+class _UserService(Protocol):
+    user: Model
+
+
+_read_alias: ContextVar[str | None] = ContextVar('friendship_read_alias', default=None)
+
+
+class ReplicaRouter:
+    """Sends reads made inside `replica_reads` to a replica, everything else stays on `default`"""
+
+    def db_for_read(self, model: type[Model], **hints: object) -> str | None:  # noqa: ARG002
+        return _read_alias.get()
+
+    def db_for_write(self, model: type[Model], **hints: object) -> str | None:  # noqa: ARG002
+        return None
+
+    def allow_relation(self, first_obj: Model, second_obj: Model, **hints: object) -> bool | None:  # noqa: ARG002
+        return None
+
+    def allow_migrate(
+        self, db: str, app_label: str, model_name: str | None = None, **hints: object  # noqa: ARG002
+    ) -> bool | None:
+        return False if db in settings.FRIENDSHIP_REPLICA_ALIASES else None
+
+
+def choose_read_alias(user_id: int) -> str | None:
+    """Pick a random replica for reads of the user, or None for the primary"""
+    aliases = settings.FRIENDSHIP_REPLICA_ALIASES
+    if not aliases:
+        return None
+    # Read-your-writes: the user who has just changed their friendships reads from the primary for a while
+    if friend_graph_cache.changed_within(user_id, settings.FRIENDSHIP_REPLICA_STICKY_TIMEOUT):
+        return None
+    return random.choice(aliases)  # noqa: S311
+
+
+async def achoose_read_alias(user_id: int) -> str | None:
+    """Pick a random replica for reads of the user, or None for the primary, without blocking the event loop"""
+    aliases = settings.FRIENDSHIP_REPLICA_ALIASES
+    if not aliases:
+        return None
+    if await friend_graph_cache.achanged_within(user_id, settings.FRIENDSHIP_REPLICA_STICKY_TIMEOUT):
+        return None
+    return random.choice(aliases)  # noqa: S311
+
+
+@contextmanager
+def replica_reads(user_id: int) -> Iterator[str | None]:
+    """Route reads of the block to the replica chosen for the user"""
+    token = _read_alias.set(choose_read_alias(user_id))
+    try:
+        yield _read_alias.get()
+    finally:
+        _read_alias.reset(token)
+
+
+@asynccontextmanager
+async def areplica_reads(user_id: int) -> AsyncIterator[str | None]:
+    """Route reads of the block to the replica chosen for the user, for coroutines"""
+    token = _read_alias.set(await achoose_read_alias(user_id))
+    try:
+        yield _read_alias.get()
+    finally:
+        _read_alias.reset(token)
+
+
+def read_from_replica(method: Callable) -> Callable:
+    """Run a read service method (sync or async) in `replica_reads` of the service user"""
+    if iscoroutinefunction(method):
+        @wraps(method)
+        async def wrapper(self: _UserService, *args: object, **kwargs: object) -> object:
+            async with areplica_reads(self.user.id):
+                return await method(self, *args, **kwargs)
+    else:
+        @wraps(method)
+        def wrapper(self: _UserService, *args: object, **kwargs: object) -> object:
+            with replica_reads(self.user.id):
+                return method(self, *args, **kwargs)
+    return wrapper
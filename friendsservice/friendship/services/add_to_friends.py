@@ -1,10 +1,14 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db import transaction
 
+from friendsservice.friendship.cache import friend_graph_cache
 from friendsservice.friendship.exceptions import (
     UserDoesNotExistsError, UserCannotBeFriendError, FriendshipRequestAlreadyExistsError
 )
-from friendsservice.friendship.models import UserFriendship, FriendshipStatus
+from friendsservice.friendship.models import (
+    UserFriendship, FriendshipStatus, FriendshipEvent, FriendshipEventType, FriendshipCounters
+)
+from friendsservice.friendship.usernames import username_resolver
 
 User = get_user_model()
 
@@ -19,40 +23,37 @@ class AddToFriendsService:
         self.recipient: User | None = None
 
     def _get_recipient(self) -> None:
-        try:
-            self.recipient = User.objects.get(username=self.recipient_username)
-        except User.DoesNotExist as exc:
-            raise UserDoesNotExistsError from exc
-
-    @property
-    def _exist_request(self) -> UserFriendship | None:
-        return UserFriendship.objects.filter(
-            Q(recipient=self.sender, sender=self.recipient) | Q(recipient=self.recipient, sender=self.sender)
-        ).first()
-
-    def _create_friendship(self) -> None:
-        exist_request = self._exist_request
-
-        if not exist_request:
-            UserFriendship.objects.create(
-                sender=self.sender,
-                recipient=self.recipient,
-            )
-            return
-
-        if exist_request.status == FriendshipStatus.DECLINED.value:
+        recipient_id = username_resolver.resolve(self.recipient_username)
+        if recipient_id is None:
+            raise UserDoesNotExistsError
+        self.recipient = User(id=recipient_id, username=self.recipient_username)
+        # Sender may be a token user without username claim
+        if self.recipient.id == self.sender.id:
             raise UserCannotBeFriendError
 
-        if exist_request.status == FriendshipStatus.CONFIRMED.value:
-            return
+    def _raise_for_exist_request(self) -> None:
+        """Explain why the request did not change the pair, confirmed friendship is not an error"""
+        exist_request = UserFriendship.objects.between(self.sender, self.recipient).first()
+        # No friendship: the pair is blocked
+        if not exist_request or exist_request.status == FriendshipStatus.DECLINED.value:
+            raise UserCannotBeFriendError
+        if exist_request.status == FriendshipStatus.ACTIVE.value:
+            raise FriendshipRequestAlreadyExistsError
 
-        if exist_request.status == FriendshipStatus.ACTIVE.value and exist_request.recipient == self.sender:
-            exist_request.status = FriendshipStatus.CONFIRMED.value
-            exist_request.save()
+    def _create_friendship(self) -> None:
+        # Concurrent mutual requests are serialized by the pair unique index: the second one accepts the first
+        upserted = UserFriendship.objects.upsert_request(self.sender.id, self.recipient.id)
+        if upserted is None:
+            self._raise_for_exist_request()
             return
 
-        raise FriendshipRequestAlreadyExistsError
+        friendship, created = upserted
+        event_type = FriendshipEventType.REQUEST_SENT if created else FriendshipEventType.REQUEST_ACCEPTED
+        FriendshipEvent.objects.record(event_type, friendship)
+        FriendshipCounters.objects.apply(event_type, friendship)
 
     def __call__(self) -> None:
         self._get_recipient()
-        self._create_friendship()
+        with transaction.atomic():
+            self._create_friendship()
+            friend_graph_cache.invalidate_on_commit(self.sender.id, self.recipient.id)
@@ -0,0 +1,119 @@
+from enum import Enum
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import (
+    BlockedFriendshipPair,
+    FriendshipCounters,
+    FriendshipEvent,
+    FriendshipEventType,
+    FriendshipStatus,
+    UserFriendship,
+)
+from friendsservice.friendship.usernames import username_resolver
+
+User = get_user_model()
+
+
+class AddToFriendsResult(Enum):
+    SENT = 'sent'
+    CONFIRMED = 'confirmed'
+    ALREADY_FRIENDS = 'already_friends'
+    ALREADY_SENT = 'already_sent'
+    CANNOT_BE_FRIEND = 'cannot_be_friend'
+    NOT_FOUND = 'not_found'
+
+
+class BulkAddToFriendsService:
+
+    def __init__(self, sender: User, recipient_usernames: list[str]):
+        """Send requests from `sender` to each of the usernames, repeated ones once"""
+        self.sender = sender
+        self.recipient_usernames = list(dict.fromkeys(recipient_usernames))
+
+    def _get_recipients(self) -> dict[str, int]:
+        return username_resolver.resolve_many(self.recipient_usernames)
+
+    def _pairs_filter(self, recipient_ids: list[int]) -> Q:
+        # Pairs of any status are looked up by the pair indexes
+        return (
+            Q(user_low=self.sender.id, user_high__in=[id_ for id_ in recipient_ids if id_ > self.sender.id])
+            | Q(user_high=self.sender.id, user_low__in=[id_ for id_ in recipient_ids if id_ < self.sender.id])
+        )
+
+    def _get_exist_requests(self, recipient_ids: list[int]) -> dict[int, UserFriendship]:
+        exist_requests = UserFriendship.objects.filter(self._pairs_filter(recipient_ids)).select_for_update()
+        return {
+            request.recipient_id if request.sender_id == self.sender.id else request.sender_id: request
+            for request in exist_requests
+        }
+
+    def _get_blocked_user_ids(self, recipient_ids: list[int]) -> set[int]:
+        """Recipients whose declined friendships with the sender were compacted"""
+        if not recipient_ids:
+            return set()
+        pairs = BlockedFriendshipPair.objects.filter(self._pairs_filter(recipient_ids)).values_list(
+            'user_low_id', 'user_high_id'
+        )
+        return {user_high_id if user_low_id == self.sender.id else user_low_id for user_low_id, user_high_id in pairs}
+
+    def _get_exist_request_result(self, exist_request: UserFriendship) -> AddToFriendsResult:
+        if exist_request.status == FriendshipStatus.DECLINED.value:
+            return AddToFriendsResult.CANNOT_BE_FRIEND
+        if exist_request.status == FriendshipStatus.CONFIRMED.value:
+            return AddToFriendsResult.ALREADY_FRIENDS
+        if exist_request.recipient_id == self.sender.id:
+            return AddToFriendsResult.CONFIRMED
+        return AddToFriendsResult.ALREADY_SENT
+
+    def _add_to_friends(self) -> dict[str, AddToFriendsResult]:
+        recipients = self._get_recipients()
+        exist_requests = self._get_exist_requests(list(recipients.values()))
+        blocked_user_ids = self._get_blocked_user_ids(
+            [id_ for id_ in recipients.values() if id_ not in exist_requests and id_ != self.sender.id]
+        )
+
+        results = {}
+        confirmed_requests = []
+        new_requests = []
+        for username in self.recipient_usernames:
+            recipient_id = recipients.get(username)
+            if recipient_id is None:
+                results[username] = AddToFriendsResult.NOT_FOUND
+            elif recipient_id == self.sender.id or recipient_id in blocked_user_ids:
+                results[username] = AddToFriendsResult.CANNOT_BE_FRIEND
+            elif recipient_id in exist_requests:
+                results[username] = self._get_exist_request_result(exist_requests[recipient_id])
+                if results[username] == AddToFriendsResult.CONFIRMED:
+                    confirmed_requests.append(exist_requests[recipient_id])
+            else:
+                results[username] = AddToFriendsResult.SENT
+                new_request = UserFriendship(sender_id=self.sender.id, recipient_id=recipient_id)
+                new_request.fill_pair()
+                new_requests.append(new_request)
+
+        UserFriendship.objects.filter(id__in=[request.id for request in confirmed_requests]).update(
+            status=FriendshipStatus.CONFIRMED.value, updated_at=timezone.now()
+        )
+        UserFriendship.objects.bulk_create(new_requests)
+        FriendshipEvent.objects.record(FriendshipEventType.REQUEST_ACCEPTED, *confirmed_requests)
+        FriendshipEvent.objects.record(FriendshipEventType.REQUEST_SENT, *new_requests)
+        FriendshipCounters.objects.apply(FriendshipEventType.REQUEST_ACCEPTED, *confirmed_requests)
+        FriendshipCounters.objects.apply(FriendshipEventType.REQUEST_SENT, *new_requests)
+
+        friend_graph_cache.invalidate_on_commit(self.sender.id, *recipients.values())
+        return results
+
+    def __call__(self) -> dict[str, AddToFriendsResult]:
+        # Existing requests are locked until their changes and events are written
+        try:
+            with transaction.atomic():
+                return self._add_to_friends()
+        except IntegrityError:
+            # Concurrent request for one of the pairs was inserted first, so existing requests are read again
+            with transaction.atomic():
+                return self._add_to_friends()
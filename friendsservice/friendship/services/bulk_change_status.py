@@ -0,0 +1,61 @@
+from enum import Enum
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import (
+    FriendshipCounters,
+    FriendshipEvent,
+    FriendshipEventType,
+    FriendshipStatus,
+    UserFriendship,
+)
+
+User = get_user_model()
+
+
+class ChangeFriendshipStatusResult(Enum):
+    CHANGED = 'changed'
+    NOT_FOUND = 'not_found'
+
+
+class BulkChangeFriendshipStatusService:
+    """Accept or decline received active friendship requests by their ids"""
+
+    def __init__(self, user: User, friendship_ids: list[int], status: FriendshipStatus):
+        """Set `status` on requests of the ids received by `user`, repeated ids once"""
+        self.user = user
+        self.friendship_ids = list(dict.fromkeys(friendship_ids))
+        self.status = status
+
+    def _change_status(self) -> dict[int, ChangeFriendshipStatusResult]:
+        requests = dict(
+            UserFriendship.objects.filter(
+                id__in=self.friendship_ids, recipient=self.user.id, status=FriendshipStatus.ACTIVE.value
+            )
+            .select_for_update()
+            .values_list('id', 'sender_id')
+        )
+        UserFriendship.objects.filter(id__in=requests).update(status=self.status.value, updated_at=timezone.now())
+        event_type = FriendshipEventType.for_transition(FriendshipStatus.ACTIVE.value, self.status.value)
+        changed_requests = [
+            UserFriendship(id=friendship_id, sender_id=sender_id, recipient_id=self.user.id)
+            for friendship_id, sender_id in requests.items()
+        ]
+        FriendshipEvent.objects.record(event_type, *changed_requests)
+        FriendshipCounters.objects.apply(event_type, *changed_requests)
+        friend_graph_cache.invalidate_on_commit(self.user.id, *requests.values())
+
+        return {
+            friendship_id: (
+                ChangeFriendshipStatusResult.CHANGED if friendship_id in requests
+                else ChangeFriendshipStatusResult.NOT_FOUND
+            )
+            for friendship_id in self.friendship_ids
+        }
+
+    def __call__(self) -> dict[int, ChangeFriendshipStatusResult]:
+        with transaction.atomic():
+            return self._change_status()
@@ -1,7 +1,11 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
+from friendsservice.friendship.cache import friend_graph_cache
 from friendsservice.friendship.exceptions import FriendshipRequestDoesNotExistsError, SelfFriendshipRequestAcceptError
-from friendsservice.friendship.models import UserFriendship, FriendshipStatus
+from friendsservice.friendship.models import (
+    UserFriendship, FriendshipStatus, FriendshipEvent, FriendshipEventType, FriendshipCounters
+)
 
 User = get_user_model()
 
@@ -9,22 +13,33 @@ User = get_user_model()
 class ChangeFriendshipStatusService:
 
     def __init__(self, friendship: int | UserFriendship, status: FriendshipStatus, user: User | None = None):
-        self.friendship = friendship if isinstance(friendship, UserFriendship) else self._get_friendship(friendship)
+        self.friendship = friendship
         self.user = user
         self.status = status
 
     @staticmethod
     def _get_friendship(friendship_id: int) -> UserFriendship:
         try:
-            return UserFriendship.objects.get(id=friendship_id, status=FriendshipStatus.ACTIVE.value)
+            return UserFriendship.objects.select_for_update().get(
+                id=friendship_id, status=FriendshipStatus.ACTIVE.value,
+            )
         except UserFriendship.DoesNotExist as exc:
             raise FriendshipRequestDoesNotExistsError from exc
 
     def _change_status(self) -> None:
-        if self.status == FriendshipStatus.CONFIRMED and self.user and self.friendship.sender == self.user:
+        if not isinstance(self.friendship, UserFriendship):
+            self.friendship = self._get_friendship(self.friendship)
+
+        if self.status == FriendshipStatus.CONFIRMED and self.user and self.friendship.sender_id == self.user.id:
             raise SelfFriendshipRequestAcceptError
+        event_type = FriendshipEventType.for_transition(self.friendship.status, self.status.value)
         self.friendship.status = self.status.value
         self.friendship.save()
+        FriendshipEvent.objects.record(event_type, self.friendship)
+        FriendshipCounters.objects.apply(event_type, self.friendship)
+        friend_graph_cache.invalidate_on_commit(self.friendship.sender_id, self.friendship.recipient_id)
 
     def __call__(self) -> None:
-        self._change_status()
+        # Joins the caller transaction without a savepoint, e.g. when called from DeleteFromFriendsService
+        with transaction.atomic(savepoint=False):
+            self._change_status()
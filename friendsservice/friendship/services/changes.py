@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from itertools import takewhile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q, QuerySet
+
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.exceptions import InvalidCursorError
+from friendsservice.friendship.models import FriendshipEvent
+from friendsservice.friendship.pagination import decode_cursor, encode_cursor
+from friendsservice.friendship.routers import read_from_replica
+
+User = get_user_model()
+
+EventRow = tuple[int, str, int, str, str, str]
+# Event row followed by its transaction id and whether it is settled
+FeedRow = tuple[int, str, int, str, str, str, int, bool]
+
+
+@dataclass
+class ChangesPage:
+    events: list[EventRow]
+    # Passed back as `since` to get the following events, stays the same while there are none
+    cursor: str | None
+    has_more: bool
+    # False while events of finished transactions wait for an older running one, such a page is not cached
+    settled: bool = True
+
+
+class GetFriendshipChangesService:
+    """Friendship events of the user after `since` cursor, for incremental sync instead of polling the lists"""
+
+    def __init__(self, user: User, since: str | None = None, limit: int | None = None):
+        """Page of at most `limit` events of `user` after the `since` cursor"""
+        self.user = user
+        self.since = since
+        self.after = self._decode_since(since) if since else None
+        self.limit = limit or settings.FRIENDSHIP_PAGE_SIZE
+
+    @staticmethod
+    def _decode_since(since: str) -> tuple[int, int]:
+        """(transaction id, event id) of the last returned event"""
+        try:
+            transaction_id, event_id = map(int, decode_cursor(since).split(':'))
+        except ValueError as exc:
+            raise InvalidCursorError from exc
+        return transaction_id, event_id
+
+    def _user_events(self, user_field: str) -> QuerySet[FriendshipEvent]:
+        events = FriendshipEvent.objects.filter(**{user_field: self.user.id})
+        if self.after is not None:
+            transaction_id, event_id = self.after
+            # The bound on transaction_id alone is the index range, the rest is filtered in it
+            events = events.filter(
+                Q(transaction_id__gt=transaction_id) | Q(transaction_id=transaction_id, id__gt=event_id),
+                transaction_id__gte=transaction_id,
+            )
+        return events.with_settled().values_list(
+            'id', 'type', 'friendship_id', 'sender__username', 'recipient__username', 'created_at',
+            'transaction_id', 'settled',
+        )
+
+    def _events(self) -> QuerySet[FriendshipEvent]:
+        # Each side is served by its own (user, transaction_id, id) index
+        return (
+            self._user_events('sender')
+            .union(self._user_events('recipient'), all=True)
+            .order_by('transaction_id', 'id')[:self.limit + 1]
+        )
+
+    def _build_page(self, rows: list[FeedRow]) -> ChangesPage:
+        # Events of running transactions are not visible yet, but will sort after every settled event.
+        # Committed events behind them are held back until they settle
+        settled_rows = list(takewhile(lambda row: row[7], rows))
+        page_rows = settled_rows[:self.limit]
+        return ChangesPage(
+            events=[row[:6] for row in page_rows],
+            cursor=encode_cursor(f'{page_rows[-1][6]}:{page_rows[-1][0]}') if page_rows else self.since,
+            has_more=len(settled_rows) > self.limit,
+            settled=len(settled_rows) == len(rows),
+        )
+
+    def _get_page(self) -> ChangesPage:
+        return self._build_page(list(self._events()))
+
+    async def _aget_page(self) -> ChangesPage:
+        return self._build_page([row async for row in self._events()])
+
+    @property
+    def _cache_name(self) -> str:
+        # Events are written in the transaction of the change, which bumps the user version on commit
+        return f'changes:{self.limit}:{self.since}'
+
+    @staticmethod
+    def _is_cacheable(page: ChangesPage) -> bool:
+        # Settling changes no version, while commits of the user changes do
+        return page.settled
+
+    @read_from_replica
+    def __call__(self) -> ChangesPage:
+        return friend_graph_cache.get_or_set(self.user.id, self._cache_name, self._get_page, self._is_cacheable)
+
+    @read_from_replica
+    async def acall(self) -> ChangesPage:
+        return await friend_graph_cache.aget_or_set(
+            self.user.id, self._cache_name, self._aget_page, self._is_cacheable
+        )
@@ -0,0 +1,40 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import COUNTER_FIELDS, FriendshipCounters
+from friendsservice.friendship.routers import read_from_replica
+
+User = get_user_model()
+
+
+class GetFriendshipCountersService:
+    """Friends, sent and received requests counts of the user from the counters table"""
+
+    def __init__(self, user: User):
+        """Counters of `user`"""
+        self.user = user
+
+    def _counters(self) -> QuerySet[FriendshipCounters]:
+        return FriendshipCounters.objects.filter(user_id=self.user.id).values(*COUNTER_FIELDS)
+
+    def _compute(self) -> dict[str, int]:
+        # Counters of users inserted in bulk are created on their first friendship change or by reconcile
+        counters, = FriendshipCounters.compute([self.user.id])
+        return dict(zip(COUNTER_FIELDS, counters.values(), strict=True))
+
+    def _get_counters(self) -> dict[str, int]:
+        return self._counters().first() or self._compute()
+
+    async def _aget_counters(self) -> dict[str, int]:
+        counters = await self._counters().afirst()
+        return counters or await sync_to_async(self._compute)()
+
+    @read_from_replica
+    def __call__(self) -> dict[str, int]:
+        return friend_graph_cache.get_or_set(self.user.id, 'counters', self._get_counters)
+
+    @read_from_replica
+    async def acall(self) -> dict[str, int]:
+        return await friend_graph_cache.aget_or_set(self.user.id, 'counters', self._aget_counters)
@@ -1,9 +1,10 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db import transaction
 
 from friendsservice.friendship.exceptions import UserDoesNotExistsError, UserNotInFriendsListError
 from friendsservice.friendship.models import UserFriendship, FriendshipStatus
 from friendsservice.friendship.services.change_status import ChangeFriendshipStatusService
+from friendsservice.friendship.usernames import username_resolver
 
 User = get_user_model()
 
@@ -18,22 +19,21 @@ class DeleteFromFriendsService:
 
     @staticmethod
     def _get_user(username: str) -> User:
-        try:
-            return User.objects.get(username=username)
-        except User.DoesNotExists as exc:
-            raise UserDoesNotExistsError from exc
+        user_id = username_resolver.resolve(username)
+        if user_id is None:
+            raise UserDoesNotExistsError
+        return User(id=user_id, username=username)
 
     def _get_active_friendship(self) -> UserFriendship | None:
-        return UserFriendship.objects.filter(
-            Q(recipient=self.sender, sender=self.target_user) | Q(recipient=self.target_user, sender=self.sender)
-        ).first()
+        return UserFriendship.objects.between(self.sender, self.target_user).select_for_update().first()
 
     def _delete_from_friends(self) -> None:
         active_friendship = self._get_active_friendship()
-        if not active_friendship:
+        if not active_friendship or active_friendship.status == FriendshipStatus.DECLINED.value:
             raise UserNotInFriendsListError
 
         ChangeFriendshipStatusService(active_friendship, FriendshipStatus.DECLINED)()
 
     def __call__(self) -> None:
-        self._delete_from_friends()
+        with transaction.atomic():
+            self._delete_from_friends()
@@ -0,0 +1,58 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Case, Count, F, OuterRef, Q, QuerySet, Subquery, When
+
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import FriendshipStatus, UserFriendship
+from friendsservice.friendship.routers import read_from_replica
+
+User = get_user_model()
+
+
+class GetFriendSuggestionsService:
+    """People you may know: friends of friends ranked by the number of mutual friends"""
+
+    def __init__(self, user: User, limit: int | None = None):
+        """At most `limit` suggestions for `user`"""
+        self.user = user
+        self.limit = limit or settings.FRIENDSHIP_PAGE_SIZE
+
+    def _suggestions(self) -> QuerySet[UserFriendship]:
+        friend_ids = UserFriendship.objects.friend_ids(self.user.id)
+        return (
+            UserFriendship.objects.filter(status=FriendshipStatus.CONFIRMED.value)
+            .filter(Q(sender__in=friend_ids) | Q(recipient__in=friend_ids))
+            .annotate(candidate=Case(When(sender__in=friend_ids, then=F('recipient')), default=F('sender')))
+            # Skips the user itself, friends and users with any request to or from the user
+            .exclude(candidate=self.user.id)
+            .exclude(candidate__in=UserFriendship.objects.related_user_ids(self.user.id))
+            .values('candidate')
+            .annotate(
+                mutual_friends=Count('id'),
+                username=Subquery(User.objects.filter(id=OuterRef('candidate')).values('username')),
+            )
+            .order_by('-mutual_friends', 'username')
+            .values('username', 'mutual_friends')[:self.limit]
+        )
+
+    def _get_suggestions(self) -> list[dict[str, str | int]]:
+        return list(self._suggestions())
+
+    async def _aget_suggestions(self) -> list[dict[str, str | int]]:
+        return [suggestion async for suggestion in self._suggestions()]
+
+    @property
+    def _cache_name(self) -> str:
+        # Friendships of friends do not change the user version, so suggestions are also bucketed by time
+        time_bucket = int(time.time()) // settings.FRIENDSHIP_SUGGESTIONS_TIMEOUT
+        return f'suggestions:{self.limit}:{time_bucket}'
+
+    @read_from_replica
+    def __call__(self) -> list[dict[str, str | int]]:
+        return friend_graph_cache.get_or_set(self.user.id, self._cache_name, self._get_suggestions)
+
+    @read_from_replica
+    async def acall(self) -> list[dict[str, str | int]]:
+        return await friend_graph_cache.aget_or_set(self.user.id, self._cache_name, self._aget_suggestions)
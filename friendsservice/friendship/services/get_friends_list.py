@@ -1,26 +1,66 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import F, QuerySet
 
-from friendsservice.friendship.models import UserFriendship, FriendshipStatus
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import FriendshipStatus, UserFriendship
+from friendsservice.friendship.pagination import KeysetPage, decode_id_cursor
+from friendsservice.friendship.routers import read_from_replica
 
 User = get_user_model()
 
 
 class GetFriendsListService:
 
-    def __init__(self, user: User):
+    def __init__(self, user: User, cursor: str | None = None, limit: int | None = None):
         self.user = user
+        self.cursor = cursor
+        self.after_id = decode_id_cursor(cursor) if cursor else None
+        self.limit = limit or settings.FRIENDSHIP_PAGE_SIZE
 
-    def _get_friends_usernames_list(self) -> list[str]:
-        confirmed_friendships = UserFriendship.objects.filter(
-            Q(recipient=self.user) | Q(sender=self.user) & Q(status=FriendshipStatus.CONFIRMED.value)
+    def _friends(self, user_field: str, friend_field: str) -> QuerySet[UserFriendship]:
+        friendships = UserFriendship.objects.filter(
+            **{user_field: self.user.id}, status=FriendshipStatus.CONFIRMED.value
+        )
+        if self.after_id is not None:
+            friendships = friendships.filter(**{f'{friend_field}__gt': self.after_id})
+        # The (user, friend) confirmed index returns friends in order, so only the page rows are read and joined
+        friends = friendships.annotate(friend_id=F(friend_field), friend_username=F(f'{friend_field}__username'))
+        return friends.order_by('friend_id').values_list('friend_id', 'friend_username')[:self.limit + 1]
+
+    def _page_friends(self) -> QuerySet[UserFriendship]:
+        """Rows of (friend id, friend username), ordered by friend id"""
+        return (
+            self._friends('sender', 'recipient')
+            .union(self._friends('recipient', 'sender'), all=True)
+            .order_by('friend_id')[:self.limit + 1]
+        )
+
+    def _page(self, rows: list[tuple[int, str]]) -> KeysetPage:
+        page = KeysetPage.from_rows(rows, self.limit, cursor_key=self._cursor_key)
+        page.items = [username for _, username in page.items]
+        return page
+
+    @staticmethod
+    def _cursor_key(friend: tuple[int, str]) -> str:
+        return str(friend[0])
+
+    def _get_friends_usernames_page(self) -> KeysetPage:
+        return self._page(list(self._page_friends()))
+
+    async def _aget_friends_usernames_page(self) -> KeysetPage:
+        return self._page([friend async for friend in self._page_friends()])
+
+    @property
+    def _cache_name(self) -> str:
+        return f'friends:{self.limit}:{self.cursor}'
+
+    @read_from_replica
+    def __call__(self) -> KeysetPage:
+        return friend_graph_cache.get_or_set(self.user.id, self._cache_name, self._get_friends_usernames_page)
+
+    @read_from_replica
+    async def acall(self) -> KeysetPage:
+        return await friend_graph_cache.aget_or_set(
+            self.user.id, self._cache_name, self._aget_friends_usernames_page
         )
-        users_list = []
-        for friendship in confirmed_friendships:
-            users_list.append(
-                friendship.sender.username if friendship.sender != self.user else friendship.username
-            )
-        return users_list
-
-    def __call__(self) -> list[str]:
-        return self._get_friends_usernames_list()
@@ -0,0 +1,68 @@
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.exceptions import UserDoesNotExistsError
+from friendsservice.friendship.models import UserFriendship
+from friendsservice.friendship.routers import read_from_replica
+from friendsservice.friendship.usernames import username_resolver
+
+User = get_user_model()
+
+
+class GetMutualFriendsService:
+
+    def __init__(self, user: User, target_username: str, limit: int | None = None):
+        """At most `limit` mutual friends of `user` and the user with `target_username`"""
+        self.user = user
+        self.target_username = target_username
+        self.limit = limit or settings.FRIENDSHIP_PAGE_SIZE
+
+    def _get_target_user_id(self) -> int:
+        target_user_id = username_resolver.resolve(self.target_username)
+        if target_user_id is None:
+            raise UserDoesNotExistsError
+        return target_user_id
+
+    async def _aget_target_user_id(self) -> int:
+        target_user_id = await username_resolver.aresolve(self.target_username)
+        if target_user_id is None:
+            raise UserDoesNotExistsError
+        return target_user_id
+
+    def _mutual_friends_usernames(self, target_user_id: int) -> QuerySet[User]:
+        return (
+            User.objects.filter(id__in=UserFriendship.objects.friend_ids(self.user.id))
+            .filter(id__in=UserFriendship.objects.friend_ids(target_user_id))
+            .order_by('username')
+            .values_list('username', flat=True)[:self.limit]
+        )
+
+    def _get_mutual_friends_usernames(self, target_user_id: int) -> list[str]:
+        return list(self._mutual_friends_usernames(target_user_id))
+
+    async def _aget_mutual_friends_usernames(self, target_user_id: int) -> list[str]:
+        return [username async for username in self._mutual_friends_usernames(target_user_id)]
+
+    def _cache_name(self, target_user_id: int, target_version: int) -> str:
+        # Friendships of the target user change its version, not the version of requesting user
+        return f'mutual:{target_user_id}:{target_version}:{self.limit}'
+
+    @read_from_replica
+    def __call__(self) -> list[str]:
+        target_user_id = self._get_target_user_id()
+        cache_name = self._cache_name(target_user_id, friend_graph_cache.version(target_user_id))
+        return friend_graph_cache.get_or_set(
+            self.user.id, cache_name, partial(self._get_mutual_friends_usernames, target_user_id)
+        )
+
+    @read_from_replica
+    async def acall(self) -> list[str]:
+        target_user_id = await self._aget_target_user_id()
+        cache_name = self._cache_name(target_user_id, await friend_graph_cache.aversion(target_user_id))
+        return await friend_graph_cache.aget_or_set(
+            self.user.id, cache_name, partial(self._aget_mutual_friends_usernames, target_user_id)
+        )
@@ -0,0 +1,98 @@
+import hashlib
+from dataclasses import dataclass
+from enum import Enum
+
+from django.contrib.auth import get_user_model
+from django.db.models import OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Greatest, Least
+
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import BlockedFriendshipPair, FriendshipStatus, UserFriendship
+from friendsservice.friendship.routers import read_from_replica
+
+User = get_user_model()
+
+
+class PairStatus(Enum):
+    NONE = 'none'
+    FRIENDS = 'friends'
+    REQUEST_SENT = 'request_sent'
+    REQUEST_RECEIVED = 'request_received'
+    DECLINED = 'declined'
+    NOT_FOUND = 'not_found'
+
+
+@dataclass(frozen=True)
+class FriendshipPairStatus:
+    username: str
+    status: PairStatus
+    friendship_id: int | None = None
+
+
+class GetFriendshipStatusService:
+    """Statuses of the requesting user friendships with target users, looked up in one query by the pair index"""
+
+    def __init__(self, user: User, target_usernames: list[str]):
+        """Statuses of `user` with each of the usernames, repeated ones once"""
+        self.user = user
+        self.target_usernames = list(dict.fromkeys(target_usernames))
+
+    def _pair_filter(self) -> dict[str, Least | Greatest]:
+        return {
+            'user_low': Least(OuterRef('id'), Value(self.user.id)),
+            'user_high': Greatest(OuterRef('id'), Value(self.user.id)),
+        }
+
+    def _rows(self) -> QuerySet[User]:
+        pair_friendships = UserFriendship.objects.filter(**self._pair_filter())
+        blocked_pairs = BlockedFriendshipPair.objects.filter(**self._pair_filter())
+        return User.objects.filter(username__in=self.target_usernames).annotate(
+            friendship_id=Subquery(pair_friendships.values('id')[:1]),
+            friendship_status=Subquery(pair_friendships.values('status')[:1]),
+            friendship_sender_id=Subquery(pair_friendships.values('sender_id')[:1]),
+            blocked_friendship_id=Subquery(blocked_pairs.values('friendship_id')[:1]),
+        ).values_list(
+            'username', 'friendship_id', 'friendship_status', 'friendship_sender_id', 'blocked_friendship_id'
+        )
+
+    def _get_pair_status(self, status: int | None, sender_id: int | None) -> PairStatus:
+        if status is None:
+            return PairStatus.NONE
+        if status == FriendshipStatus.CONFIRMED.value:
+            return PairStatus.FRIENDS
+        if status == FriendshipStatus.DECLINED.value:
+            return PairStatus.DECLINED
+        return PairStatus.REQUEST_SENT if sender_id == self.user.id else PairStatus.REQUEST_RECEIVED
+
+    def _build_statuses(self, rows: list[tuple[str | int | None, ...]]) -> list[FriendshipPairStatus]:
+        found = {}
+        for username, pair_friendship_id, pair_status, sender_id, blocked_friendship_id in rows:
+            friendship_id, status = pair_friendship_id, pair_status
+            if blocked_friendship_id is not None:
+                # Compacted declined friendship
+                friendship_id, status = blocked_friendship_id, FriendshipStatus.DECLINED.value
+            found[username] = FriendshipPairStatus(username, self._get_pair_status(status, sender_id), friendship_id)
+        return [
+            found.get(username, FriendshipPairStatus(username, PairStatus.NOT_FOUND))
+            for username in self.target_usernames
+        ]
+
+    def _get_statuses(self) -> list[FriendshipPairStatus]:
+        return self._build_statuses(list(self._rows()))
+
+    async def _aget_statuses(self) -> list[FriendshipPairStatus]:
+        return self._build_statuses([row async for row in self._rows()])
+
+    @property
+    def _cache_name(self) -> str:
+        # Every change of a pair bumps the versions of both users, so the requesting user version is enough
+        usernames_digest = hashlib.sha1(','.join(self.target_usernames).encode()).hexdigest()  # noqa: S324
+        return f'status:{usernames_digest}'
+
+    @read_from_replica
+    def __call__(self) -> list[FriendshipPairStatus]:
+        return friend_graph_cache.get_or_set(self.user.id, self._cache_name, self._get_statuses)
+
+    @read_from_replica
+    async def acall(self) -> list[FriendshipPairStatus]:
+        return await friend_graph_cache.aget_or_set(self.user.id, self._cache_name, self._aget_statuses)
@@ -1,18 +1,50 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db.models import QuerySet
 
-from friendsservice.friendship.models import UserFriendship, FriendshipStatus
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import FriendshipStatus, UserFriendship
+from friendsservice.friendship.pagination import KeysetPage, decode_id_cursor
+from friendsservice.friendship.routers import read_from_replica
 
 User = get_user_model()
 
 
 class GetReceivedFriendshipRequestsService:
 
-    def __init__(self, user: User):
+    def __init__(self, user: User, cursor: str | None = None, limit: int | None = None):
         self.user = user
+        self.cursor = cursor
+        self.after_id = decode_id_cursor(cursor) if cursor else None
+        self.limit = limit or settings.FRIENDSHIP_PAGE_SIZE
 
-    def _get_requests(self) -> QuerySet[UserFriendship]:
-        return UserFriendship.objects.filter(recipient=self.user, status=FriendshipStatus.ACTIVE.value)
+    def _requests(self) -> QuerySet[UserFriendship]:
+        """Rows of (request id, sender username), ordered by id"""
+        requests = UserFriendship.objects.filter(recipient=self.user.id, status=FriendshipStatus.ACTIVE.value)
+        if self.after_id is not None:
+            requests = requests.filter(id__gt=self.after_id)
+        return requests.order_by('id').values_list('id', 'sender__username')[:self.limit + 1]
 
-    def __call__(self) -> QuerySet[UserFriendship]:
-        return self._get_requests()
+    def _get_requests_page(self) -> KeysetPage:
+        return KeysetPage.from_rows(list(self._requests()), self.limit, cursor_key=self._cursor_key)
+
+    async def _aget_requests_page(self) -> KeysetPage:
+        return KeysetPage.from_rows(
+            [request async for request in self._requests()], self.limit, cursor_key=self._cursor_key
+        )
+
+    @staticmethod
+    def _cursor_key(request: tuple[int, str]) -> str:
+        return str(request[0])
+
+    @property
+    def _cache_name(self) -> str:
+        return f'received_requests:{self.limit}:{self.cursor}'
+
+    @read_from_replica
+    def __call__(self) -> KeysetPage:
+        return friend_graph_cache.get_or_set(self.user.id, self._cache_name, self._get_requests_page)
+
+    @read_from_replica
+    async def acall(self) -> KeysetPage:
+        return await friend_graph_cache.aget_or_set(self.user.id, self._cache_name, self._aget_requests_page)
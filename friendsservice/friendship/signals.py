@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from friendsservice.friendship.models import FriendshipCounters
+from friendsservice.friendship.usernames import username_resolver
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def create_friendship_counters(instance: User, created: bool, **kwargs) -> None:  # noqa: ARG001, FBT001
+    """Create the counters row of a new user"""
+    if created:
+        FriendshipCounters.objects.create(user=instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_username(instance: User, **kwargs) -> None:  # noqa: ARG001
+    """Drop cached ids of the username once the change commits"""
+    # New users may be cached as unknown, saved ones may have been renamed from another username,
+    # which stays cached until its entries expire
+    username_resolver.invalidate_on_commit(instance.username)
@@ -0,0 +1,155 @@
+import ast
+import json
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from friendsservice.friendship.models import FriendshipStatus, UserFriendship
+
+User = get_user_model()
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+# Leaves room for a shape of any length, so the header is rewritten in place once the array is complete
+NPY_HEADER_SIZE = 128
+NPY_DTYPES = {'q': '<i8', 'i': '<i4'}
+
+
+class NpyWriter:
+    """Streams a one-dimensional array into a `.npy` file, which NumPy loads with `mmap_mode`"""
+
+    def __init__(self, path: Path, typecode: str):
+        """Create the file for an array of `typecode` items, see `NPY_DTYPES`"""
+        self.typecode = typecode
+        self.length = 0
+        self.file: BinaryIO = path.open('wb')
+        self._write_header()
+
+    def _write_header(self) -> None:
+        header = repr({'descr': NPY_DTYPES[self.typecode], 'fortran_order': False, 'shape': (self.length,)})
+        header = header.encode().ljust(NPY_HEADER_SIZE - len(NPY_MAGIC) - 3) + b'\n'
+        self.file.write(NPY_MAGIC + struct.pack('<H', len(header)) + header)
+
+    def write(self, values: array) -> None:
+        if sys.byteorder == 'big':
+            values = array(self.typecode, values)
+            values.byteswap()
+        values.tofile(self.file)
+        self.length += len(values)
+
+    def close(self) -> None:
+        self.file.seek(0)
+        self._write_header()
+        self.file.close()
+
+
+def read_npy(path: Path) -> array:
+    """Read an array written by `NpyWriter` without NumPy"""
+    with path.open('rb') as file:
+        file.seek(len(NPY_MAGIC))
+        header = ast.literal_eval(file.read(struct.unpack('<H', file.read(2))[0]).decode())
+        typecode = {dtype: typecode for typecode, dtype in NPY_DTYPES.items()}[header['descr']]
+        values = array(typecode)
+        values.fromfile(file, header['shape'][0])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+@dataclass
+class SnapshotMeta:
+    created_at: str
+    nodes: int
+    edges: int
+
+
+class FriendGraphSnapshotBuilder:
+    """Writes confirmed friendships as an undirected graph in CSR form into a directory.
+
+    `node_ids.npy` holds sorted user ids, the friends of the node `i` are `neighbors[offsets[i]:offsets[i + 1]]`,
+    as node indexes. Users and friendships are streamed with server-side cursors from one REPEATABLE READ snapshot,
+    so only the arrays of the current batch and the user ids are kept in memory.
+    """
+
+    def __init__(self, directory: Path, batch_size: int, using: str = 'default'):
+        """Write into an existing `directory`, reading `batch_size` rows at a time from database `using`"""
+        self.directory = directory
+        self.batch_size = batch_size
+        self.using = using
+
+    def _write_node_ids(self) -> array:
+        node_ids = array('q')
+        writer = NpyWriter(self.directory / 'node_ids.npy', 'q')
+        users = User.objects.using(self.using).order_by('id').values_list('id', flat=True)
+        batch = array('q')
+        for user_id in users.iterator(chunk_size=self.batch_size):
+            batch.append(user_id)
+            if len(batch) == self.batch_size:
+                writer.write(batch)
+                node_ids.extend(batch)
+                batch = array('q')
+        writer.write(batch)
+        node_ids.extend(batch)
+        writer.close()
+        return node_ids
+
+    def _edges(self) -> QuerySet[UserFriendship]:
+        # Both directions of every friendship, grouped by the first user
+        friendships = UserFriendship.objects.using(self.using).filter(status=FriendshipStatus.CONFIRMED.value)
+        return friendships.values_list('sender', 'recipient').union(
+            friendships.values_list('recipient', 'sender'), all=True
+        ).order_by('sender', 'recipient')
+
+    def _write_adjacency(self, node_ids: array) -> int:
+        # Node indexes fit in 32 bits for any realistic number of users
+        neighbors_typecode = 'i' if len(node_ids) < 2 ** 31 else 'q'
+        offsets_writer = NpyWriter(self.directory / 'offsets.npy', 'q')
+        neighbors_writer = NpyWriter(self.directory / 'neighbors.npy', neighbors_typecode)
+        offsets, neighbors = array('q', [0]), array(neighbors_typecode)
+        edges_count = node = 0
+
+        for user_id, friend_id in self._edges().iterator(chunk_size=self.batch_size):
+            user_node = bisect_left(node_ids, user_id)
+            # Offsets of the nodes up to the current one, friendless nodes get empty ranges
+            while node < user_node:
+                offsets.append(edges_count)
+                node += 1
+            neighbors.append(bisect_left(node_ids, friend_id))
+            edges_count += 1
+            if len(neighbors) >= self.batch_size:
+                neighbors_writer.write(neighbors)
+                neighbors = array(neighbors_typecode)
+            if len(offsets) >= self.batch_size:
+                offsets_writer.write(offsets)
+                offsets = array('q')
+
+        offsets.extend([edges_count] * (len(node_ids) - node))
+        offsets_writer.write(offsets)
+        neighbors_writer.write(neighbors)
+        offsets_writer.close()
+        neighbors_writer.close()
+        return edges_count
+
+    def build(self) -> SnapshotMeta:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        connection = connections[self.using]
+        # Isolation level is set by the first statement of a transaction, an outer one keeps its own
+        set_isolation_level = not connection.in_atomic_block
+        with transaction.atomic(using=self.using):
+            if set_isolation_level:
+                with connection.cursor() as cursor:
+                    cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+            node_ids = self._write_node_ids()
+            edges_count = self._write_adjacency(node_ids)
+
+        meta = SnapshotMeta(created_at=timezone.now().isoformat(), nodes=len(node_ids), edges=edges_count // 2)
+        (self.directory / 'meta.json').write_text(json.dumps(asdict(meta)))
+        return meta
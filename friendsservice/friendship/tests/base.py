@@ -1,10 +1,32 @@
+import asyncio
+from collections.abc import Callable
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
+from django.core.cache.backends.locmem import LocMemCache
 from django.test import TestCase
 
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.usernames import username_resolver
+
 User = get_user_model()
 
 
+def forbid_blocking_cache_reads() -> mock._patch:
+    """Patch the cache backend so that a sync `get` called in a running event loop fails the test"""
+    get = LocMemCache.get
+
+    def guarded_get(cache: LocMemCache, *args: object, **kwargs: object) -> object:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return get(cache, *args, **kwargs)
+        raise AssertionError('Blocking cache read in the event loop')
+
+    return mock.patch.object(LocMemCache, 'get', guarded_get)
+
+
 class BaseTestCase(TestCase):
     first_user: User
     first_username: str = 'first'
@@ -32,6 +54,10 @@ class BaseTestCase(TestCase):
         cls.second_user.delete()
         cls.third_user.delete()
 
+    def setUp(self) -> None:
+        friend_graph_cache.clear()
+        username_resolver.clear()
+
     @classmethod
     def get_or_create_user(cls, username: str, password: str) -> User:
         user, _ = User.objects.get_or_create(
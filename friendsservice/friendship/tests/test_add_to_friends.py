@@ -1,4 +1,6 @@
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 
 from friendsservice.friendship.exceptions import (
     FriendshipRequestAlreadyExistsError, UserDoesNotExistsError, UserCannotBeFriendError
@@ -98,3 +100,29 @@ class AddToFriendsServiceTestCase(BaseTestCase):
             service()
 
         self.assertEqual(UserFriendship.objects.count(), base_friendships_count)
+
+    def test_friendship_pair_is_unordered(self):
+        service = self.service(self.second_user, self.first_username)
+        service()
+
+        created_friendship = self.get_friendship_from(self.second_user, self.first_user)
+        self.assertEqual(created_friendship.user_low_id, min(self.first_user.id, self.second_user.id))
+        self.assertEqual(created_friendship.user_high_id, max(self.first_user.id, self.second_user.id))
+        self.assertEqual(UserFriendship.objects.between(self.first_user, self.second_user).get(), created_friendship)
+
+    def test_duplicate_pair_rejected_by_database(self):
+        UserFriendship.objects.create(sender=self.first_user, recipient=self.second_user)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UserFriendship.objects.create(sender=self.second_user, recipient=self.first_user)
+        self.assertEqual(UserFriendship.objects.between(self.first_user, self.second_user).count(), 1)
+
+    def test_exist_request_is_accepted_by_upsert(self):
+        UserFriendship.objects.create(sender=self.first_user, recipient=self.second_user)
+        with CaptureQueriesContext(connection) as queries:
+            self.service(self.second_user, self.first_username)()
+
+        friendship_queries = [query['sql'] for query in queries.captured_queries if 'userfriendship' in query['sql']]
+        self.assertEqual(len(friendship_queries), 1)
+        self.assertIn('ON CONFLICT', friendship_queries[0])
+        created_friendship = self.get_friendship_from(self.first_user, self.second_user)
+        self.assertEqual(created_friendship.status, FriendshipStatus.CONFIRMED.value)
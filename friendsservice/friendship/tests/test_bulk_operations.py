@@ -0,0 +1,83 @@
+from friendsservice.friendship.models import UserFriendship, FriendshipStatus
+from friendsservice.friendship.services.bulk_add_to_friends import BulkAddToFriendsService, AddToFriendsResult
+from friendsservice.friendship.services.bulk_change_status import (
+    BulkChangeFriendshipStatusService, ChangeFriendshipStatusResult
+)
+from friendsservice.friendship.tests.base import BaseTestCase
+
+
+class BulkAddToFriendsServiceTestCase(BaseTestCase):
+    service = BulkAddToFriendsService
+
+    def tearDown(self) -> None:
+        UserFriendship.objects.all().delete()
+
+    def test_bulk_add_to_friends(self):
+        with self.assertNumQueries(10):
+            results = self.service(
+                self.first_user, [self.second_username, self.third_username, self.unexpected_username]
+            )()
+
+        self.assertEqual(results, {
+            self.second_username: AddToFriendsResult.SENT,
+            self.third_username: AddToFriendsResult.SENT,
+            self.unexpected_username: AddToFriendsResult.NOT_FOUND,
+        })
+        self.assertEqual(UserFriendship.objects.filter(sender=self.first_user).count(), 2)
+
+    def test_bulk_add_with_exist_requests(self):
+        UserFriendship.objects.create(sender=self.second_user, recipient=self.first_user)
+        UserFriendship.objects.create(
+            sender=self.third_user, recipient=self.first_user, status=FriendshipStatus.DECLINED.value
+        )
+
+        results = self.service(self.first_user, [self.second_username, self.third_username, self.first_username])()
+        self.assertEqual(results, {
+            self.second_username: AddToFriendsResult.CONFIRMED,
+            self.third_username: AddToFriendsResult.CANNOT_BE_FRIEND,
+            self.first_username: AddToFriendsResult.CANNOT_BE_FRIEND,
+        })
+        self.assertEqual(
+            UserFriendship.objects.get(sender=self.second_user).status, FriendshipStatus.CONFIRMED.value
+        )
+
+        results = self.service(self.second_user, [self.first_username, self.third_username])()
+        self.assertEqual(results, {
+            self.first_username: AddToFriendsResult.ALREADY_FRIENDS,
+            self.third_username: AddToFriendsResult.SENT,
+        })
+        results = self.service(self.second_user, [self.third_username])()
+        self.assertEqual(results, {self.third_username: AddToFriendsResult.ALREADY_SENT})
+
+
+class BulkChangeFriendshipStatusServiceTestCase(BaseTestCase):
+    service = BulkChangeFriendshipStatusService
+
+    def tearDown(self) -> None:
+        UserFriendship.objects.all().delete()
+
+    def test_bulk_accept_received_requests(self):
+        received_request = UserFriendship.objects.create(sender=self.second_user, recipient=self.first_user)
+        sent_request = UserFriendship.objects.create(sender=self.first_user, recipient=self.third_user)
+
+        results = self.service(self.first_user, [received_request.id, sent_request.id], FriendshipStatus.CONFIRMED)()
+        self.assertEqual(results, {
+            received_request.id: ChangeFriendshipStatusResult.CHANGED,
+            sent_request.id: ChangeFriendshipStatusResult.NOT_FOUND,
+        })
+
+        received_request.refresh_from_db()
+        sent_request.refresh_from_db()
+        self.assertEqual(received_request.status, FriendshipStatus.CONFIRMED.value)
+        self.assertEqual(sent_request.status, FriendshipStatus.ACTIVE.value)
+
+    def test_bulk_decline_received_requests(self):
+        received_request = UserFriendship.objects.create(sender=self.second_user, recipient=self.first_user)
+
+        results = self.service(self.first_user, [received_request.id], FriendshipStatus.DECLINED)()
+        self.assertEqual(results, {received_request.id: ChangeFriendshipStatusResult.CHANGED})
+        received_request.refresh_from_db()
+        self.assertEqual(received_request.status, FriendshipStatus.DECLINED.value)
+
+        results = self.service(self.first_user, [received_request.id], FriendshipStatus.CONFIRMED)()
+        self.assertEqual(results, {received_request.id: ChangeFriendshipStatusResult.NOT_FOUND})
@@ -0,0 +1,82 @@
+from django.test import SimpleTestCase
+
+from friendsservice.friendship.cache import LRUCache, FriendGraphCache
+from friendsservice.friendship.models import UserFriendship
+from friendsservice.friendship.services.add_to_friends import AddToFriendsService
+from friendsservice.friendship.services.sent_requests import GetSentFriendshipRequestsService
+from friendsservice.friendship.tests.base import BaseTestCase
+
+
+class LRUCacheTestCase(SimpleTestCase):
+
+    def test_least_recently_used_key_evicted(self):
+        cache = LRUCache(max_size=2)
+        cache.set('first', 1)
+        cache.set('second', 2)
+        self.assertEqual(cache.get('first'), 1)
+
+        cache.set('third', 3)
+        self.assertIsNone(cache.get('second'))
+        self.assertEqual(cache.get('first'), 1)
+        self.assertEqual(cache.get('third'), 3)
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (3, 1, 1))
+
+
+class FriendGraphCacheTestCase(SimpleTestCase):
+
+    def setUp(self) -> None:
+        self.cache = FriendGraphCache(alias='friendship', local_max_size=10, timeout=60)
+        self.cache.clear()
+
+    def test_read_through(self):
+        calls = []
+
+        def load() -> list[str]:
+            calls.append(1)
+            return ['friend']
+
+        self.assertEqual(self.cache.get_or_set(1, 'friends', load), ['friend'])
+        self.assertEqual(self.cache.get_or_set(1, 'friends', load), ['friend'])
+        self.assertEqual(len(calls), 1)
+
+        self.cache.local.clear()
+        self.assertEqual(self.cache.get_or_set(1, 'friends', load), ['friend'])
+        self.assertEqual(len(calls), 1)
+        self.assertIn(('friendship_cache_shared_hits_total', 'counter', 1), self.cache.metrics())
+
+    async def test_async_read_through(self):
+        async def load() -> list[str]:
+            return ['friend']
+
+        self.assertEqual(await self.cache.aget_or_set(1, 'friends', load), ['friend'])
+        self.cache.local.clear()
+        self.assertEqual(await self.cache.aget_or_set(1, 'friends', list), ['friend'])
+        self.assertEqual(await self.cache.aversion(1), self.cache.version(1))
+
+    def test_invalidate_bumps_version(self):
+        self.cache.get_or_set(1, 'friends', list)
+        version = self.cache.version(1)
+        other_version = self.cache.version(2)
+
+        self.cache.invalidate(1)
+        self.assertNotEqual(self.cache.version(1), version)
+        self.assertEqual(self.cache.version(2), other_version)
+        self.assertEqual(self.cache.get_or_set(1, 'friends', lambda: ['new friend']), ['new friend'])
+
+
+class FriendshipServicesCacheTestCase(BaseTestCase):
+
+    def tearDown(self) -> None:
+        UserFriendship.objects.all().delete()
+
+    def test_write_service_invalidates_on_commit(self):
+        self.assertEqual(GetSentFriendshipRequestsService(self.first_user)().items, [])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            AddToFriendsService(self.first_user, self.second_username)()
+            with self.assertNumQueries(0):
+                self.assertEqual(GetSentFriendshipRequestsService(self.first_user)().items, [])
+        self.assertEqual(len(callbacks), 1)
+
+        sent_requests = GetSentFriendshipRequestsService(self.first_user)().items
+        self.assertEqual([username for _, username in sent_requests], [self.second_username])
@@ -0,0 +1,169 @@
+import io
+import threading
+import time
+from collections.abc import Callable
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from friendsservice.friendship.exceptions import UserCannotBeFriendError
+from friendsservice.friendship.models import UserFriendship, FriendshipStatus, BlockedFriendshipPair
+from friendsservice.friendship.services.add_to_friends import AddToFriendsService
+from friendsservice.friendship.services.bulk_add_to_friends import AddToFriendsResult, BulkAddToFriendsService
+from friendsservice.friendship.services.friend_suggestions import GetFriendSuggestionsService
+from friendsservice.friendship.services.pair_status import (
+    FriendshipPairStatus, GetFriendshipStatusService, PairStatus
+)
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.tests.base import BaseTestCase
+
+User = get_user_model()
+
+
+class CompactDeclinedFriendshipsTestCase(BaseTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.declined = UserFriendship.objects.create(
+            sender=self.first_user, recipient=self.second_user, status=FriendshipStatus.DECLINED.value
+        )
+        UserFriendship.objects.filter(id=self.declined.id).update(updated_at=timezone.now() - timedelta(days=40))
+
+    def tearDown(self) -> None:
+        UserFriendship.objects.all().delete()
+        BlockedFriendshipPair.objects.all().delete()
+
+    def compact(self, *args: str) -> str:
+        stdout = io.StringIO()
+        call_command('compact_declined_friendships', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_moves_only_old_declined_friendships(self):
+        recent = UserFriendship.objects.create(
+            sender=self.first_user, recipient=self.third_user, status=FriendshipStatus.DECLINED.value
+        )
+        confirmed = UserFriendship.objects.create(
+            sender=self.second_user, recipient=self.third_user, status=FriendshipStatus.CONFIRMED.value
+        )
+        UserFriendship.objects.filter(id=confirmed.id).update(updated_at=timezone.now() - timedelta(days=40))
+
+        self.assertEqual(self.compact('--retention-days', '30', '--batch-size', '1'), 'Compacted 1 declined friendships\n')
+
+        self.assertEqual(
+            set(UserFriendship.objects.values_list('id', flat=True)), {recent.id, confirmed.id}
+        )
+        blocked_pair = BlockedFriendshipPair.objects.get()
+        self.assertEqual(
+            (blocked_pair.friendship_id, blocked_pair.user_low_id, blocked_pair.user_high_id),
+            (self.declined.id, self.declined.user_low_id, self.declined.user_high_id),
+        )
+
+    def test_blocked_pair_is_honored(self):
+        self.compact()
+
+        with self.assertRaises(UserCannotBeFriendError):
+            AddToFriendsService(self.second_user, self.first_username)()
+        self.assertEqual(
+            BulkAddToFriendsService(self.first_user, [self.second_username, self.third_username])(),
+            {self.second_username: AddToFriendsResult.CANNOT_BE_FRIEND, self.third_username: AddToFriendsResult.SENT},
+        )
+        self.assertEqual(
+            GetFriendshipStatusService(self.second_user, [self.first_username])(),
+            [FriendshipPairStatus(self.first_username, PairStatus.DECLINED, self.declined.id)],
+        )
+        self.assertFalse(UserFriendship.objects.between(self.first_user, self.second_user).exists())
+
+    def test_blocked_pair_is_not_suggested(self):
+        UserFriendship.objects.create(
+            sender=self.first_user, recipient=self.third_user, status=FriendshipStatus.CONFIRMED.value
+        )
+        UserFriendship.objects.create(
+            sender=self.third_user, recipient=self.second_user, status=FriendshipStatus.CONFIRMED.value
+        )
+        self.compact()
+
+        self.assertEqual(GetFriendSuggestionsService(self.first_user)(), [])
+
+
+class InterleavedCompactionTestCase(TransactionTestCase):
+
+    def setUp(self) -> None:
+        friend_graph_cache.clear()
+        self.first_user = User.objects.create(username='first')
+        self.second_user = User.objects.create(username='second')
+        self.declined = UserFriendship.objects.create(
+            sender=self.first_user, recipient=self.second_user, status=FriendshipStatus.DECLINED.value
+        )
+        UserFriendship.objects.filter(id=self.declined.id).update(updated_at=timezone.now() - timedelta(days=40))
+
+    def run_in_transaction(
+        self, target: Callable[[], object], done: threading.Event, release: threading.Event
+    ) -> tuple[threading.Thread, list]:
+        """Run `target` in a transaction of another thread, which commits once `release` is set"""
+        results = []
+
+        def run() -> None:
+            try:
+                with transaction.atomic():
+                    results.append(target())
+                    done.set()
+                    release.wait(timeout=10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(release.set)
+        return thread, results
+
+    @staticmethod
+    def wait_for_lock_wait() -> None:
+        for _ in range(100):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT count(*) FROM pg_locks WHERE NOT granted')
+                if cursor.fetchone()[0]:
+                    return
+            time.sleep(0.05)
+
+    def compact(self) -> int:
+        return BlockedFriendshipPair.objects.compact(timezone.now() - timedelta(days=30), batch_size=10)
+
+    def test_request_waits_for_compaction(self):
+        compacted, release = threading.Event(), threading.Event()
+        compaction, _ = self.run_in_transaction(self.compact, compacted, release)
+        compacted.wait(timeout=10)
+
+        # The request checks blocked pairs only once the compaction is committed
+        requested, release_request = threading.Event(), threading.Event()
+        request, upserted = self.run_in_transaction(
+            lambda: UserFriendship.objects.upsert_request(self.second_user.id, self.first_user.id),
+            requested,
+            release_request,
+        )
+        self.wait_for_lock_wait()
+        release.set()
+        compaction.join()
+        requested.wait(timeout=10)
+        release_request.set()
+        request.join()
+
+        self.assertEqual(upserted, [None])
+        self.assertFalse(UserFriendship.objects.exists())
+        self.assertTrue(BlockedFriendshipPair.objects.filter(friendship_id=self.declined.id).exists())
+
+    def test_compaction_skips_pair_of_request(self):
+        requested, release = threading.Event(), threading.Event()
+        request, _ = self.run_in_transaction(
+            lambda: UserFriendship.objects.upsert_request(self.second_user.id, self.first_user.id), requested, release
+        )
+        requested.wait(timeout=10)
+
+        self.assertEqual(self.compact(), 0)
+        release.set()
+        request.join()
+        self.assertEqual(self.compact(), 1)
@@ -0,0 +1,85 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from friendsservice.friendship.models import UserFriendship, FriendshipStatus, FriendshipCounters, FriendshipEventType
+from friendsservice.friendship.services.add_to_friends import AddToFriendsService
+from friendsservice.friendship.services.bulk_add_to_friends import BulkAddToFriendsService
+from friendsservice.friendship.services.bulk_change_status import BulkChangeFriendshipStatusService
+from friendsservice.friendship.services.change_status import ChangeFriendshipStatusService
+from friendsservice.friendship.services.counters import GetFriendshipCountersService
+from friendsservice.friendship.services.delete_from_friends import DeleteFromFriendsService
+from friendsservice.friendship.tests.base import BaseTestCase
+
+
+class FriendshipCountersTestCase(BaseTestCase):
+
+    def tearDown(self) -> None:
+        UserFriendship.objects.all().delete()
+
+    def assertCounters(self, user, friends: int, sent_requests: int, received_requests: int) -> None:  # noqa: N802
+        self.assertEqual(
+            FriendshipCounters.objects.get(user=user).values(), (friends, sent_requests, received_requests)
+        )
+
+    def test_counters_follow_changes(self):
+        AddToFriendsService(self.first_user, self.second_username)()
+        AddToFriendsService(self.first_user, self.third_username)()
+        self.assertCounters(self.first_user, 0, 2, 0)
+        self.assertCounters(self.second_user, 0, 0, 1)
+
+        AddToFriendsService(self.second_user, self.first_username)()
+        friendship = UserFriendship.objects.get(sender=self.first_user, recipient=self.third_user)
+        ChangeFriendshipStatusService(friendship.id, FriendshipStatus.DECLINED)()
+        self.assertCounters(self.first_user, 1, 0, 0)
+        self.assertCounters(self.second_user, 1, 0, 0)
+        self.assertCounters(self.third_user, 0, 0, 0)
+
+        DeleteFromFriendsService(self.first_user, self.second_username)()
+        self.assertCounters(self.first_user, 0, 0, 0)
+        self.assertCounters(self.second_user, 0, 0, 0)
+
+    def test_bulk_changes(self):
+        BulkAddToFriendsService(self.second_user, [self.first_username])()
+        BulkAddToFriendsService(self.first_user, [self.second_username, self.third_username])()
+        self.assertCounters(self.first_user, 1, 1, 0)
+        self.assertCounters(self.third_user, 0, 0, 1)
+
+        friendship = UserFriendship.objects.get(sender=self.first_user, recipient=self.third_user)
+        BulkChangeFriendshipStatusService(self.third_user, [friendship.id], FriendshipStatus.CONFIRMED)()
+        self.assertCounters(self.first_user, 2, 0, 0)
+        self.assertCounters(self.third_user, 1, 0, 0)
+
+    def test_rows_locked_in_user_id_order(self):
+        # The recipient has the lower id, its delta group is updated second
+        friendship = UserFriendship(sender_id=self.third_user.id, recipient_id=self.first_user.id)
+        with CaptureQueriesContext(connection) as queries:
+            FriendshipCounters.objects.apply(FriendshipEventType.REQUEST_SENT, friendship)
+
+        lock_query = queries.captured_queries[0]['sql']
+        self.assertRegex(lock_query, r'ORDER BY "friendship_friendshipcounters"."user_id" ASC FOR UPDATE$')
+        self.assertCounters(self.third_user, 0, 1, 0)
+        self.assertCounters(self.first_user, 0, 0, 1)
+
+    def test_missing_counters_recomputed(self):
+        UserFriendship.objects.create(sender=self.second_user, recipient=self.first_user)
+        FriendshipCounters.objects.filter(user=self.first_user).delete()
+
+        self.assertEqual(
+            GetFriendshipCountersService(self.first_user)(),
+            {'friends': 0, 'sent_requests': 0, 'received_requests': 1},
+        )
+        AddToFriendsService(self.first_user, self.second_username)()
+        self.assertCounters(self.first_user, 1, 0, 0)
+
+    def test_reconcile_command(self):
+        AddToFriendsService(self.first_user, self.second_username)()
+        FriendshipCounters.objects.filter(user=self.first_user).update(friends=5, sent_requests=0)
+
+        stdout = io.StringIO()
+        call_command('reconcile_friendship_counters', '--batch-size', '2', stdout=stdout)
+
+        self.assertEqual(stdout.getvalue(), f'Reconciled {self.users_count} users, repaired 1\n')
+        self.assertCounters(self.first_user, 0, 1, 0)
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.utils import timezone
+
+from friendsservice.friendship.export import FriendshipExport
+from friendsservice.friendship.models import UserFriendship, FriendshipStatus, BlockedFriendshipPair
+from friendsservice.friendship.tests.base import BaseTestCase
+
+User = get_user_model()
+
+
+class FriendshipExportTestCase(BaseTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.friendship = UserFriendship.objects.create(
+            sender=self.first_user, recipient=self.second_user, status=FriendshipStatus.CONFIRMED.value
+        )
+        self.request = UserFriendship.objects.create(sender=self.third_user, recipient=self.first_user)
+        self.declined = UserFriendship.objects.create(
+            sender=self.second_user, recipient=self.third_user, status=FriendshipStatus.DECLINED.value
+        )
+
+    def tearDown(self) -> None:
+        UserFriendship.objects.all().delete()
+        BlockedFriendshipPair.objects.all().delete()
+
+    def test_user_export_in_chunks(self):
+        export = FriendshipExport('ndjson', user_id=self.first_user.id, chunk_size=1)
+        chunks = list(export.chunks())
+
+        self.assertEqual(len(chunks), 2)
+        rows = [json.loads(chunk) for chunk in chunks]
+        self.assertEqual(rows[0], {
+            'id': self.friendship.id,
+            'sender_id': self.first_user.id,
+            'sender': self.first_username,
+            'recipient_id': self.second_user.id,
+            'recipient': self.second_username,
+            'status': 'confirmed',
+            'updated_at': self.friendship.updated_at.isoformat(),
+        })
+        self.assertEqual((rows[1]['id'], rows[1]['status']), (self.request.id, 'active'))
+        self.assertEqual(export.exported, 2)
+
+    def test_all_friendships_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'friendships.csv'
+            stdout = io.StringIO()
+            call_command(
+                'export_friendships', str(path), '--format', 'csv', '--chunk-size', '2', stdout=stdout
+            )
+            rows = list(csv.DictReader(path.open(newline='')))
+
+        self.assertEqual(stdout.getvalue(), 'Exported 3 friendships\n')
+        self.assertEqual(
+            [(int(row['id']), row['status']) for row in rows],
+            [(self.friendship.id, 'confirmed'), (self.request.id, 'active'), (self.declined.id, 'declined')],
+        )
+
+    def test_user_friendships_to_stdout(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('export_friendships', '-', '--username', self.second_username, stdout=stdout, stderr=stderr)
+
+        rows = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.friendship.id, self.declined.id])
+        self.assertEqual(stderr.getvalue(), 'Exported 2 friendships\n')
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command('export_friendships', '-', '--username', self.unexpected_username, stdout=io.StringIO())
+
+    def test_compacted_friendships_exported_as_declined(self):
+        BlockedFriendshipPair.objects.compact(timezone.now(), batch_size=10)
+        self.assertFalse(UserFriendship.objects.filter(id=self.declined.id).exists())
+
+        rows = [json.loads(chunk) for chunk in FriendshipExport('ndjson', user_id=self.third_user.id).chunks()]
+        self.assertEqual(rows[-1], {
+            'id': self.declined.id,
+            'sender_id': self.second_user.id,
+            'sender': self.second_username,
+            'recipient_id': self.third_user.id,
+            'recipient': self.third_username,
+            'status': 'declined',
+            'updated_at': rows[-1]['updated_at'],
+        })
+        self.assertEqual([row['id'] for row in rows], [self.request.id, self.declined.id])
+
+    def test_keyset_pages_without_server_side_cursors(self):
+        BlockedFriendshipPair.objects.compact(timezone.now(), batch_size=10)
+        export = FriendshipExport('csv', chunk_size=1)
+        with mock.patch.dict(connection.settings_dict, {'DISABLE_SERVER_SIDE_CURSORS': True}):
+            # Full pages of one row and an empty last page of each table
+            with self.assertNumQueries(5):
+                rows = list(csv.DictReader(io.StringIO(''.join(export.chunks()))))
+
+        self.assertEqual(
+            [(int(row['id']), row['status']) for row in rows],
+            [(self.friendship.id, 'confirmed'), (self.request.id, 'active'), (self.declined.id, 'declined')],
+        )
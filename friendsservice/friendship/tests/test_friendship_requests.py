@@ -0,0 +1,41 @@
+from friendsservice.friendship.exceptions import InvalidCursorError
+from friendsservice.friendship.models import UserFriendship
+from friendsservice.friendship.pagination import encode_cursor
+from friendsservice.friendship.services.received_requests import GetReceivedFriendshipRequestsService
+from friendsservice.friendship.services.sent_requests import GetSentFriendshipRequestsService
+from friendsservice.friendship.tests.base import BaseTestCase
+
+
+class FriendshipRequestsServiceTestCase(BaseTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.second_request = UserFriendship.objects.create(sender=self.first_user, recipient=self.second_user)
+        self.third_request = UserFriendship.objects.create(sender=self.first_user, recipient=self.third_user)
+
+    def tearDown(self) -> None:
+        UserFriendship.objects.all().delete()
+
+    def test_sent_requests_in_one_query(self):
+        with self.assertNumQueries(1):
+            page = GetSentFriendshipRequestsService(self.first_user)()
+        self.assertEqual(
+            page.items, [(self.second_request.id, self.second_username), (self.third_request.id, self.third_username)]
+        )
+        self.assertIsNone(page.next_cursor)
+
+    def test_received_requests(self):
+        page = GetReceivedFriendshipRequestsService(self.third_user)()
+        self.assertEqual(page.items, [(self.third_request.id, self.first_username)])
+
+    def test_keyset_pagination(self):
+        page = GetSentFriendshipRequestsService(self.first_user, limit=1)()
+        self.assertEqual(page.items, [(self.second_request.id, self.second_username)])
+
+        page = GetSentFriendshipRequestsService(self.first_user, cursor=page.next_cursor, limit=1)()
+        self.assertEqual(page.items, [(self.third_request.id, self.third_username)])
+        self.assertIsNone(page.next_cursor)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursorError):
+            GetSentFriendshipRequestsService(self.first_user, cursor=encode_cursor('second'))
@@ -0,0 +1,65 @@
+from friendsservice.friendship.exceptions import InvalidCursorError
+from friendsservice.friendship.models import UserFriendship, FriendshipStatus
+from friendsservice.friendship.services.get_friends_list import GetFriendsListService
+from friendsservice.friendship.tests.base import BaseTestCase
+
+
+class GetFriendsListServiceTestCase(BaseTestCase):
+    service = GetFriendsListService
+
+    def setUp(self) -> None:
+        super().setUp()
+        UserFriendship.objects.create(
+            sender=self.first_user,
+            recipient=self.second_user,
+            status=FriendshipStatus.CONFIRMED.value
+        )
+        UserFriendship.objects.create(
+            sender=self.third_user,
+            recipient=self.first_user,
+            status=FriendshipStatus.CONFIRMED.value
+        )
+
+    def tearDown(self) -> None:
+        UserFriendship.objects.all().delete()
+
+    def test_friends_from_both_sides(self):
+        with self.assertNumQueries(1):
+            page = self.service(self.first_user)()
+        self.assertEqual(page.items, [self.second_username, self.third_username])
+        self.assertIsNone(page.next_cursor)
+
+        self.assertEqual(self.service(self.second_user)().items, [self.first_username])
+
+    def test_not_confirmed_friendships_skipped(self):
+        UserFriendship.objects.filter(sender=self.third_user).update(status=FriendshipStatus.DECLINED.value)
+        self.assertEqual(self.service(self.first_user)().items, [self.second_username])
+        self.assertEqual(self.service(self.third_user)().items, [])
+
+        UserFriendship.objects.filter(sender=self.third_user).update(status=FriendshipStatus.ACTIVE.value)
+        self.assertEqual(self.service(self.third_user)().items, [])
+
+    def test_keyset_pagination(self):
+        first_page = self.service(self.first_user, limit=1)()
+        self.assertEqual(first_page.items, [self.second_username])
+        self.assertIsNotNone(first_page.next_cursor)
+
+        second_page = self.service(self.first_user, cursor=first_page.next_cursor, limit=1)()
+        self.assertEqual(second_page.items, [self.third_username])
+        self.assertIsNone(second_page.next_cursor)
+
+    def test_pages_ordered_by_friend_id(self):
+        late_friend = self.get_or_create_user('a_late_friend', 'test_pass')
+        UserFriendship.objects.create(
+            sender=late_friend, recipient=self.first_user, status=FriendshipStatus.CONFIRMED.value
+        )
+
+        first_page = self.service(self.first_user, limit=2)()
+        self.assertEqual(first_page.items, [self.second_username, self.third_username])
+        second_page = self.service(self.first_user, cursor=first_page.next_cursor, limit=2)()
+        self.assertEqual(second_page.items, ['a_late_friend'])
+        self.assertIsNone(second_page.next_cursor)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursorError):
+            self.service(self.first_user, cursor='!')
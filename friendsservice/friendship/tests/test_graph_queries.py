@@ -0,0 +1,53 @@
+from friendsservice.friendship.exceptions import UserDoesNotExistsError
+from friendsservice.friendship.models import UserFriendship, FriendshipStatus
+from friendsservice.friendship.services.friend_suggestions import GetFriendSuggestionsService
+from friendsservice.friendship.services.mutual_friends import GetMutualFriendsService
+from friendsservice.friendship.tests.base import BaseTestCase
+
+
+class GraphQueriesTestCase(BaseTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.fourth_user = self.get_or_create_user('fourth', 'test_pass')
+        self.fifth_user = self.get_or_create_user('fifth', 'test_pass')
+        for sender, recipient in (
+            (self.first_user, self.second_user),
+            (self.third_user, self.first_user),
+            (self.second_user, self.fourth_user),
+            (self.fourth_user, self.third_user),
+            (self.second_user, self.fifth_user),
+        ):
+            UserFriendship.objects.create(sender=sender, recipient=recipient, status=FriendshipStatus.CONFIRMED.value)
+
+    def tearDown(self) -> None:
+        UserFriendship.objects.all().delete()
+        self.fourth_user.delete()
+        self.fifth_user.delete()
+
+    def test_mutual_friends(self):
+        with self.assertNumQueries(2):
+            mutual_friends = GetMutualFriendsService(self.first_user, 'fourth')()
+        self.assertEqual(mutual_friends, [self.second_username, self.third_username])
+        self.assertEqual(GetMutualFriendsService(self.first_user, 'fourth', limit=1)(), [self.second_username])
+        self.assertEqual(GetMutualFriendsService(self.first_user, self.second_username)(), [])
+
+    def test_mutual_friends_with_unknown_user(self):
+        with self.assertRaises(UserDoesNotExistsError):
+            GetMutualFriendsService(self.first_user, self.unexpected_username)()
+
+    def test_suggestions_ranked_by_mutual_friends(self):
+        with self.assertNumQueries(1):
+            suggestions = GetFriendSuggestionsService(self.first_user)()
+        self.assertEqual(suggestions, [
+            {'username': 'fourth', 'mutual_friends': 2},
+            {'username': 'fifth', 'mutual_friends': 1},
+        ])
+
+    def test_suggestions_skip_requested_users(self):
+        UserFriendship.objects.create(sender=self.fifth_user, recipient=self.first_user)
+        self.assertEqual(GetFriendSuggestionsService(self.first_user)(), [{'username': 'fourth', 'mutual_friends': 2}])
+        self.assertEqual(GetFriendSuggestionsService(self.fourth_user)(), [
+            {'username': self.first_username, 'mutual_friends': 2},
+            {'username': 'fifth', 'mutual_friends': 1},
+        ])
@@ -0,0 +1,169 @@
+import io
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+
+from friendsservice.friendship.exceptions import EventSinkError
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import UserFriendship, FriendshipStatus, FriendshipEvent, FriendshipEventType
+from friendsservice.friendship.outbox import EventSink, HttpSink, OutboxRelay
+from friendsservice.friendship.services.add_to_friends import AddToFriendsService
+from friendsservice.friendship.services.change_status import ChangeFriendshipStatusService
+from friendsservice.friendship.services.changes import GetFriendshipChangesService
+from friendsservice.friendship.services.delete_from_friends import DeleteFromFriendsService
+from friendsservice.friendship.tests.base import BaseTestCase
+
+User = get_user_model()
+
+
+class FailingSink(EventSink):
+
+    def send(self, messages: list[dict]) -> None:
+        raise EventSinkError
+
+
+class FriendshipEventsTestCase(BaseTestCase):
+
+    def tearDown(self) -> None:
+        UserFriendship.objects.all().delete()
+        FriendshipEvent.objects.all().delete()
+
+    @staticmethod
+    def event_types() -> list[str]:
+        return list(FriendshipEvent.objects.order_by('id').values_list('type', flat=True))
+
+    def test_services_record_events(self):
+        AddToFriendsService(self.first_user, self.second_username)()
+        AddToFriendsService(self.second_user, self.first_username)()
+        DeleteFromFriendsService(self.first_user, self.second_username)()
+        AddToFriendsService(self.first_user, self.third_username)()
+        friendship = UserFriendship.objects.get(sender=self.first_user, recipient=self.third_user)
+        ChangeFriendshipStatusService(friendship.id, FriendshipStatus.DECLINED)()
+
+        self.assertEqual(
+            self.event_types(),
+            ['request_sent', 'request_accepted', 'friend_removed', 'request_sent', 'request_declined'],
+        )
+
+    def test_relay_to_jsonl_file(self):
+        AddToFriendsService(self.first_user, self.second_username)()
+        AddToFriendsService(self.first_user, self.third_username)()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'events.jsonl'
+            stdout = io.StringIO()
+            call_command('relay_friendship_events', str(path), '--batch-size', '1', stdout=stdout)
+            messages = [json.loads(line) for line in path.read_text().splitlines()]
+
+        self.assertEqual(stdout.getvalue(), 'Relayed 2 events\n')
+        self.assertEqual([message['type'] for message in messages], ['request_sent', 'request_sent'])
+        self.assertEqual(messages[0]['sender_id'], self.first_user.id)
+        self.assertFalse(FriendshipEvent.objects.unpublished().exists())
+
+    def test_relay_to_http_endpoint(self):
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802
+                received.append(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+
+        AddToFriendsService(self.first_user, self.second_username)()
+        relayed = OutboxRelay(HttpSink(f'http://127.0.0.1:{server.server_port}/events'), batch_size=10).relay()
+
+        self.assertEqual(relayed, 1)
+        self.assertEqual([event['type'] for event in received[0]['events']], ['request_sent'])
+
+    def test_failed_batch_stays_unpublished(self):
+        AddToFriendsService(self.first_user, self.second_username)()
+        with self.assertRaises(EventSinkError):
+            OutboxRelay(FailingSink(), batch_size=10).relay()
+        self.assertEqual(FriendshipEvent.objects.unpublished().count(), 1)
+
+
+class GetFriendshipChangesServiceTestCase(BaseTestCase):
+
+    def tearDown(self) -> None:
+        UserFriendship.objects.all().delete()
+        FriendshipEvent.objects.all().delete()
+
+    def test_changes_since_cursor(self):
+        AddToFriendsService(self.first_user, self.second_username)()
+        AddToFriendsService(self.third_user, self.first_username)()
+        AddToFriendsService(self.second_user, self.third_username)()
+
+        page = GetFriendshipChangesService(self.first_user, limit=1)()
+        self.assertEqual([event[3:5] for event in page.events], [(self.first_username, self.second_username)])
+        self.assertTrue(page.has_more)
+
+        page = GetFriendshipChangesService(self.first_user, since=page.cursor)()
+        self.assertEqual([event[3:5] for event in page.events], [(self.third_username, self.first_username)])
+        self.assertFalse(page.has_more)
+
+        cursor = page.cursor
+        page = GetFriendshipChangesService(self.first_user, since=cursor)()
+        self.assertEqual(page.events, [])
+        self.assertEqual(page.cursor, cursor)
+
+
+class InterleavedTransactionsChangesTestCase(TransactionTestCase):
+
+    def setUp(self) -> None:
+        friend_graph_cache.clear()
+        self.first_user = User.objects.create(username='first')
+        self.second_user = User.objects.create(username='second')
+        self.third_user = User.objects.create(username='third')
+
+    @staticmethod
+    def record(sender: User, recipient: User) -> None:
+        friendship = UserFriendship(id=sender.id, sender_id=sender.id, recipient_id=recipient.id)
+        FriendshipEvent.objects.record(FriendshipEventType.REQUEST_SENT, friendship)
+        friend_graph_cache.invalidate_on_commit(sender.id, recipient.id)
+
+    def test_event_committed_late_with_lower_id_is_not_skipped(self):
+        recorded, release = threading.Event(), threading.Event()
+
+        def slow_transaction() -> None:
+            try:
+                with transaction.atomic():
+                    self.record(self.first_user, self.second_user)
+                    recorded.set()
+                    release.wait(timeout=10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=slow_transaction)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(release.set)
+        recorded.wait(timeout=10)
+
+        # Gets a higher event id, but commits first
+        with transaction.atomic():
+            self.record(self.third_user, self.first_user)
+
+        page = GetFriendshipChangesService(self.first_user)()
+        self.assertEqual(page.events, [])
+        self.assertIsNone(page.cursor)
+
+        release.set()
+        thread.join()
+
+        page = GetFriendshipChangesService(self.first_user)()
+        self.assertEqual([event[3:5] for event in page.events], [('first', 'second'), ('third', 'first')])
+        self.assertEqual(GetFriendshipChangesService(self.first_user, since=page.cursor)().events, [])
@@ -0,0 +1,51 @@
+from friendsservice.friendship.models import UserFriendship, FriendshipStatus
+from friendsservice.friendship.services.pair_status import (
+    FriendshipPairStatus, GetFriendshipStatusService, PairStatus
+)
+from friendsservice.friendship.tests.base import BaseTestCase
+
+
+class GetFriendshipStatusServiceTestCase(BaseTestCase):
+    service = GetFriendshipStatusService
+
+    def tearDown(self) -> None:
+        UserFriendship.objects.all().delete()
+
+    def test_statuses_in_one_query(self):
+        friendship = UserFriendship.objects.create(
+            sender=self.second_user, recipient=self.first_user, status=FriendshipStatus.CONFIRMED.value
+        )
+        with self.assertNumQueries(1):
+            statuses = self.service(
+                self.first_user, [self.second_username, self.third_username, self.unexpected_username]
+            )()
+        self.assertEqual(statuses, [
+            FriendshipPairStatus(self.second_username, PairStatus.FRIENDS, friendship.id),
+            FriendshipPairStatus(self.third_username, PairStatus.NONE),
+            FriendshipPairStatus(self.unexpected_username, PairStatus.NOT_FOUND),
+        ])
+
+    def test_status_depends_on_requesting_user(self):
+        friendship = UserFriendship.objects.create(sender=self.first_user, recipient=self.second_user)
+
+        self.assertEqual(
+            self.service(self.first_user, [self.second_username])(),
+            [FriendshipPairStatus(self.second_username, PairStatus.REQUEST_SENT, friendship.id)],
+        )
+        self.assertEqual(
+            self.service(self.second_user, [self.first_username])(),
+            [FriendshipPairStatus(self.first_username, PairStatus.REQUEST_RECEIVED, friendship.id)],
+        )
+        self.assertEqual(
+            self.service(self.third_user, [self.first_username])(),
+            [FriendshipPairStatus(self.first_username, PairStatus.NONE)],
+        )
+
+    def test_declined_status(self):
+        friendship = UserFriendship.objects.create(
+            sender=self.first_user, recipient=self.second_user, status=FriendshipStatus.DECLINED.value
+        )
+        self.assertEqual(
+            self.service(self.second_user, [self.first_username])(),
+            [FriendshipPairStatus(self.first_username, PairStatus.DECLINED, friendship.id)],
+        )
@@ -0,0 +1,59 @@
+from asgiref.sync import sync_to_async
+from django.db import router
+from django.test import override_settings
+
+from friendsservice.friendship.cache import friend_graph_cache
+from friendsservice.friendship.models import UserFriendship
+from friendsservice.friendship.routers import ReplicaRouter, areplica_reads, replica_reads
+from friendsservice.friendship.services.add_to_friends import AddToFriendsService
+from friendsservice.friendship.tests.base import BaseTestCase, forbid_blocking_cache_reads
+
+
+class ReplicaRouterTestCase(BaseTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        replica_settings = override_settings(
+            FRIENDSHIP_REPLICA_ALIASES=['replica_1'], FRIENDSHIP_REPLICA_STICKY_TIMEOUT=60
+        )
+        replica_settings.enable()
+        self.addCleanup(replica_settings.disable)
+
+    def test_reads_routed_to_replica(self):
+        self.assertEqual(router.db_for_read(UserFriendship), 'default')
+        with replica_reads(self.first_user.id) as alias:
+            self.assertEqual(alias, 'replica_1')
+            self.assertEqual(router.db_for_read(UserFriendship), 'replica_1')
+            self.assertEqual(router.db_for_write(UserFriendship), 'default')
+        self.assertEqual(router.db_for_read(UserFriendship), 'default')
+
+    def test_read_your_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            AddToFriendsService(self.first_user, self.second_username)()
+
+        for user in (self.first_user, self.second_user):
+            with replica_reads(user.id) as alias:
+                self.assertIsNone(alias)
+        with replica_reads(self.third_user.id) as alias:
+            self.assertEqual(alias, 'replica_1')
+
+    async def test_async_read_your_writes(self):
+        with forbid_blocking_cache_reads():
+            async with areplica_reads(self.first_user.id) as alias:
+                self.assertEqual(alias, 'replica_1')
+                self.assertEqual(router.db_for_read(UserFriendship), 'replica_1')
+            self.assertEqual(router.db_for_read(UserFriendship), 'default')
+
+        await sync_to_async(friend_graph_cache.invalidate)(self.first_user.id)
+        with forbid_blocking_cache_reads():
+            async with areplica_reads(self.first_user.id) as alias:
+                self.assertIsNone(alias)
+
+    def test_replicas_not_migrated(self):
+        self.assertFalse(ReplicaRouter().allow_migrate('replica_1', 'friendship'))
+        self.assertIsNone(ReplicaRouter().allow_migrate('default', 'friendship'))
+
+    @override_settings(FRIENDSHIP_REPLICA_ALIASES=[])
+    def test_no_replicas(self):
+        with replica_reads(self.first_user.id) as alias:
+            self.assertIsNone(alias)
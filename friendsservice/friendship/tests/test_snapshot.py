@@ -0,0 +1,65 @@
+import importlib.util
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from friendsservice.friendship.models import UserFriendship, FriendshipStatus
+from friendsservice.friendship.snapshot import read_npy
+from friendsservice.friendship.tests.base import BaseTestCase
+
+User = get_user_model()
+
+
+class FriendGraphSnapshotTestCase(BaseTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.fourth_user = User.objects.create(username='fourth')
+        UserFriendship.objects.create(
+            sender=self.first_user, recipient=self.second_user, status=FriendshipStatus.CONFIRMED.value
+        )
+        UserFriendship.objects.create(
+            sender=self.third_user, recipient=self.first_user, status=FriendshipStatus.CONFIRMED.value
+        )
+        UserFriendship.objects.create(sender=self.second_user, recipient=self.third_user)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+        stdout = io.StringIO()
+        call_command('snapshot_friend_graph', str(self.directory), '--batch-size', '2', stdout=stdout)
+        self.assertEqual(stdout.getvalue(), f'Snapshot of {self.users_count + 1} users and 2 friendships written\n')
+
+    def tearDown(self) -> None:
+        UserFriendship.objects.all().delete()
+
+    def test_csr_arrays(self):
+        node_ids = list(read_npy(self.directory / 'node_ids.npy'))
+        offsets = read_npy(self.directory / 'offsets.npy')
+        neighbors = read_npy(self.directory / 'neighbors.npy')
+
+        self.assertEqual(node_ids, list(User.objects.order_by('id').values_list('id', flat=True)))
+        friends = {
+            node_ids[node]: {node_ids[neighbor] for neighbor in neighbors[offsets[node]:offsets[node + 1]]}
+            for node in range(len(node_ids))
+        }
+        self.assertEqual(friends[self.first_user.id], {self.second_user.id, self.third_user.id})
+        self.assertEqual(friends[self.second_user.id], {self.first_user.id})
+        self.assertEqual(friends[self.fourth_user.id], set())
+
+    @unittest.skipUnless(importlib.util.find_spec('numpy'), 'numpy is not installed')
+    def test_statistics(self):
+        stdout = io.StringIO()
+        call_command('friend_graph_stats', str(self.directory), '--top', '1', stdout=stdout)
+        statistics = json.loads(stdout.getvalue())
+
+        self.assertEqual(statistics['edges'], 2)
+        self.assertEqual(statistics['top_connected'], [[self.first_user.id, 2]])
+        self.assertEqual(statistics['degree_distribution'], {'0': self.users_count - 2, '1': 2, '2': 1})
+        self.assertEqual(statistics['components']['largest'], 3)
+        self.assertEqual(statistics['components']['count'], self.users_count - 1)
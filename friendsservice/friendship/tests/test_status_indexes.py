@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from friendsservice.friendship.models import UserFriendship, FriendshipCounters, FriendshipStatus
+from friendsservice.friendship.services.get_friends_list import GetFriendsListService
+from friendsservice.friendship.services.received_requests import GetReceivedFriendshipRequestsService
+from friendsservice.friendship.services.sent_requests import GetSentFriendshipRequestsService
+from friendsservice.friendship.tests.base import BaseTestCase
+
+User = get_user_model()
+
+
+class StatusIndexesTestCase(BaseTestCase):
+    """Hot status predicates match the partial indexes, tables of tests are too small to prefer them by cost"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndexes(self, explained: str, *index_names: str) -> None:  # noqa: N802
+        for index_name in index_names:
+            self.assertRegex(explained, rf'(using|Scan on) {index_name}\b')
+
+    def test_friends_list(self):
+        # Friendships of other users, so that the index of the other side is not as cheap to scan in full
+        users = User.objects.bulk_create(User(username=f'user_{i}') for i in range(200))
+        friendships = [
+            UserFriendship(sender=sender, recipient=recipient, status=FriendshipStatus.CONFIRMED.value)
+            for sender, recipient in zip(users, users[1:])
+        ]
+        for friendship in friendships:
+            friendship.fill_pair()
+        UserFriendship.objects.bulk_create(friendships)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {UserFriendship._meta.db_table}')  # noqa: SLF001
+
+        explained = GetFriendsListService(self.first_user)._page_friends().explain()  # noqa: SLF001
+        self.assertUsesIndexes(explained, 'friendship_sender_confirmed', 'friendship_recipient_confirmed')
+        # Both sides come in friend id order from the indexes and are merged, nothing sorts the user friendships
+        self.assertIn('Merge Append', explained)
+        self.assertNotRegex(explained, r'\bSort\b(?! Key)')
+
+    def test_requests_lists(self):
+        self.assertUsesIndexes(
+            GetSentFriendshipRequestsService(self.first_user)._requests().explain(),  # noqa: SLF001
+            'friendship_sender_active',
+        )
+        self.assertUsesIndexes(
+            GetReceivedFriendshipRequestsService(self.first_user)._requests().explain(),  # noqa: SLF001
+            'friendship_recipient_active',
+        )
+
+    def test_related_users(self):
+        self.assertUsesIndexes(
+            UserFriendship.objects.related_user_ids(self.first_user.id).explain(),
+            'unique_friendship_pair', 'friendship_user_high',
+        )
+
+    def test_user_delete_cascade(self):
+        self.assertUsesIndexes(
+            UserFriendship.objects.filter(sender__in=[self.first_user.id]).explain(), 'friendship_sender'
+        )
+        self.assertUsesIndexes(
+            UserFriendship.objects.filter(recipient__in=[self.first_user.id]).explain(), 'friendship_recipient'
+        )
+
+    def test_counters_compute(self):
+        with self.assertNumQueries(4):
+            counters, = FriendshipCounters.compute([self.first_user.id])
+        self.assertEqual(counters.values(), (0, 0, 0))
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+
+from friendsservice.friendship.tests.base import BaseTestCase
+from friendsservice.friendship.usernames import username_resolver
+
+User = get_user_model()
+
+
+class UsernameResolverTestCase(BaseTestCase):
+
+    def test_resolve_many_from_cache_tiers(self):
+        usernames = [self.first_username, self.second_username, self.unexpected_username]
+        expected = {self.first_username: self.first_user.id, self.second_username: self.second_user.id}
+        with self.assertNumQueries(1):
+            self.assertEqual(username_resolver.resolve_many(usernames), expected)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(username_resolver.resolve_many(usernames), expected)
+        # Shared tier
+        username_resolver.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(username_resolver.resolve_many(usernames), expected)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(username_resolver.resolve(self.third_username), self.third_user.id)
+
+    def test_unknown_username_cached_until_user_created(self):
+        self.assertIsNone(username_resolver.resolve('new_user'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(username_resolver.resolve('new_user'))
+
+        user = User.objects.create(username='new_user')
+        self.assertEqual(username_resolver.resolve('new_user'), user.id)
+
+        user.delete()
+        self.assertIsNone(username_resolver.resolve('new_user'))
+
+    async def test_aresolve(self):
+        self.assertEqual(await username_resolver.aresolve(self.first_username), self.first_user.id)
+        self.assertIsNone(await username_resolver.aresolve(self.unexpected_username))
+        username_resolver.local.clear()
+        self.assertEqual(
+            await username_resolver.aresolve_many([self.first_username, self.unexpected_username]),
+            {self.first_username: self.first_user.id},
+        )
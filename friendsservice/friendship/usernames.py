@@ -0,0 +1,158 @@
+import time
+from collections.abc import Iterable
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+from django.db.models import QuerySet
+
+from friendsservice.friendship.cache import LRUCache
+
+User = get_user_model()
+
+# Cached in place of the id of an unknown username, ids are positive
+_UNKNOWN = 0
+
+
+class UsernameResolver:
+    """Username to user id mapping, looked up in the in-process LRU, the shared cache and the database in turn.
+
+    Unknown usernames are cached too, for `negative_timeout` seconds. Entries are invalidated when users are created
+    or deleted; other processes keep their in-process entries for at most `local_timeout` seconds.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self, alias: str, local_max_size: int, local_timeout: int, timeout: int, negative_timeout: int
+    ):
+        """Use cache `alias`, timeouts are in seconds"""
+        self.alias = alias
+        self.local = LRUCache(local_max_size)
+        self.local_timeout = local_timeout
+        self.timeout = timeout
+        self.negative_timeout = negative_timeout
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self.alias]
+
+    @staticmethod
+    def _key(username: str) -> str:
+        return f'friendship:username:{username}'
+
+    def _local_lookup(self, usernames: list[str]) -> dict[str, int]:
+        found = {}
+        now = time.monotonic()
+        for username in usernames:
+            local_value = self.local.get(self._key(username))
+            if local_value is not None and local_value[1] > now:
+                found[username] = local_value[0]
+        return found
+
+    def _add_shared(self, found: dict[str, int], missing: list[str], shared_values: dict[str, int]) -> dict[str, int]:
+        now = time.monotonic()
+        for username in missing:
+            user_id = shared_values.get(self._key(username))
+            if user_id is not None:
+                found[username] = user_id
+                self.local.set(self._key(username), (user_id, now + self.local_timeout))
+        return found
+
+    def _lookup(self, usernames: list[str]) -> dict[str, int]:
+        """Look up cached ids of the usernames, `_UNKNOWN` for cached unknown ones"""
+        found = self._local_lookup(usernames)
+        missing = [username for username in usernames if username not in found]
+        if not missing:
+            return found
+        return self._add_shared(found, missing, self.shared.get_many([self._key(username) for username in missing]))
+
+    async def _alookup(self, usernames: list[str]) -> dict[str, int]:
+        found = self._local_lookup(usernames)
+        missing = [username for username in usernames if username not in found]
+        if not missing:
+            return found
+        shared_values = await self.shared.aget_many([self._key(username) for username in missing])
+        return self._add_shared(found, missing, shared_values)
+
+    def _local_store(self, usernames: list[str], user_ids: dict[str, int]) -> tuple[dict[str, int], dict[str, int]]:
+        """Known and unknown cache entries of the queried usernames, stored locally"""
+        now = time.monotonic()
+        known = {self._key(username): user_ids[username] for username in usernames if username in user_ids}
+        unknown = {self._key(username): _UNKNOWN for username in usernames if username not in user_ids}
+        for key, user_id in (known | unknown).items():
+            timeout = self.local_timeout if user_id != _UNKNOWN else min(self.local_timeout, self.negative_timeout)
+            self.local.set(key, (user_id, now + timeout))
+        return known, unknown
+
+    def _store(self, usernames: list[str], user_ids: dict[str, int]) -> None:
+        known, unknown = self._local_store(usernames, user_ids)
+        if known:
+            self.shared.set_many(known, timeout=self.timeout)
+        if unknown:
+            self.shared.set_many(unknown, timeout=self.negative_timeout)
+
+    async def _astore(self, usernames: list[str], user_ids: dict[str, int]) -> None:
+        known, unknown = self._local_store(usernames, user_ids)
+        if known:
+            await self.shared.aset_many(known, timeout=self.timeout)
+        if unknown:
+            await self.shared.aset_many(unknown, timeout=self.negative_timeout)
+
+    @staticmethod
+    def _users(usernames: list[str]) -> QuerySet[User]:
+        return User.objects.filter(username__in=usernames).values_list('username', 'id')
+
+    @staticmethod
+    def _known(usernames: Iterable[str], found: dict[str, int]) -> dict[str, int]:
+        return {username: found[username] for username in usernames if found.get(username, _UNKNOWN) != _UNKNOWN}
+
+    def resolve_many(self, usernames: Iterable[str]) -> dict[str, int]:
+        """Ids of the known usernames, unknown ones are left out"""
+        usernames = list(dict.fromkeys(usernames))
+        found = self._lookup(usernames)
+        missing = [username for username in usernames if username not in found]
+        if missing:
+            queried = dict(self._users(missing))
+            self._store(missing, queried)
+            found |= queried
+        return self._known(usernames, found)
+
+    async def aresolve_many(self, usernames: Iterable[str]) -> dict[str, int]:
+        usernames = list(dict.fromkeys(usernames))
+        found = await self._alookup(usernames)
+        missing = [username for username in usernames if username not in found]
+        if missing:
+            queried = {username: user_id async for username, user_id in self._users(missing)}
+            await self._astore(missing, queried)
+            found |= queried
+        return self._known(usernames, found)
+
+    def resolve(self, username: str) -> int | None:
+        return self.resolve_many([username]).get(username)
+
+    async def aresolve(self, username: str) -> int | None:
+        return (await self.aresolve_many([username])).get(username)
+
+    def invalidate(self, *usernames: str) -> None:
+        keys = [self._key(username) for username in usernames]
+        self.shared.delete_many(keys)
+        for key in keys:
+            self.local.set(key, None)
+
+    def invalidate_on_commit(self, *usernames: str) -> None:
+        # Again after commit: a concurrent resolution may have cached the state before it
+        self.invalidate(*usernames)
+        transaction.on_commit(partial(self.invalidate, *usernames))
+
+    def clear(self) -> None:
+        self.local.clear()
+
+
+username_resolver = UsernameResolver(
+    alias=settings.FRIENDSHIP_CACHE_ALIAS,
+    local_max_size=settings.FRIENDSHIP_USERNAME_CACHE_LOCAL_MAX_SIZE,
+    local_timeout=settings.FRIENDSHIP_USERNAME_CACHE_LOCAL_TIMEOUT,
+    timeout=settings.FRIENDSHIP_USERNAME_CACHE_TIMEOUT,
+    negative_timeout=settings.FRIENDSHIP_USERNAME_CACHE_NEGATIVE_TIMEOUT,
+)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 import environ
@@ -54,6 +55,7 @@ LOCAL_APPS = [
 INSTALLED_APPS = BASE_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    "friendsservice.api_v1.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -94,25 +96,109 @@ DATABASES = {
         'PASSWORD': env.str('POSTGRES_PASSWORD', default='postgres'),
         'HOST': env.str('POSTGRES_HOST', default='localhost'),
         'PORT': env.str('POSTGRES_PORT', default='5432'),
-        'ATOMIC_REQUESTS': True,
+        # Write services declare their own transactions, read-only views must not pay for BEGIN/COMMIT
+        'ATOMIC_REQUESTS': env.bool('POSTGRES_ATOMIC_REQUESTS', default=False),
+        # Keep connections open between requests (seconds). Under ASGI Django runs every request in its own thread,
+        # so connections are never reused and pile up until garbage collected: keep 0 and use an external pooler
+        'CONN_MAX_AGE': env.int('POSTGRES_CONN_MAX_AGE', default=0),
+        'CONN_HEALTH_CHECKS': env.bool('POSTGRES_CONN_HEALTH_CHECKS', default=True),
+        # External transaction pooler (e.g. pgbouncer in transaction mode) does not support server-side cursors
+        'DISABLE_SERVER_SIDE_CURSORS': env.bool('POSTGRES_POOLER', default=False),
     },
 }
 
+# Read replicas of `default` (comma separated hosts), friendship read services are routed to them
+FRIENDSHIP_REPLICA_ALIASES = []
+for number, replica_host in enumerate(env.list('POSTGRES_REPLICA_HOSTS', default=[]), start=1):
+    FRIENDSHIP_REPLICA_ALIASES.append(f'replica_{number}')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'ATOMIC_REQUESTS': False,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['friendsservice.friendship.routers.ReplicaRouter']
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Redis urls (redis://host:port/db) use django.core.cache.backends.redis.RedisCache and require `redis` package
+
+CACHES = {
+    'default': env.cache_url('CACHE_URL', default='locmemcache://'),
+    'friendship': env.cache_url('FRIENDSHIP_CACHE_URL', default='locmemcache://friendship'),
+    # Must be shared by all workers, see AUTH_REVOCATION_ALLOW_LOCAL_CACHE
+    'auth': env.cache_url('AUTH_REVOCATION_CACHE_URL', default='locmemcache://auth'),
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
-    {"NAME": "django.contrib.auth.password_validation.CommonPasswordValidator"},
+    {"NAME": "friendsservice.api_v1.user.password_validation.CompactCommonPasswordValidator"},
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
 ]
 
+# Passwords of new users are hashed by a pool of worker processes, 0 hashes them in a thread of the request worker.
+# Forking a threaded server is unsafe, so workers are spawned
+PASSWORD_HASHING_WORKERS = env.int('PASSWORD_HASHING_WORKERS', default=os.cpu_count() or 1)
+PASSWORD_HASHING_MAX_PENDING = env.int('PASSWORD_HASHING_MAX_PENDING', default=100)
+PASSWORD_HASHING_START_METHOD = env.str('PASSWORD_HASHING_START_METHOD', default='spawn')
+
 # -------------------------------------------------------------------------------
 # django-rest-framework - https://www.django-rest-framework.org/api-guide/settings/
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'friendsservice.api_v1.authentication.TokenUserAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# -------------------------------------------------------------------------------
+# djangorestframework-simplejwt - https://django-rest-framework-simplejwt.readthedocs.io/en/latest/settings.html
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'friendsservice.api_v1.authentication.UsernameTokenObtainPairSerializer',
+}
+
+# Revoked tokens of deactivated and deleted users, checked by TokenUserAuthentication instead of a user query.
+# A local memory cache revokes tokens in one process only, so it is refused at startup unless allowed
+AUTH_REVOCATION_CACHE_ALIAS = 'auth'
+AUTH_REVOCATION_ALLOW_LOCAL_CACHE = env.bool('AUTH_REVOCATION_ALLOW_LOCAL_CACHE', default=DEBUG)
+AUTH_REVOCATION_LOCAL_TIMEOUT = env.int('AUTH_REVOCATION_LOCAL_TIMEOUT', default=5)
+AUTH_REVOCATION_LOCAL_MAX_SIZE = env.int('AUTH_REVOCATION_LOCAL_MAX_SIZE', default=10000)
+
+# Responses of requests with Idempotency-Key header are replayed to retries for IDEMPOTENCY_KEY_TIMEOUT seconds
+IDEMPOTENCY_CACHE_ALIAS = 'default'
+IDEMPOTENCY_KEY_TIMEOUT = env.int('IDEMPOTENCY_KEY_TIMEOUT', default=24 * 60 * 60)
+IDEMPOTENCY_LOCK_TIMEOUT = env.int('IDEMPOTENCY_LOCK_TIMEOUT', default=30)
+
+# Views exceeding their `query_budgets` raise instead of logging a warning, always enabled by the test runner
+QUERY_BUDGET_STRICT = env.bool('QUERY_BUDGET_STRICT', default=False)
+TEST_RUNNER = 'friendsservice.test_runner.StrictQueryBudgetTestRunner'
+
+# /metrics/ is served to these client addresses, or to any client sending `Authorization: Bearer <METRICS_TOKEN>`
+METRICS_ALLOWED_IPS = env.list('METRICS_ALLOWED_IPS', default=['127.0.0.1', '::1'])
+METRICS_TOKEN = env.str('METRICS_TOKEN', default='')
+
+# -------------------------------------------------------------------------------
+# friendship
+FRIENDSHIP_PAGE_SIZE = env.int('FRIENDSHIP_PAGE_SIZE', default=100)
+FRIENDSHIP_MAX_PAGE_SIZE = env.int('FRIENDSHIP_MAX_PAGE_SIZE', default=1000)
+FRIENDSHIP_BULK_MAX_SIZE = env.int('FRIENDSHIP_BULK_MAX_SIZE', default=500)
+FRIENDSHIP_SUGGESTIONS_TIMEOUT = env.int('FRIENDSHIP_SUGGESTIONS_TIMEOUT', default=600)
+FRIENDSHIP_EVENTS_RELAY_BATCH_SIZE = env.int('FRIENDSHIP_EVENTS_RELAY_BATCH_SIZE', default=1000)
+FRIENDSHIP_DECLINED_RETENTION_DAYS = env.int('FRIENDSHIP_DECLINED_RETENTION_DAYS', default=30)
+FRIENDSHIP_COMPACTION_BATCH_SIZE = env.int('FRIENDSHIP_COMPACTION_BATCH_SIZE', default=1000)
+FRIENDSHIP_EXPORT_CHUNK_SIZE = env.int('FRIENDSHIP_EXPORT_CHUNK_SIZE', default=2000)
+FRIENDSHIP_CACHE_ALIAS = 'friendship'
+FRIENDSHIP_CACHE_LOCAL_MAX_SIZE = env.int('FRIENDSHIP_CACHE_LOCAL_MAX_SIZE', default=10000)
+FRIENDSHIP_CACHE_TIMEOUT = env.int('FRIENDSHIP_CACHE_TIMEOUT', default=300)
+# Username to id mapping, unknown usernames are cached for a short time only
+FRIENDSHIP_USERNAME_CACHE_LOCAL_MAX_SIZE = env.int('FRIENDSHIP_USERNAME_CACHE_LOCAL_MAX_SIZE', default=100000)
+FRIENDSHIP_USERNAME_CACHE_LOCAL_TIMEOUT = env.int('FRIENDSHIP_USERNAME_CACHE_LOCAL_TIMEOUT', default=60)
+FRIENDSHIP_USERNAME_CACHE_TIMEOUT = env.int('FRIENDSHIP_USERNAME_CACHE_TIMEOUT', default=24 * 60 * 60)
+FRIENDSHIP_USERNAME_CACHE_NEGATIVE_TIMEOUT = env.int('FRIENDSHIP_USERNAME_CACHE_NEGATIVE_TIMEOUT', default=30)
+# Seconds a user reads from the primary after changing their friendships
+FRIENDSHIP_REPLICA_STICKY_TIMEOUT = env.int('FRIENDSHIP_REPLICA_STICKY_TIMEOUT', default=5)
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
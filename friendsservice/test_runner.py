@@ -0,0 +1,15 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class StrictQueryBudgetTestRunner(DiscoverRunner):
+    """Fails requests of views running more queries than their `query_budgets` allow"""
+
+    def setup_test_environment(self, **kwargs) -> None:
+        super().setup_test_environment(**kwargs)
+        self._strict_query_budget = override_settings(QUERY_BUDGET_STRICT=True)
+        self._strict_query_budget.enable()
+
+    def teardown_test_environment(self, **kwargs) -> None:
+        self._strict_query_budget.disable()
+        super().teardown_test_environment(**kwargs)
@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from friendsservice.api_v1.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
     path('api/v1/', include('friendsservice.api_v1.urls', namespace='api'))
 ]